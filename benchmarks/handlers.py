@@ -0,0 +1,203 @@
+"""
+Microbenchmarks for the mock server's hot handlers, in-process
+
+Runs GET /api/users (paginate), GET /api/users/{id}, POST /api/users and
+PUT /api/users/{id} through Flask's test client - no sockets - plus JSON
+encoding of a page in its support envelope, at several USERS sizes. The
+response cache is cleared before each call so the handler itself is timed;
+"list_users_cached" shows the cached path for comparison.
+
+Results can be saved as a baseline and later runs checked against it,
+failing (exit status 1) when any case is slower by more than --threshold
+percent. Baselines are only comparable on the same machine.
+
+Run with:
+    python benchmarks/handlers.py
+    python benchmarks/handlers.py --sizes 12,10000 --save
+    python benchmarks/handlers.py --check --threshold 15
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import mock_api_server  # noqa: E402
+from datagen import generate_users  # noqa: E402
+from mock_api_server import RESPONSE_CACHE, SEED_USERS, SUPPORT, app  # noqa: E402
+from store import Store  # noqa: E402
+
+DEFAULT_SIZES = (12, 10_000, 1_000_000)
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "handlers_baseline.json"
+DEFAULT_THRESHOLD = 20.0
+
+
+def load_users(size):
+    """Point the app at a USERS store of `size` users (built-ins first)"""
+    records = {user_id: dict(user) for user_id, user in SEED_USERS.items()}
+    extra = max(0, size - len(records))
+    records.update(
+        (user["id"], user) for user in generate_users(extra, start_id=len(records) + 1)
+    )
+    mock_api_server.USERS = Store(records, indexes=mock_api_server.user_indexes())
+    return mock_api_server.USERS
+
+
+def build_cases(store):
+    """(name, call) pairs for one dataset"""
+    client = app.test_client()
+    per_page = app.config["DEFAULT_PER_PAGE"]
+    middle_page = max(1, len(store) // per_page // 2)
+    middle_id = max(1, len(store) // 2)
+    page_url = f"/api/users?page={middle_page}"
+
+    def uncached(method, url, **kwargs):
+        def call():
+            RESPONSE_CACHE.clear()
+            return method(url, **kwargs)
+
+        return call
+
+    envelope = store.page(page=middle_page, per_page=per_page)
+    envelope["support"] = SUPPORT
+
+    def encode_envelope():
+        with app.app_context():
+            return app.json.encode(envelope)
+
+    return [
+        ("paginate", uncached(client.get, page_url)),
+        ("list_users_cached", lambda: client.get(page_url)),
+        ("get_user", uncached(client.get, f"/api/users/{middle_id}")),
+        (
+            "create_user",
+            uncached(client.post, "/api/users", json={"name": "a b", "job": "QA"}),
+        ),
+        (
+            "update_user",
+            uncached(
+                client.put, f"/api/users/{middle_id}", json={"name": "c d", "job": "QA"}
+            ),
+        ),
+        ("encode_support_envelope", encode_envelope),
+    ]
+
+
+def time_call(call, number, repeat):
+    """Best per-call time in microseconds"""
+    call()
+    best = min(timeit.repeat(call, number=number, repeat=repeat))
+    return best / number * 1e6
+
+
+def run(sizes, number, repeat):
+    """{"<size>/<case>": microseconds}, printing rows as they finish"""
+    results = {}
+    original = mock_api_server.USERS
+    try:
+        for size in sizes:
+            store = load_users(size)
+            for name, call in build_cases(store):
+                micros = time_call(call, number, repeat)
+                results[f"{size}/{name}"] = micros
+                print(f"{size:>9,} users  {name:<26}{micros:>10.1f}us", flush=True)
+    finally:
+        mock_api_server.USERS = original
+        RESPONSE_CACHE.clear()
+    return results
+
+
+def compare(baseline, results, threshold):
+    """(case, baseline us, current us, change %) for cases over threshold"""
+    regressions = []
+    for case, micros in results.items():
+        before = baseline.get(case)
+        if not before:
+            continue
+        change = (micros - before) / before * 100
+        if change > threshold:
+            regressions.append((case, before, micros, change))
+    return regressions
+
+
+def parse_sizes(value):
+    return [int(size) for size in value.split(",")]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the server handlers")
+    parser.add_argument(
+        "--sizes",
+        type=parse_sizes,
+        default=list(DEFAULT_SIZES),
+        help="Comma-separated USERS sizes",
+    )
+    parser.add_argument("--number", type=int, default=500, help="Calls per round")
+    parser.add_argument("--repeat", type=int, default=3, help="Rounds (best kept)")
+    parser.add_argument(
+        "--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file"
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="Write the results as the new baseline"
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Fail on regressions against the baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Percent slowdown that counts as a regression",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.check and not args.baseline.exists():
+        sys.exit(
+            f"No baseline at {args.baseline}: save one on this machine first with"
+            " --save (baselines are only comparable on the same machine)"
+        )
+    print(f"JSON backend: {app.json.backend.name}\n")
+    results = run(args.sizes, args.number, args.repeat)
+
+    status = 0
+    if args.check:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(baseline, results, args.threshold)
+        print()
+        for case, before, micros, change in regressions:
+            print(
+                f"REGRESSION {case}: {before:.1f}us -> {micros:.1f}us (+{change:.0f}%)"
+            )
+        if regressions:
+            status = 1
+        else:
+            print(f"No case slower than the baseline by over {args.threshold:g}%")
+
+    if args.save:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "json_backend": app.json.backend.name,
+                    "number": args.number,
+                    "results": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"\nBaseline saved to {args.baseline}")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
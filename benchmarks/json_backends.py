@@ -0,0 +1,92 @@
+"""
+Compare the JSON backends in serialization.py on real USERS page payloads
+
+Encodes the pages GET /api/users serves (the built-in users at the default
+page size, and synthetic users at the maximum page size) and decodes a bulk
+create body, once per installed backend.
+
+Run with:
+    python benchmarks/json_backends.py
+    python benchmarks/json_backends.py --users 10000 --repeat 5
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from datagen import generate_users  # noqa: E402
+from mock_api_server import SUPPORT, USERS, app  # noqa: E402
+from serialization import BACKENDS  # noqa: E402
+from store import Store  # noqa: E402
+
+
+def page_payload(store, page, per_page):
+    """The dict GET /api/users?page=&per_page= encodes"""
+    payload = store.page(page=page, per_page=per_page)
+    payload["support"] = SUPPORT
+    return payload
+
+
+def build_cases(users):
+    """(label, kind, payload) tuples to time"""
+    synthetic = Store({user["id"]: user for user in generate_users(users)})
+    max_per_page = app.config["MAX_PER_PAGE"]
+    big_page = page_payload(synthetic, 1, max_per_page)
+    bulk_body = [
+        {"name": f"{user['first_name']} {user['last_name']}", "job": "QA"}
+        for user in generate_users(1000)
+    ]
+
+    return [
+        ("USERS page 1 (6 per page)", "dumps", page_payload(USERS, 1, 6)),
+        (f"synthetic page ({max_per_page} per page)", "dumps", big_page),
+        ("bulk create body (1000 items)", "loads", bulk_body),
+    ]
+
+
+def time_case(backend, kind, payload, number, repeat):
+    """Best per-call time in microseconds"""
+    if kind == "dumps":
+
+        def call():
+            return backend.dumps(payload)
+
+    else:
+        encoded = BACKENDS["json"].dumps(payload)
+
+        def call():
+            return backend.loads(encoded)
+
+    best = min(timeit.repeat(call, number=number, repeat=repeat))
+    return best / number * 1e6
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JSON backends")
+    parser.add_argument("--users", type=int, default=1000, help="Synthetic users")
+    parser.add_argument("--number", type=int, default=2000, help="Calls per round")
+    parser.add_argument("--repeat", type=int, default=3, help="Rounds (best kept)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cases = build_cases(args.users)
+
+    print(f"Backends: {', '.join(BACKENDS)}\n")
+    print(f"{'payload':<36}{'op':<7}" + "".join(f"{name:>12}" for name in BACKENDS))
+
+    for label, kind, payload in cases:
+        timings = [
+            time_case(backend, kind, payload, args.number, args.repeat)
+            for backend in BACKENDS.values()
+        ]
+        row = "".join(f"{micros:>10.1f}us" for micros in timings)
+        print(f"{label:<36}{kind:<7}{row}")
+
+
+if __name__ == "__main__":
+    main()
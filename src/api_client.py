@@ -0,0 +1,351 @@
+"""
+Client for the mock API server (and the ReqRes API it mimics)
+
+    client = ApiClient("http://localhost:5000")
+    user = client.get_user(2).json()["data"]
+    response, user_id = client.first_available_user([2, 1, 3])
+
+- one method per route, returning the requests.Response as-is, so callers
+  can check statuses and headers
+- pooled keep-alive connections (POOL_SIZE per host)
+- (connect, read) timeouts, overridable per call with timeout=
+- idempotent requests (GET, PUT, DELETE, ...) are retried on connection
+  errors, timeouts and RETRY_STATUSES, after a full-jitter exponential
+  backoff (or the server's Retry-After), capped at backoff_max; POST and
+  PATCH are sent once
+- first_available() probes candidates concurrently and returns as soon as
+  one answers 200, instead of waiting out each 404 in turn
+
+Pass session= to share an existing requests.Session (e.g. the tests'
+`http` fixture) instead of opening a new pool.
+"""
+
+import json
+import math
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from page_iterator import DEFAULT_PREFETCH, iter_records
+from tenants import TENANT_HEADER
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.1
+DEFAULT_BACKOFF_MAX = 5.0
+
+POOL_SIZE = 16
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Worth another try: rate limited, or the server/proxy briefly unavailable
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+NDJSON = "application/x-ndjson"
+
+
+def retry_after(response):
+    """Seconds from a finite numeric Retry-After header, or None"""
+    value = response.headers.get("Retry-After", "")
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    return max(0.0, seconds) if math.isfinite(seconds) else None
+
+
+class ApiClient:
+    """Pooled, retrying client with a method per mock API route"""
+
+    def __init__(
+        self,
+        base_url,
+        timeout=(DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        retries=DEFAULT_RETRIES,
+        backoff=DEFAULT_BACKOFF,
+        backoff_max=DEFAULT_BACKOFF_MAX,
+        tenant=None,
+        session=None,
+        seed=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._rng = random.Random(seed)
+        # Lets tests skip the real waits
+        self._sleep = time.sleep
+
+        self._owns_session = session is None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.tenant = tenant
+
+    def close(self):
+        """Close the connection pool, unless the session was passed in"""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ---------- transport ----------
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def headers(self):
+        """Headers added to every request"""
+        return {} if self.tenant is None else {TENANT_HEADER: self.tenant}
+
+    def backoff_delay(self, attempt, response=None):
+        """
+        Seconds to wait before retry number attempt + 1
+
+        Full jitter: uniform over [0, backoff * 2**attempt], capped at
+        backoff_max, so clients retrying together spread out. A Retry-After
+        from the server wins, up to backoff_max.
+        """
+        if response is not None:
+            delay = retry_after(response)
+            if delay is not None:
+                return min(delay, self.backoff_max)
+        return self._rng.uniform(0, min(self.backoff_max, self.backoff * 2**attempt))
+
+    def request(self, method, path, **kwargs):
+        """
+        Send a request to path, retrying it if it is idempotent
+
+        kwargs go to requests (params=, json=, data=, headers=, timeout=).
+        The last response is returned even if its status was retryable; the
+        last error is raised when every attempt failed to get an answer.
+        """
+        method = method.upper()
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs["headers"] = {**self.headers(), **(kwargs.get("headers") or {})}
+        attempts = 1 + (self.retries if method in IDEMPOTENT_METHODS else 0)
+
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            try:
+                response = self.session.request(method, self.url(path), **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+                self._sleep(self.backoff_delay(attempt))
+                continue
+
+            if last or response.status_code not in RETRY_STATUSES:
+                return response
+            delay = self.backoff_delay(attempt, response)
+            response.close()
+            self._sleep(delay)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    def first_available(self, paths, max_workers=None):
+        """
+        (path, response) for whichever of paths answers 200 first
+
+        All paths are probed concurrently (up to max_workers at once,
+        POOL_SIZE by default); returns (None, None) when none of them do.
+        Probes still in flight are left to finish in the background.
+        """
+        paths = list(paths)
+        if not paths:
+            return None, None
+
+        pool = ThreadPoolExecutor(
+            max_workers=min(len(paths), max_workers or POOL_SIZE),
+            thread_name_prefix="api-probe",
+        )
+        pending = {pool.submit(self.get, path): path for path in paths}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        response = future.result()
+                    except requests.RequestException:
+                        continue
+                    if response.status_code == 200:
+                        return path, response
+            return None, None
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- users ----------
+
+    def list_users(
+        self,
+        page=None,
+        per_page=None,
+        after=None,
+        limit=None,
+        sort=None,
+        delay=None,
+        **filters,
+    ):
+        """GET /api/users; filters are exact matches, e.g. last_name="Bluth" """
+        params = {
+            "page": page,
+            "per_page": per_page,
+            "after": after,
+            "limit": limit,
+            "sort": sort,
+            "delay": delay,
+            **filters,
+        }
+        return self.get("/api/users", params=params)
+
+    def iter_users(self, prefetch=DEFAULT_PREFETCH, **params):
+        """Every user, walking the pages concurrently (see page_iterator.py)"""
+        return self._iter_records("/api/users", params, prefetch)
+
+    def get_user(self, user_id):
+        return self.get(f"/api/users/{user_id}")
+
+    def first_available_user(self, user_ids):
+        """
+        (response, user_id) for the first of user_ids found to exist
+
+        Probes them concurrently; (None, None) if none do.
+        """
+        paths = {f"/api/users/{user_id}": user_id for user_id in user_ids}
+        path, response = self.first_available(paths)
+        return response, paths.get(path)
+
+    def create_user(self, name=None, job=None, **fields):
+        """POST /api/users; fields may include email"""
+        return self.post("/api/users", json=given(name=name, job=job, **fields))
+
+    def update_user(self, user_id, name=None, job=None, **fields):
+        return self.put(
+            f"/api/users/{user_id}", json=given(name=name, job=job, **fields)
+        )
+
+    def patch_user(self, user_id, **fields):
+        return self.patch(f"/api/users/{user_id}", json=fields)
+
+    def delete_user(self, user_id):
+        return self.delete(f"/api/users/{user_id}")
+
+    def bulk_create_users(self, users):
+        """POST /api/users/bulk with a list of user bodies"""
+        return self.post("/api/users/bulk", json=list(users))
+
+    def bulk_patch_users(self, patches):
+        """PATCH /api/users/bulk with [{"id": N, ...fields}]"""
+        return self.patch("/api/users/bulk", json=list(patches))
+
+    def bulk_delete_users(self, user_ids):
+        return self.delete("/api/users/bulk", json=list(user_ids))
+
+    # ---------- resources ----------
+
+    def list_resources(self, page=None, per_page=None, after=None, limit=None):
+        params = {"page": page, "per_page": per_page, "after": after, "limit": limit}
+        return self.get("/api/unknown", params=params)
+
+    def iter_resources(self, prefetch=DEFAULT_PREFETCH, **params):
+        """Every resource, walking the pages concurrently"""
+        return self._iter_records("/api/unknown", params, prefetch)
+
+    def get_resource(self, resource_id):
+        return self.get(f"/api/unknown/{resource_id}")
+
+    def _iter_records(self, path, params, prefetch):
+        return iter_records(
+            self.session,
+            self.url(path),
+            params,
+            prefetch=prefetch,
+            timeout=self.timeout,
+            headers=self.headers(),
+        )
+
+    # ---------- auth ----------
+
+    def register(self, email=None, password=None):
+        return self.post("/api/register", json=given(email=email, password=password))
+
+    def login(self, email=None, password=None):
+        return self.post("/api/login", json=given(email=email, password=password))
+
+    # ---------- health ----------
+
+    def health(self):
+        return self.get("/health")
+
+    def metrics(self):
+        return self.get("/metrics")
+
+    # ---------- admin ----------
+
+    def load(self, collection, records):
+        """POST /__admin/load/{users|unknown} with records as NDJSON"""
+        lines = "".join(f"{json.dumps(record)}\n" for record in records)
+        return self.post(
+            f"/__admin/load/{collection}",
+            data=lines.encode(),
+            headers={"Content-Type": NDJSON},
+        )
+
+    def cache_stats(self):
+        return self.get("/__admin/cache")
+
+    def get_faults(self):
+        return self.get("/__admin/faults")
+
+    def set_faults(self, profile):
+        return self.put("/__admin/faults", json=profile)
+
+    def clear_faults(self):
+        return self.delete("/__admin/faults")
+
+    def tenants(self):
+        return self.get("/__admin/tenants")
+
+    def drop_tenant(self, name):
+        return self.delete(f"/__admin/tenants/{name}")
+
+    def snapshot(self, name=None):
+        return self.post("/__admin/snapshot", json={"name": name} if name else {})
+
+    def restore(self, name):
+        """POST /__admin/restore/{name}; sent once, like every POST"""
+        return self.post(f"/__admin/restore/{name}")
+
+    def drop_snapshot(self, name):
+        return self.delete(f"/__admin/snapshots/{name}")
+
+
+def given(**fields):
+    """Request body of the fields that aren't None"""
+    return {key: value for key, value in fields.items() if value is not None}
@@ -0,0 +1,207 @@
+"""
+ASGI entry point for the mock API server
+Serves the same Flask routes as mock_api_server.py, but ?delay=N and
+injected latency (see faults.py) are awaited on the event loop instead of
+sleeping in a worker thread
+
+Run with: python mock_api_server.py --async
+      or: uvicorn --app-dir src asgi_app:app
+"""
+
+import asyncio
+import io
+import sys
+from urllib.parse import parse_qsl, urlencode
+
+from werkzeug.exceptions import HTTPException
+
+from mock_api_server import (
+    FAULT_ENVIRON_KEY,
+    FAULTS,
+    RATE_LIMIT_ENVIRON_KEY,
+    rate_limit_environ,
+)
+from mock_api_server import app as flask_app
+
+# (method, path) pairs whose ?delay=N is handled here before dispatching
+DELAYED_ROUTES = {("GET", "/api/users")}
+
+
+def split_delay(query_string):
+    """
+    Pull ?delay=N out of a raw query string
+
+    Returns (delay, remaining_query). An unparsable delay is left in place
+    so the Flask route reports it exactly as it does in threaded mode.
+    """
+    params = parse_qsl(query_string, keep_blank_values=True)
+    delay = 0
+    remaining = []
+
+    for key, value in params:
+        if key != "delay":
+            remaining.append((key, value))
+            continue
+        try:
+            delay = int(value)
+        except ValueError:
+            return 0, query_string
+
+    return delay, urlencode(remaining)
+
+
+def match_endpoint(method, path):
+    """Flask endpoint name a request will be routed to, or None"""
+    try:
+        endpoint, _ = flask_app.url_map.bind("localhost").match(path, method=method)
+    except HTTPException:
+        return None
+    return endpoint
+
+
+def build_environ(scope, body, query_string):
+    """Translate an ASGI HTTP scope into a WSGI environ"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("127.0.0.1", 0)
+
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": query_string,
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+            continue
+        if name == "CONTENT_LENGTH":
+            continue
+
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    return environ
+
+
+def call_wsgi(environ):
+    """Run the Flask app for one request and return (status, headers, body)"""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = headers
+
+    chunks = flask_app(environ, start_response)
+    try:
+        body = b"".join(chunks)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+    return response["status"], response["headers"], body
+
+
+async def read_body(receive):
+    """Collect the full request body from ASGI http.request messages"""
+    body = b""
+    more_body = True
+
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+    return body
+
+
+async def lifespan(receive, send):
+    """Acknowledge ASGI lifespan startup/shutdown events"""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application wrapping the Flask routes"""
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    body = await read_body(receive)
+    query_string = scope.get("query_string", b"").decode("latin-1")
+    environ = build_environ(scope, body, query_string)
+
+    # In the order Flask applies them: rate limit, then faults, then ?delay=.
+    # Decisions are handed on so Flask doesn't make them again, and a 429
+    # draws no fault and waits for nothing
+    decision = rate_limit_environ(environ)
+    environ[RATE_LIMIT_ENVIRON_KEY] = decision
+    if decision is not None and not decision.allowed:
+        await respond(send, *call_wsgi(environ))
+        return
+
+    # Injected latency is awaited here so it costs no threads; Flask only
+    # applies the error status
+    endpoint = match_endpoint(scope["method"], scope["path"])
+    fault_delay, fault_status = FAULTS.draw(endpoint, scope["path"])
+    if fault_delay > 0:
+        await asyncio.sleep(fault_delay)
+    environ[FAULT_ENVIRON_KEY] = (fault_delay, fault_status)
+
+    # Same for ?delay=, so thousands of slow requests cost no threads
+    if fault_status is None and (scope["method"], scope["path"]) in DELAYED_ROUTES:
+        delay, remaining = split_delay(query_string)
+        if delay > 0:
+            await asyncio.sleep(delay)
+            environ["QUERY_STRING"] = remaining
+
+    # Handlers only touch in-memory data, so they run inline on the loop
+    await respond(send, *call_wsgi(environ))
+
+
+async def respond(send, status, headers, payload):
+    """Send a complete response as ASGI messages"""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in headers
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": payload})
+
+
+def serve(host="127.0.0.1", port=5000):
+    """Run the ASGI app with uvicorn (optional dependency)"""
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("Async mode needs an ASGI server: pip install uvicorn")
+
+    uvicorn.run(app, host=host, port=port, log_level="info")
@@ -0,0 +1,220 @@
+"""
+Minimal asyncio HTTP/1.1 client with a keep-alive connection pool
+
+Just enough HTTP for driving the mock server from replay/load tools without
+extra dependencies: Content-Length and chunked bodies, keep-alive reuse, a
+cap on open connections and a per-request timeout. No TLS, redirects or
+cookies.
+"""
+
+import asyncio
+import json
+from urllib.parse import urlencode, urlsplit
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_CONNECTIONS = 100
+
+
+class HTTPError(Exception):
+    """The server sent something that isn't a usable HTTP response"""
+
+
+class Response:
+    """Status, lower-cased headers and the full body of one response"""
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+    def __repr__(self):
+        return f"<Response {self.status} {len(self.body)} bytes>"
+
+
+async def read_headers(reader):
+    """Status code and header dict of the next response on a connection"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("Connection closed before a response")
+
+    parts = status_line.decode("latin-1").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise HTTPError(f"Bad status line: {status_line!r}")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    return parts[0], int(parts[1]), headers
+
+
+async def read_chunked(reader):
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+        if size == 0:
+            # Trailers, up to the blank line
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+async def read_response(reader, method):
+    """(Response, keep_alive) for the next response on a connection"""
+    version, status, headers = await read_headers(reader)
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" and (
+        version != "HTTP/1.0" or connection == "keep-alive"
+    )
+
+    if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+        body = b""
+    elif "chunked" in headers.get("transfer-encoding", "").lower():
+        body = await read_chunked(reader)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        keep_alive = False
+
+    return Response(status, headers, body), keep_alive
+
+
+class AsyncHTTPClient:
+    """
+    Pooled client for one base URL
+
+    At most max_connections requests are in flight; finished connections
+    are kept open and reused. Use as `async with AsyncHTTPClient(url) as c`.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        url = urlsplit(base_url)
+        if url.scheme != "http":
+            raise ValueError(f"Only http:// URLs are supported, got {base_url}")
+
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.base_path = url.path.rstrip("/")
+        self.timeout = timeout
+        self.connections_opened = 0
+
+        self._host_header = url.netloc
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close every idle connection"""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    def encode_request(self, method, path, query, body, headers):
+        target = self.base_path + path
+        if query:
+            target += "?" + (query if isinstance(query, str) else urlencode(query))
+
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {self._host_header}",
+            f"Content-Length: {len(body)}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+    async def request(
+        self, method, path, query=None, body=None, headers=None, json_body=None
+    ):
+        """
+        Send one request and read the whole response
+
+        body is bytes (or str); json_body is encoded as JSON instead.
+        query is a raw query string or a dict.
+        """
+        headers = dict(headers or {})
+        if json_body is not None:
+            body = json.dumps(json_body)
+            headers.setdefault("Content-Type", "application/json")
+        if isinstance(body, str):
+            body = body.encode()
+
+        payload = self.encode_request(method, path, query, body or b"", headers)
+
+        async with self._slots:
+            return await asyncio.wait_for(
+                self._exchange(method, payload), timeout=self.timeout
+            )
+
+    async def _exchange(self, method, payload):
+        # A pooled connection may have been closed by the server while idle:
+        # retry once on a fresh one if it fails before any response arrives
+        while True:
+            reused = bool(self._idle)
+            if reused:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                self.connections_opened += 1
+
+            try:
+                writer.write(payload)
+                await writer.drain()
+                response, keep_alive = await read_response(reader, method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return response
+
+    async def get(self, path, **kwargs):
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request("POST", path, **kwargs)
+
+    async def put(self, path, **kwargs):
+        return await self.request("PUT", path, **kwargs)
+
+    async def patch(self, path, **kwargs):
+        return await self.request("PATCH", path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.request("DELETE", path, **kwargs)
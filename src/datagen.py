@@ -0,0 +1,169 @@
+"""
+Deterministic synthetic dataset generator for scale testing
+Produces users and resources shaped like USERS / RESOURCES in mock_api_server.py
+
+Records are generated lazily and written in fixed-size chunks, so memory
+stays flat no matter how many rows are produced. The same seed, start id
+and count always give the same rows.
+
+Run with:
+    python datagen.py users 100000 --seed 42 --out users.jsonl
+    python datagen.py resources 5000 --out -
+    python datagen.py users 1000000 --url http://localhost:5000 --chunk-size 5000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from itertools import islice
+
+import requests
+
+# fmt: off
+FIRST_NAMES = [
+    "Adam", "Alice", "Bruno", "Chloe", "Dmitri", "Elena", "Farah", "George",
+    "Hana", "Ivan", "Janet", "Kofi", "Lena", "Marcus", "Nina", "Oscar",
+    "Priya", "Quinn", "Rachel", "Sven", "Tobias", "Uma", "Victor", "Wen",
+]
+# fmt: on
+
+# fmt: off
+LAST_NAMES = [
+    "Bluth", "Holt", "Morris", "Wong", "Ramos", "Ferguson", "Lawson", "Funke",
+    "Edwards", "Howell", "Nowak", "Kowalski", "Schmidt", "Rossi", "Tanaka",
+    "Okafor", "Silva", "Novak", "Jensen", "Murphy", "Dubois", "Garcia",
+]
+# fmt: on
+
+EMAIL_DOMAINS = ["gmail.com", "example.com", "reqres.in", "mail.test"]
+
+# fmt: off
+COLOR_NAMES = [
+    "cerulean", "fuchsia rose", "true red", "aqua sky", "tigerlily",
+    "blue turquoise", "sand dollar", "chili pepper", "blue iris", "mimosa",
+]
+# fmt: on
+
+# Collection name in the CLI -> admin load route on the server
+COLLECTIONS = {"users": "users", "resources": "unknown"}
+
+
+def generate_users(count, seed=0, start_id=1):
+    """Yield `count` user dicts with ids start_id, start_id + 1, ..."""
+    rng = random.Random(f"users:{seed}:{start_id}")
+
+    for user_id in range(start_id, start_id + count):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        domain = rng.choice(EMAIL_DOMAINS)
+
+        yield {
+            "id": user_id,
+            "email": f"{first_name}.{last_name}{user_id}@{domain}".lower(),
+            "first_name": first_name,
+            "last_name": last_name,
+            "avatar": f"https://reqres.in/img/faces/{user_id}-image.jpg",
+        }
+
+
+def generate_resources(count, seed=0, start_id=1):
+    """Yield `count` resource dicts with ids start_id, start_id + 1, ..."""
+    rng = random.Random(f"resources:{seed}:{start_id}")
+
+    for resource_id in range(start_id, start_id + count):
+        yield {
+            "id": resource_id,
+            "name": f"{rng.choice(COLOR_NAMES)} {resource_id}",
+            "year": rng.randint(2000, 2025),
+            "color": f"#{rng.randrange(0x1000000):06X}",
+            "pantone_value": f"{rng.randint(11, 19)}-{rng.randint(1000, 6999)}",
+        }
+
+
+GENERATORS = {"users": generate_users, "resources": generate_resources}
+
+
+def chunked(records, size):
+    """Split an iterable into lists of at most `size` items"""
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def to_ndjson(records):
+    """Encode a chunk of records as newline-delimited JSON"""
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def write_jsonl(records, out, chunk_size=10000):
+    """Stream records to a file object as JSON lines, returning the row count"""
+    written = 0
+    for chunk in chunked(records, chunk_size):
+        out.write(to_ndjson(chunk))
+        written += len(chunk)
+    return written
+
+
+def load_into_server(records, base_url, collection, chunk_size=5000, timeout=60):
+    """POST records to a running server in NDJSON chunks, returning the row count"""
+    url = f"{base_url}/__admin/load/{COLLECTIONS[collection]}"
+    loaded = 0
+
+    with requests.Session() as session:
+        for chunk in chunked(records, chunk_size):
+            response = session.post(
+                url,
+                data=to_ndjson(chunk).encode(),
+                headers={"Content-Type": "application/x-ndjson"},
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            loaded += len(chunk)
+
+    return loaded
+
+
+def parse_args(argv=None):
+    """Command line options for the generator"""
+    parser = argparse.ArgumentParser(description="Generate synthetic mock API data")
+    parser.add_argument("collection", choices=sorted(GENERATORS))
+    parser.add_argument("count", type=int, help="Number of records to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--start-id", type=int, default=1, help="First record id")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="JSONL file to write, or - for stdout")
+    target.add_argument("--url", help="Base URL of a running mock server to load")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    records = GENERATORS[args.collection](
+        args.count, seed=args.seed, start_id=args.start_id
+    )
+
+    started = time.perf_counter()
+    if args.url:
+        total = load_into_server(
+            records, args.url, args.collection, chunk_size=args.chunk_size
+        )
+    elif args.out == "-":
+        total = write_jsonl(records, sys.stdout, chunk_size=args.chunk_size)
+    else:
+        with open(args.out, "w", encoding="utf-8") as out:
+            total = write_jsonl(records, out, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"✅ Generated {total} {args.collection} in {elapsed:.2f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Latency and error injection for the mock API server
+
+A fault profile gives routes (by Flask endpoint name, "*" for all others)
+a latency distribution and an error rate:
+
+{
+  "seed": 42,
+  "routes": {
+    "get_users": {
+      "latency": {"dist": "lognormal", "p50_ms": 40, "p99_ms": 800},
+      "error_rate": 0.02,
+      "error_statuses": [500, 503]
+    },
+    "*": {"latency": {"dist": "uniform", "min_ms": 5, "max_ms": 20}}
+  }
+}
+
+Latency dists: fixed (ms), uniform (min_ms, max_ms), lognormal (p50_ms,
+p99_ms). Each route draws from its own generator seeded from "seed", so a
+run is reproducible per route no matter how requests to other routes
+interleave. Admin, health and metrics routes are never affected by "*".
+
+Load with --faults profile.json (or MOCK_API_FAULT_PROFILE), or at runtime
+through /__admin/faults.
+"""
+
+import json
+import math
+import random
+import threading
+
+# z-score of the 99th percentile of a standard normal
+Z_99 = 2.3263
+
+DEFAULT_ERROR_STATUSES = (500,)
+
+# Endpoints "*" never applies to, so probes and admin calls stay reliable
+EXEMPT_ENDPOINTS = {"health", "metrics", "static"}
+
+
+class InvalidProfile(ValueError):
+    """Raised when a fault profile can't be understood"""
+
+
+def number(config, key, minimum=0.0):
+    """A numeric setting from a profile dict, validated"""
+    try:
+        value = float(config[key])
+    except KeyError:
+        raise InvalidProfile(f"Missing {key!r} in {config}") from None
+    except (TypeError, ValueError):
+        raise InvalidProfile(f"{key!r} must be a number in {config}") from None
+    if value < minimum:
+        raise InvalidProfile(f"{key!r} must be at least {minimum} in {config}")
+    return value
+
+
+def fixed_latency(config):
+    delay = number(config, "ms") / 1000
+    return lambda rng: delay
+
+
+def uniform_latency(config):
+    low = number(config, "min_ms") / 1000
+    high = number(config, "max_ms") / 1000
+    if high < low:
+        raise InvalidProfile(f"max_ms is below min_ms in {config}")
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(config):
+    """Lognormal fitted to the median and 99th percentile"""
+    p50 = number(config, "p50_ms", minimum=0.001)
+    p99 = number(config, "p99_ms", minimum=p50)
+    mu = math.log(p50 / 1000)
+    sigma = (math.log(p99) - math.log(p50)) / Z_99
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+# "dist" value -> factory(config) returning sample(rng) -> seconds
+LATENCY_DISTS = {
+    "fixed": fixed_latency,
+    "uniform": uniform_latency,
+    "lognormal": lognormal_latency,
+}
+
+
+def error_statuses(config):
+    """The route's error_statuses, each a 4xx or 5xx HTTP status code"""
+    statuses = config.get("error_statuses", DEFAULT_ERROR_STATUSES)
+    if not isinstance(statuses, (list, tuple)) or not statuses:
+        raise InvalidProfile(f"error_statuses must be a non-empty list in {config}")
+    for status in statuses:
+        if isinstance(status, bool) or not isinstance(status, int):
+            raise InvalidProfile(f"error_statuses must be integers in {config}")
+        if not 400 <= status <= 599:
+            raise InvalidProfile(f"{status} is not an HTTP error status in {config}")
+    return list(statuses)
+
+
+class RouteFaults:
+    """Latency distribution and error rate for one route"""
+
+    def __init__(self, config, seed=None):
+        if not isinstance(config, dict):
+            raise InvalidProfile(f"Route settings must be an object, got {config!r}")
+        self.config = config
+
+        latency = config.get("latency")
+        self._sample_latency = None
+        if latency is not None:
+            if not isinstance(latency, dict):
+                raise InvalidProfile(f"latency must be an object in {config}")
+            dist = latency.get("dist")
+            if dist not in LATENCY_DISTS:
+                raise InvalidProfile(
+                    f"Unknown latency dist {dist!r} (use {', '.join(LATENCY_DISTS)})"
+                )
+            self._sample_latency = LATENCY_DISTS[dist](latency)
+
+        self.error_rate = number({"error_rate": 0, **config}, "error_rate")
+        if self.error_rate > 1:
+            raise InvalidProfile(f"error_rate must be at most 1 in {config}")
+        self.error_statuses = error_statuses(config)
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """(delay in seconds, error status or None) for one request"""
+        with self._lock:
+            delay = self._sample_latency(self._rng) if self._sample_latency else 0.0
+            status = None
+            if self.error_rate and self._rng.random() < self.error_rate:
+                status = self._rng.choice(self.error_statuses)
+        return delay, status
+
+
+class FaultInjector:
+    """The active fault profile, replaceable at runtime"""
+
+    def __init__(self, profile=None):
+        self.load(profile or {})
+
+    def load(self, profile):
+        """Validate and switch to a new profile (atomically)"""
+        if not isinstance(profile, dict) or not isinstance(
+            profile.get("routes", {}), dict
+        ):
+            raise InvalidProfile('Expected {"seed": ..., "routes": {...}}')
+
+        seed = profile.get("seed")
+        routes = {
+            endpoint: RouteFaults(
+                config, seed=None if seed is None else f"{seed}:{endpoint}"
+            )
+            for endpoint, config in profile.get("routes", {}).items()
+        }
+
+        self.profile = profile
+        self._routes = routes
+
+    def load_file(self, path):
+        with open(path, encoding="utf-8") as profile_file:
+            self.load(json.load(profile_file))
+
+    def clear(self):
+        self.load({})
+
+    def for_endpoint(self, endpoint, path=""):
+        """RouteFaults for a request, or None when it runs unmodified"""
+        routes = self._routes
+        if endpoint in routes:
+            return routes[endpoint]
+        if endpoint is None or endpoint in EXEMPT_ENDPOINTS or path.startswith("/__"):
+            return None
+        return routes.get("*")
+
+    def draw(self, endpoint, path=""):
+        """(delay in seconds, error status or None) for a request"""
+        route = self.for_endpoint(endpoint, path)
+        if route is None:
+            return 0.0, None
+        return route.draw()
@@ -0,0 +1,144 @@
+"""
+Secondary indexes for the record store
+
+- HashIndex: value -> ids, for exact-match filters (?email=); optionally
+  unique, rejecting a second record with the same value
+- SortedIndex: (value, id) pairs in sort order, for exact-match filters
+  and ?sort= on that field, at O(log n + k) per lookup
+
+Values are indexed as strings (query parameters are strings, and mixed
+types could not be ordered). Store keeps the indexes in step with every
+put/update/delete, see store.py.
+"""
+
+from bisect import bisect_left, insort
+from math import inf
+from operator import itemgetter
+
+from pagination import SliceView
+
+
+class DuplicateKey(ValueError):
+    """Raised when a write would give two records the same unique value"""
+
+    def __init__(self, field, value, record_id):
+        super().__init__(f"{field} {value!r} is already used by record {record_id}")
+        self.field = field
+        self.value = value
+        self.record_id = record_id
+
+    def __reduce__(self):
+        # Keep the fields when passed between processes (prefork store proxy)
+        return DuplicateKey, (self.field, self.value, self.record_id)
+
+
+def index_key(value):
+    """How a field value is indexed (None is not indexed)"""
+    return None if value is None else str(value)
+
+
+class HashIndex:
+    """Exact-match index from a field's value to the ids holding it"""
+
+    def __init__(self, field, unique=False):
+        self.field = field
+        self.unique = unique
+        # value -> id, or a set of ids once several records share it (one
+        # int per value instead of a set keeps big indexes quick to build)
+        self._ids = {}
+
+    def empty(self):
+        """New index of the same kind, holding nothing"""
+        return HashIndex(self.field, unique=self.unique)
+
+    def _holders(self, value):
+        holders = self._ids.get(value)
+        if holders is None:
+            return ()
+        return holders if isinstance(holders, set) else (holders,)
+
+    def check(self, record_id, value):
+        """Raise DuplicateKey if a unique value is held by another record"""
+        if not self.unique or value is None:
+            return
+        for holder in self._holders(value):
+            if holder != record_id:
+                raise DuplicateKey(self.field, value, holder)
+
+    def add(self, record_id, value):
+        if value is None:
+            return
+        holders = self._ids.get(value)
+        if holders is None:
+            self._ids[value] = record_id
+        elif isinstance(holders, set):
+            holders.add(record_id)
+        elif holders != record_id:
+            self._ids[value] = {holders, record_id}
+
+    def discard(self, record_id, value):
+        holders = self._ids.get(value)
+        if holders is None:
+            return
+        if not isinstance(holders, set):
+            if holders == record_id:
+                del self._ids[value]
+            return
+        holders.discard(record_id)
+        if len(holders) == 1:
+            self._ids[value] = holders.pop()
+
+    def extend(self, pairs):
+        """Index many (id, value) pairs at once"""
+        for record_id, value in pairs:
+            self.add(record_id, value)
+
+    def lookup(self, value):
+        """Ids with field == value, ascending"""
+        return sorted(self._holders(value))
+
+
+class SortedIndex:
+    """Ordered (value, id) pairs for one field"""
+
+    def __init__(self, field):
+        self.field = field
+        self.unique = False
+        self._entries = []
+
+    def empty(self):
+        """New index of the same kind, holding nothing"""
+        return SortedIndex(self.field)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def check(self, record_id, value):
+        """Sorted indexes never reject a write"""
+
+    def add(self, record_id, value):
+        # Missing values sort first, so every record shows up in sorted pages
+        insort(self._entries, (value or "", record_id))
+
+    def extend(self, pairs):
+        """Index many (id, value) pairs with one sort instead of n inserts"""
+        self._entries.extend((value or "", record_id) for record_id, value in pairs)
+        self._entries.sort()
+
+    def discard(self, record_id, value):
+        entry = (value or "", record_id)
+        entries = self._entries
+        pos = bisect_left(entries, entry)
+        if pos < len(entries) and entries[pos] == entry:
+            del entries[pos]
+
+    def lookup(self, value):
+        """Ids with field == value, ascending"""
+        entries = self._entries
+        start = bisect_left(entries, (value, -inf))
+        end = bisect_left(entries, (value, inf), start)
+        return [record_id for _, record_id in entries[start:end]]
+
+    def ordered(self, descending=False):
+        """All ids sorted by (value, id), as a view pages can be sliced from"""
+        return SliceView(self._entries, descending, id_of=itemgetter(1))
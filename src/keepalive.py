@@ -0,0 +1,171 @@
+"""
+HTTP/1.1 persistent connections for the Werkzeug server
+
+Werkzeug's request handler closes the connection after every response:
+a request body the app didn't read would otherwise be parsed as the start
+of the next request, so it sends "Connection: close" and then discards
+whatever else is waiting on the socket. KeepAliveRequestHandler replaces
+that response loop: wsgi.input is limited to Content-Length, whatever the
+app leaves unread is skipped after the response, and the connection stays
+open for the next request. Chunked request bodies, HTTP/1.0 clients and
+"Connection: close" still close it.
+
+Idle connections are closed after IDLE_TIMEOUT seconds. Only use it with
+threaded servers: a single-threaded one would serve just one client at a
+time until that client disconnects.
+
+    app.run(threaded=True, request_handler=KeepAliveRequestHandler)
+    make_server(host, port, app, threaded=True,
+                request_handler=KeepAliveRequestHandler)
+"""
+
+import socket
+import traceback
+
+from werkzeug.exceptions import InternalServerError
+from werkzeug.serving import WSGIRequestHandler
+from werkzeug.wsgi import LimitedStream
+
+# Seconds an idle connection (or a stalled read) is kept open
+IDLE_TIMEOUT = 15
+
+# Responses that never have a body
+BODILESS_STATUSES = {204, 304}
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """WSGIRequestHandler that keeps HTTP/1.1 connections open"""
+
+    protocol_version = "HTTP/1.1"
+    timeout = IDLE_TIMEOUT
+    # Headers and body go out in separate writes; with Nagle on, a reused
+    # connection waits for the client's delayed ACK (~40ms) in between
+    disable_nagle_algorithm = True
+
+    def make_environ(self):
+        environ = super().make_environ()
+
+        if environ.get("wsgi.input_terminated"):
+            # Chunked: where the body ends is only known by reading it all
+            self.close_connection = True
+        else:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            environ["wsgi.input"] = LimitedStream(environ["wsgi.input"], length)
+
+        return environ
+
+    def run_wsgi(self):
+        if self.headers.get("Expect", "").lower().strip() == "100-continue":
+            self.wfile.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+        self.environ = environ = self.make_environ()
+        # Kept, as middleware may swap environ["wsgi.input"] for its own copy
+        stream = environ["wsgi.input"]
+        response = ResponseWriter(self)
+
+        try:
+            response.execute(self.server.app)
+        except (ConnectionError, socket.timeout) as error:
+            self.close_connection = True
+            self.connection_dropped(error, environ)
+            return
+        except Exception:
+            if self.server.passthrough_errors:
+                raise
+            self.close_connection = True
+            if not response.headers_sent:
+                try:
+                    ResponseWriter(self).execute(InternalServerError())
+                except Exception:
+                    pass
+            self.server.log("error", f"Error on request:\n{traceback.format_exc()}")
+            return
+
+        # Skip any body the app didn't read so the next request starts cleanly
+        if not self.close_connection:
+            stream.exhaust()
+
+    def log_error(self, format, *args):
+        # An idle keep-alive connection timing out is routine, not an error
+        if format.startswith("Request timed out"):
+            return
+        super().log_error(format, *args)
+
+
+class ResponseWriter:
+    """start_response / write for one response on a kept-alive connection"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.status = None
+        self.headers = None
+        self.headers_sent = False
+        self.chunked = False
+
+    def start_response(self, status, headers, exc_info=None):
+        if exc_info:
+            try:
+                if self.headers_sent:
+                    raise exc_info[1].with_traceback(exc_info[2])
+            finally:
+                exc_info = None
+        elif self.status is not None:
+            raise AssertionError("Headers already set")
+        self.status = status
+        self.headers = headers
+        return self.write
+
+    def send_headers(self):
+        handler = self.handler
+        code_text, _, reason = self.status.partition(" ")
+        code = int(code_text)
+
+        handler.send_response(code, reason)
+        names = set()
+        for name, value in self.headers:
+            handler.send_header(name, value)
+            names.add(name.lower())
+
+        has_body = not (
+            handler.command == "HEAD" or code < 200 or code in BODILESS_STATUSES
+        )
+        if has_body and "content-length" not in names:
+            # Without a length the end of the body must be marked somehow
+            if handler.request_version >= "HTTP/1.1":
+                self.chunked = True
+                handler.send_header("Transfer-Encoding", "chunked")
+            else:
+                handler.close_connection = True
+
+        if handler.close_connection:
+            handler.send_header("Connection", "close")
+        handler.end_headers()
+        self.headers_sent = True
+
+    def write(self, data):
+        if self.status is None:
+            raise AssertionError("write() before start_response()")
+        if not self.headers_sent:
+            self.send_headers()
+
+        wfile = self.handler.wfile
+        if data:
+            if self.chunked:
+                wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            else:
+                wfile.write(data)
+        wfile.flush()
+
+    def execute(self, app):
+        body = app(self.handler.environ, self.start_response)
+        try:
+            for data in body:
+                self.write(data)
+            if not self.headers_sent:
+                self.write(b"")
+            if self.chunked:
+                self.handler.wfile.write(b"0\r\n\r\n")
+                self.handler.wfile.flush()
+        finally:
+            if hasattr(body, "close"):
+                body.close()
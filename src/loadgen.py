@@ -0,0 +1,319 @@
+"""
+Load generator for the mock API server
+
+Run with: python src/loadgen.py --url http://localhost:5000 --duration 30
+
+Sends a weighted mix of the user and login routes over pooled keep-alive
+connections (async_http.py), in one of two modes:
+
+  closed loop (default): --concurrency N clients, each sending its next
+      request as soon as the previous one finishes. Throughput is whatever
+      the server sustains at that concurrency.
+  open loop: --rate R requests per second on a fixed schedule, whether or
+      not earlier ones have finished. Latency is measured from the
+      scheduled send time, so a server falling behind shows up as latency
+      instead of a quietly lower send rate.
+
+--mix sets route weights, e.g. --mix get_user=8,list_users=2. Writes only
+target users created during the run (or ids that don't exist), so seed
+users are never modified. Prints throughput, latency percentiles, statuses
+and errors overall and per route; --json prints the same as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+
+from async_http import DEFAULT_TIMEOUT, AsyncHTTPClient
+from loadstats import Results, format_summary
+
+# Route -> default weight
+DEFAULT_MIX = {
+    "list_users": 20,
+    "get_user": 40,
+    "create_user": 10,
+    "update_user": 5,
+    "patch_user": 10,
+    "delete_user": 5,
+    "login": 10,
+}
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_DURATION = 10.0
+
+# Built-in users, read by get_user
+SEED_USER_IDS = 12
+
+# Write routes use it until the run has created users of its own
+MISSING_USER_ID = 999_999_999
+
+
+def parse_mix(value):
+    """{route: weight} from "route=weight,..." (an argparse type)"""
+    mix = {}
+    for part in value.split(","):
+        route, _, weight = part.strip().partition("=")
+        if route not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(
+                f"Unknown route {route!r} (use {', '.join(DEFAULT_MIX)})"
+            )
+        try:
+            mix[route] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"Bad weight in {part!r}, expected route=number"
+            ) from None
+        if not 0 <= mix[route] < math.inf:
+            raise argparse.ArgumentTypeError(
+                f"Weight in {part!r} must be a finite number >= 0"
+            )
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("The mix needs at least one positive weight")
+    return mix
+
+
+class Workload:
+    """Picks the next request from the mix and tracks users it created"""
+
+    def __init__(self, mix=None, seed=None, max_user_id=SEED_USER_IDS):
+        mix = DEFAULT_MIX if mix is None else mix
+        self.routes = [route for route, weight in mix.items() if weight > 0]
+        self.weights = [mix[route] for route in self.routes]
+        self.max_user_id = max_user_id
+        self.created = []
+        self._rng = random.Random(seed)
+        self._count = 0
+
+    def _own_user(self):
+        if self.created:
+            return self._rng.choice(self.created)
+        return MISSING_USER_ID
+
+    def next_request(self):
+        """(route, method, path, query, json_body) for the next request"""
+        rng = self._rng
+        route = rng.choices(self.routes, self.weights)[0]
+        self._count += 1
+        tag = f"load{self._count}"
+
+        if route == "list_users":
+            return route, "GET", "/api/users", {"page": rng.randint(1, 2)}, None
+        if route == "get_user":
+            user_id = rng.randint(1, self.max_user_id)
+            return route, "GET", f"/api/users/{user_id}", None, None
+        if route == "create_user":
+            body = {"name": f"Load {tag}", "job": "tester"}
+            return route, "POST", "/api/users", None, body
+        if route == "update_user":
+            body = {"name": f"Load {tag}", "job": "updated"}
+            return route, "PUT", f"/api/users/{self._own_user()}", None, body
+        if route == "patch_user":
+            body = {"job": "patched"}
+            return route, "PATCH", f"/api/users/{self._own_user()}", None, body
+        if route == "delete_user":
+            user_id = self.created.pop() if self.created else MISSING_USER_ID
+            return route, "DELETE", f"/api/users/{user_id}", None, None
+        body = {"email": "eve.holt@reqres.in", "password": "cityslicka"}
+        return route, "POST", "/api/login", None, body
+
+    def completed(self, route, response):
+        if route == "create_user" and response.status == 201:
+            self.created.append(int(response.json()["id"]))
+
+
+class Run:
+    """Results of a run, overall and per route"""
+
+    def __init__(self):
+        self.overall = Results()
+        self.routes = {}
+
+    def add(self, route, seconds, status=None, error=None):
+        self.overall.add(seconds, status=status, error=error)
+        self.routes.setdefault(route, Results()).add(
+            seconds, status=status, error=error
+        )
+
+    def summary(self, elapsed):
+        summary = self.overall.summary(elapsed)
+        summary["routes"] = {
+            route: results.summary(elapsed)
+            for route, results in sorted(self.routes.items())
+        }
+        return summary
+
+
+async def send(client, workload, run, scheduled):
+    route, method, path, query, body = workload.next_request()
+    try:
+        response = await client.request(method, path, query=query, json_body=body)
+    except (OSError, asyncio.TimeoutError, ValueError) as error:
+        run.add(route, 0, error=error)
+        return
+    run.add(route, time.perf_counter() - scheduled, status=response.status)
+    workload.completed(route, response)
+
+
+async def closed_loop(client, workload, run, concurrency, deadline, requests):
+    sent = 0
+
+    async def user():
+        nonlocal sent
+        while time.perf_counter() < deadline and (requests is None or sent < requests):
+            sent += 1
+            await send(client, workload, run, time.perf_counter())
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+
+
+async def open_loop(client, workload, run, rate, deadline, requests):
+    started = time.perf_counter()
+    tasks = set()
+    sent = 0
+
+    while requests is None or sent < requests:
+        scheduled = started + sent / rate
+        if scheduled >= deadline:
+            break
+        wait = scheduled - time.perf_counter()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        task = asyncio.create_task(send(client, workload, run, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        sent += 1
+
+    await asyncio.gather(*tasks)
+
+
+async def generate_load(
+    url,
+    mix=None,
+    rate=None,
+    concurrency=DEFAULT_CONCURRENCY,
+    duration=DEFAULT_DURATION,
+    requests=None,
+    timeout=DEFAULT_TIMEOUT,
+    seed=None,
+):
+    """
+    Drive url with the mix; returns the summary dict
+
+    With rate, runs open loop (concurrency caps open connections);
+    otherwise closed loop with concurrency clients. Stops after duration
+    seconds or `requests` requests, whichever comes first.
+    """
+    workload = Workload(mix, seed=seed)
+    run = Run()
+
+    started = time.perf_counter()
+    deadline = started + duration
+    async with AsyncHTTPClient(
+        url, max_connections=concurrency, timeout=timeout
+    ) as client:
+        if rate:
+            await open_loop(client, workload, run, rate, deadline, requests)
+        else:
+            await closed_loop(client, workload, run, concurrency, deadline, requests)
+    elapsed = time.perf_counter() - started
+
+    summary = run.summary(elapsed)
+    summary["mode"] = "open" if rate else "closed"
+    summary["target_rps"] = rate
+    summary["concurrency"] = concurrency
+    summary["connections_opened"] = client.connections_opened
+    return summary
+
+
+def format_routes(summary):
+    """Per-route table for the text report"""
+    columns = ("p50", "p95", "p99", "max")
+    lines = [
+        f"{'route':<12} {'requests':>8} {'errors':>6} "
+        + " ".join(f"{name:>8}" for name in columns)
+    ]
+    for route, stats in summary["routes"].items():
+        errors = stats["failed"] + sum(
+            n for status, n in stats["statuses"].items() if int(status) >= 400
+        )
+        latency = stats["latency_ms"]
+        lines.append(
+            f"{route:<12} {stats['requests']:>8} {errors:>6} "
+            + " ".join(f"{latency[name]:>8.2f}" for name in columns)
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the mock API server")
+    parser.add_argument("--url", default="http://localhost:5000", help="Server to load")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Open loop: requests per second (default: closed loop)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Closed loop clients; open loop connection limit",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=DEFAULT_DURATION, help="Seconds to run"
+    )
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        help=f"Route weights, e.g. get_user=8,login=2 (routes: {', '.join(DEFAULT_MIX)})",
+    )
+    parser.add_argument("--seed", type=int, help="Seed for a repeatable request mix")
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds per request"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args(argv)
+    if (
+        args.concurrency < 1
+        or args.duration <= 0
+        or (args.rate is not None and args.rate <= 0)
+    ):
+        parser.error("--concurrency, --duration and --rate must be positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = asyncio.run(
+        generate_load(
+            args.url,
+            mix=args.mix,
+            rate=args.rate,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            requests=args.requests,
+            timeout=args.timeout,
+            seed=args.seed,
+        )
+    )
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        if args.rate:
+            mode = f"open loop, {args.rate:g} req/s"
+        else:
+            mode = f"closed loop, {args.concurrency} clients"
+        print(format_summary(summary, title=f"Load test of {args.url} ({mode})"))
+        print()
+        print(format_routes(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
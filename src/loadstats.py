@@ -0,0 +1,97 @@
+"""
+Latency and throughput summaries for the replay and load tools
+
+Results collects one sample per request; summary() reduces them to a
+JSON-friendly dict and format_summary() renders that for a terminal.
+"""
+
+import math
+from collections import Counter
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+class Results:
+    """Latencies, statuses and errors of a run"""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = Counter()
+
+    def add(self, seconds, status=None, error=None):
+        """
+        Record one request: its status, or the exception that stopped it
+
+        Failed requests count towards errors, not towards latency.
+        """
+        if error is not None:
+            self.errors[type(error).__name__] += 1
+            return
+        self.latencies.append(seconds)
+        self.statuses[status] += 1
+
+    def __len__(self):
+        return len(self.latencies) + sum(self.errors.values())
+
+    def summary(self, elapsed):
+        """Totals, throughput and latency percentiles (ms) for a run"""
+        latencies = sorted(self.latencies)
+        completed = len(latencies)
+        server_errors = sum(
+            count for status, count in self.statuses.items() if status >= 500
+        )
+
+        latency_ms = {"min": latencies[0] * 1000 if latencies else 0.0}
+        for pct in PERCENTILES:
+            latency_ms[f"p{pct}"] = percentile(latencies, pct) * 1000
+        latency_ms["max"] = latencies[-1] * 1000 if latencies else 0.0
+        latency_ms["mean"] = sum(latencies) / completed * 1000 if completed else 0.0
+
+        return {
+            "requests": len(self),
+            "completed": completed,
+            "failed": sum(self.errors.values()),
+            "server_errors": server_errors,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(completed / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": {name: round(ms, 3) for name, ms in latency_ms.items()},
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+            "errors": dict(self.errors.most_common()),
+        }
+
+
+def format_summary(summary, title="Results"):
+    """Human-readable rendering of a summary() dict"""
+    latency = summary["latency_ms"]
+    lines = [
+        f"{title}",
+        "=" * 60,
+        f"Requests:    {summary['requests']} in {summary['elapsed_s']:.2f}s "
+        f"({summary['failed']} failed, {summary['server_errors']} 5xx)",
+        f"Throughput:  {summary['throughput_rps']:.1f} req/s",
+        "Latency ms:  "
+        + "  ".join(
+            f"{name} {latency[name]:.2f}"
+            for name in ("min", *(f"p{pct}" for pct in PERCENTILES), "max")
+        ),
+        "Statuses:    "
+        + (
+            ", ".join(f"{status}: {n}" for status, n in summary["statuses"].items())
+            or "-"
+        ),
+    ]
+    if summary["errors"]:
+        lines.append(
+            "Errors:      "
+            + ", ".join(f"{name}: {n}" for name, n in summary["errors"].items())
+        )
+    return "\n".join(lines)
@@ -0,0 +1,200 @@
+"""
+Request metrics for the mock API server, served as Prometheus text
+
+Per route: request counts by method and status, requests in flight, and a
+fixed-bucket latency histogram.
+
+Recording is a few dict updates on a shard taken from a pool: each request
+pops a shard, updates it and pushes it back (deque pop/append are atomic),
+so concurrent requests never share a shard and never take a lock. There
+are only as many shards as requests ever ran at once. Scrapes add the
+shards up.
+
+instrument(app, metrics) wraps every route through Flask request hooks;
+GET /metrics renders the totals.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+
+from flask import g, request
+
+# Histogram upper bounds in seconds (+Inf is implied)
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Label for requests that matched no route (404s, bad methods)
+UNMATCHED = "unmatched"
+
+
+class Shard:
+    """One pooled set of counters, only ever used by one request at a time"""
+
+    __slots__ = ("requests", "in_flight", "latency")
+
+    def __init__(self):
+        # (endpoint, method, status) -> count
+        self.requests = defaultdict(int)
+        # endpoint -> requests started minus finished (may be negative here)
+        self.in_flight = defaultdict(int)
+        # endpoint -> [count per bucket..., +Inf count, sum of seconds]
+        self.latency = {}
+
+
+class Metrics:
+    """Sharded request counters and latency histograms"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._free = deque()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._free.pop()
+        except IndexError:
+            shard = Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def begin(self, endpoint):
+        """Count a request as in flight"""
+        shard = self._acquire()
+        shard.in_flight[endpoint] += 1
+        self._free.append(shard)
+
+    def observe(self, endpoint, method, status, seconds):
+        """Record a finished request"""
+        shard = self._acquire()
+        shard.in_flight[endpoint] -= 1
+        shard.requests[endpoint, method, status] += 1
+
+        histogram = shard.latency.get(endpoint)
+        if histogram is None:
+            histogram = shard.latency[endpoint] = [0] * (len(self.buckets) + 2)
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+        self._free.append(shard)
+
+    def totals(self):
+        """(requests, in_flight, latency) summed over all shards"""
+        with self._shards_lock:
+            shards = list(self._shards)
+
+        requests = defaultdict(int)
+        in_flight = defaultdict(int)
+        latency = {}
+        for shard in shards:
+            # dict.copy() is atomic, so a shard can be read while in use
+            for key, count in shard.requests.copy().items():
+                requests[key] += count
+            for endpoint, count in shard.in_flight.copy().items():
+                in_flight[endpoint] += count
+            for endpoint, histogram in shard.latency.copy().items():
+                merged = latency.setdefault(endpoint, [0] * len(histogram))
+                for n, value in enumerate(list(histogram)):
+                    merged[n] += value
+
+        return requests, in_flight, latency
+
+    def render(self, gauges=()):
+        """
+        Prometheus text exposition of everything recorded
+
+        gauges adds (name, help, {label tuple: value}) entries, with label
+        tuples of (name, value) pairs, e.g. store sizes.
+        """
+        requests, in_flight, latency = self.totals()
+        lines = []
+
+        lines += header("mock_api_requests_total", "Requests handled", "counter")
+        for (endpoint, method, status), count in sorted(requests.items()):
+            labels = (("endpoint", endpoint), ("method", method), ("status", status))
+            lines.append(sample("mock_api_requests_total", labels, count))
+
+        lines += header("mock_api_requests_in_flight", "Requests in progress", "gauge")
+        for endpoint, count in sorted(in_flight.items()):
+            lines.append(
+                sample("mock_api_requests_in_flight", (("endpoint", endpoint),), count)
+            )
+
+        name = "mock_api_request_duration_seconds"
+        lines += header(name, "Request latency", "histogram")
+        for endpoint, histogram in sorted(latency.items()):
+            cumulative = 0
+            bounds = [*map(str, self.buckets), "+Inf"]
+            for bound, count in zip(bounds, histogram):
+                cumulative += count
+                labels = (("endpoint", endpoint), ("le", bound))
+                lines.append(sample(f"{name}_bucket", labels, cumulative))
+            labels = (("endpoint", endpoint),)
+            lines.append(sample(f"{name}_sum", labels, histogram[-1]))
+            lines.append(sample(f"{name}_count", labels, cumulative))
+
+        for gauge_name, help_text, values in gauges:
+            lines += header(gauge_name, help_text, "gauge")
+            for labels, value in values.items():
+                lines.append(sample(gauge_name, labels, value))
+
+        return "\n".join(lines) + "\n"
+
+
+def header(name, help_text, kind):
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def sample(name, labels, value):
+    """One exposition line, e.g. name{a="b"} 3"""
+    if labels:
+        rendered = ",".join(f'{key}="{escape(val)}"' for key, val in labels)
+        name = f"{name}{{{rendered}}}"
+    return f"{name} {value}"
+
+
+def instrument(app, metrics):
+    """
+    Record every request to app in metrics
+
+    Call before registering other before_request hooks, so time they spend
+    (rate limiting, injected latency) is part of the measured latency.
+    """
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+        metrics.begin(request.endpoint or UNMATCHED)
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            metrics.observe(
+                request.endpoint or UNMATCHED,
+                request.method,
+                response.status_code,
+                time.perf_counter() - started,
+            )
+        return response
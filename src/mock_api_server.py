@@ -4,16 +4,77 @@ This mimics ReqRes.in API for testing purposes
 
 Run with: python mock_api_server.py
 API will be available at: http://localhost:5000
+
+Async mode (non-blocking ?delay=N, needs uvicorn): python mock_api_server.py --async
+Multi-worker mode (pre-forked, shared store): python mock_api_server.py --workers 4
+Persistent data (snapshot + write-ahead log): python mock_api_server.py --data-dir ./data
+Record traffic for replay.py: python mock_api_server.py --record traffic.jsonl
+Isolated data per client: send an X-Mock-Tenant: <name> header (see tenants.py)
 """
 
+import argparse
+import atexit
+import hashlib
+import sys
+import time
+import uuid
 from datetime import datetime
 
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
+
+from faults import FaultInjector, InvalidProfile
+from indexes import DuplicateKey, HashIndex, SortedIndex
+from keepalive import KeepAliveRequestHandler
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from metrics import Metrics, instrument
+from pagination import (
+    DEFAULT_PER_PAGE,
+    InvalidCursor,
+    InvalidQuery,
+    decode_cursor,
+    parse_sort,
+)
+from ratelimit import DEFAULT_MAX_CLIENTS, RateLimiter, parse_key_spec
+from recording import RecordingMiddleware, TrafficRecorder
+from response_cache import COMPRESSORS, DEFAULT_MAX_ENTRIES, ResponseCache
+from serialization import BackendJSONProvider, get_backend
+from store import Store
+from tenants import DEFAULT_MAX_TENANTS, TENANT_HEADER, InvalidTenant, Tenants
 
 app = Flask(__name__)
 
-# In-memory database
-USERS = {
+# Defaults, overridable with MOCK_API_* environment variables
+# e.g. MOCK_API_MAX_PER_PAGE=500
+app.config.from_mapping(
+    DEFAULT_PER_PAGE=DEFAULT_PER_PAGE,
+    MAX_PER_PAGE=100,
+    RESPONSE_CACHE_SIZE=DEFAULT_MAX_ENTRIES,
+    COMPRESSION_MIN_SIZE=1024,
+    COMPRESSION_LEVEL=6,
+    SNAPSHOT_INTERVAL=300,
+    WAL_FSYNC=False,
+    JSON_BACKEND="auto",
+    FAULT_PROFILE=None,
+    RATE_LIMIT_RATE=0,
+    RATE_LIMIT_BURST=None,
+    RATE_LIMIT_KEY="ip",
+    RATE_LIMIT_MAX_CLIENTS=DEFAULT_MAX_CLIENTS,
+    RECORD_TRAFFIC=None,
+    MAX_TENANTS=DEFAULT_MAX_TENANTS,
+)
+app.config.from_prefixed_env("MOCK_API")
+
+# jsonify, request.get_json and cached bodies all encode through app.json
+app.json = BackendJSONProvider(app)
+app.json.backend = get_backend(app.config["JSON_BACKEND"])
+
+# Per-route request metrics for GET /metrics; hooked in before anything
+# else so rate limiting and injected latency are measured too
+METRICS = Metrics()
+instrument(app, METRICS)
+
+# Seed data, loaded into the in-memory stores below
+SEED_USERS = {
     1: {
         "id": 1,
         "email": "user1@gmail.com",
@@ -100,7 +161,7 @@ USERS = {
     },
 }
 
-RESOURCES = {
+SEED_RESOURCES = {
     1: {
         "id": 1,
         "name": "resource1",
@@ -145,101 +206,451 @@ RESOURCES = {
     },
 }
 
-next_user_id = 13
+# In-memory database
+
+
+def user_indexes():
+    """Secondary indexes behind ?email=, ?last_name= and ?sort= on /api/users"""
+    return {
+        "email": HashIndex("email", unique=True),
+        "first_name": SortedIndex("first_name"),
+        "last_name": SortedIndex("last_name"),
+    }
+
+
+USERS = Store(SEED_USERS, indexes=user_indexes())
+RESOURCES = Store(SEED_RESOURCES)
+
+# X-Mock-Tenant namespaces, forked from seed stores that are never written
+TENANTS = Tenants(
+    {
+        "users": Store(SEED_USERS, indexes=user_indexes()),
+        "resources": Store(SEED_RESOURCES),
+    },
+    max_tenants=app.config["MAX_TENANTS"],
+)
+
+
+def init_persistence(data_dir):
+    """
+    Swap the in-memory stores for ones persisted under data_dir
+
+    Returns the (not yet started) background thread that writes snapshots.
+    """
+    global USERS, RESOURCES
+    from persistence import Compactor, open_store
+
+    fsync = app.config["WAL_FSYNC"]
+    USERS = open_store(
+        data_dir, "users", SEED_USERS, fsync=fsync, indexes=user_indexes()
+    )
+    RESOURCES = open_store(data_dir, "resources", SEED_RESOURCES, fsync=fsync)
+
+    return Compactor(
+        {"users": USERS, "resources": RESOURCES},
+        data_dir,
+        interval=app.config["SNAPSHOT_INTERVAL"],
+    )
+
+
+# Encoded bodies for hot GET routes, invalidated by the write routes
+RESPONSE_CACHE = ResponseCache(max_entries=app.config["RESPONSE_CACHE_SIZE"])
+
+# Injected latency / errors per route, see faults.py
+FAULTS = FaultInjector()
+if app.config["FAULT_PROFILE"]:
+    FAULTS.load_file(app.config["FAULT_PROFILE"])
+
+# Set by asgi_app to a (delay, status) draw whose delay it already awaited
+FAULT_ENVIRON_KEY = "mock_api.fault"
+
+# Token buckets per client, see ratelimit.py (off while the rate is 0)
+RATE_LIMITER = None
+if app.config["RATE_LIMIT_RATE"]:
+    RATE_LIMITER = RateLimiter(
+        rate=app.config["RATE_LIMIT_RATE"],
+        burst=app.config["RATE_LIMIT_BURST"],
+        max_clients=app.config["RATE_LIMIT_MAX_CLIENTS"],
+    )
+RATE_LIMIT_KEY = parse_key_spec(app.config["RATE_LIMIT_KEY"])
+
+# Set by asgi_app to the decision it already made (None: not limited)
+RATE_LIMIT_ENVIRON_KEY = "mock_api.rate_limit"
+
+# Every request logged to a JSONL file for replay.py, see recording.py
+RECORDER = None
+
+
+def start_recording(path):
+    """Record all traffic to path from now on"""
+    global RECORDER
+
+    RECORDER = TrafficRecorder(path)
+    app.wsgi_app = RecordingMiddleware(app.wsgi_app, RECORDER)
+    atexit.register(RECORDER.close)
+    return RECORDER
+
+
+if app.config["RECORD_TRAFFIC"]:
+    start_recording(app.config["RECORD_TRAFFIC"])
+
+SUPPORT = {
+    "url": "https://reqres.in/#support-heading",
+    "text": "Some text displayed!",
+}
+
+# User fields a PATCH may change in the store
+USER_FIELDS = ("email", "first_name", "last_name", "avatar")
+
+# ?field= filters and ?sort= fields accepted by GET /api/users
+USER_FILTERS = ("email", "last_name")
+USER_SORT_FIELDS = ("id", "email", "first_name", "last_name")
 
+NDJSON = "application/x-ndjson"
 
-# Helper function for pagination
-def paginate(items_dict, page=1, per_page=6):
-    items = list(items_dict.values())
-    total = len(items)
-    total_pages = (total + per_page - 1) // per_page
 
-    start = (page - 1) * per_page
-    end = start + per_page
+def name_fields(data):
+    """first_name / last_name for the store, from the "name" in a request body"""
+    return {
+        "first_name": data.get("name", "Unknown").split()[0],
+        "last_name": (
+            data.get("name", "Unknown").split()[-1]
+            if len(data.get("name", "").split()) > 1
+            else ""
+        ),
+    }
+
 
+def new_user_record(user_id, data):
+    """Stored user built from a POST /api/users body"""
     return {
-        "page": page,
-        "per_page": per_page,
-        "total": total,
-        "total_pages": total_pages,
-        "data": items[start:end],
+        "id": user_id,
+        "email": data.get("email", f"user{user_id}@example.com"),
+        **name_fields(data),
+        "avatar": f"https://reqres.in/img/faces/{user_id}-image.jpg",
     }
 
 
+def created_response(user_id, data):
+    """ReqRes-style body answering a user create"""
+    return {
+        "name": data.get("name"),
+        "job": data.get("job"),
+        "id": str(user_id),
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def int_arg(name, default, minimum=None):
+    """An integer query parameter; InvalidQuery (400) if it isn't one"""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise InvalidQuery(f"?{name}= must be an integer, got {value!r}") from None
+    if minimum is not None and number < minimum:
+        raise InvalidQuery(f"?{name}= must be at least {minimum}, got {number}")
+    return number
+
+
+def page_args():
+    """Read ?page= and ?per_page= from the query string, capping per_page"""
+    page = int_arg("page", 1, minimum=1)
+    per_page = int_arg("per_page", app.config["DEFAULT_PER_PAGE"], minimum=1)
+    per_page = min(per_page, app.config["MAX_PER_PAGE"])
+
+    return page, per_page
+
+
+def wants_cursor():
+    """True when the client opted into keyset pagination (?after= / ?limit=)"""
+    return "after" in request.args or "limit" in request.args
+
+
+def cursor_args():
+    """Read ?after=<cursor> and ?limit= from the query string, capping limit"""
+    after = request.args.get("after")
+    limit = int_arg("limit", app.config["DEFAULT_PER_PAGE"], minimum=1)
+    limit = min(limit, app.config["MAX_PER_PAGE"])
+
+    return (decode_cursor(after) if after else None), limit
+
+
+def query_args(filter_fields=(), sort_fields=()):
+    """Read exact-match filters and ?sort= from the query string"""
+    filters = {
+        field: request.args[field] for field in filter_fields if field in request.args
+    }
+    sort = request.args.get("sort")
+
+    return filters, (parse_sort(sort, sort_fields) if sort else None)
+
+
+def negotiate_encoding(size):
+    """Pick gzip/deflate from Accept-Encoding, or None to send the body as-is"""
+    if size < app.config["COMPRESSION_MIN_SIZE"]:
+        return None
+
+    return request.accept_encodings.best_match(COMPRESSORS)
+
+
+def cache_scope(name):
+    """Cache key / tag for this request's tenant, so tenants never share entries"""
+    return name if g.tenant is None else f"{g.tenant}/{name}"
+
+
+def invalidate(*tags):
+    """Drop the tenant's cached responses stored under any of tags"""
+    RESPONSE_CACHE.invalidate(*map(cache_scope, tags))
+
+
+def cached_json(key, etag, build):
+    """
+    Serve a JSON body from RESPONSE_CACHE, building it on a miss
+
+    `etag` is the current version of the data; it must be computed before
+    build() reads anything. build() returns (payload, tags), or None when
+    there is nothing to serve (answered with an uncached 404). A matching
+    If-None-Match gets a bodiless 304. Bodies over COMPRESSION_MIN_SIZE are
+    compressed when the client accepts it, and the compressed bytes are
+    cached with the entry.
+    """
+    entry = RESPONSE_CACHE.get(key, etag=etag)
+    if entry is None:
+        epoch = RESPONSE_CACHE.epoch
+        built = build()
+        if built is None:
+            return jsonify({}), 404
+
+        payload, tags = built
+        body = app.json.encode(payload)
+        entry = RESPONSE_CACHE.set(key, body, tags, epoch, etag=etag)
+
+    # Each encoding is its own representation, so it gets its own ETag
+    encoding = negotiate_encoding(len(entry.body))
+    etag = f"{entry.etag}-{encoding}" if encoding else entry.etag
+
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    elif encoding:
+        body = entry.encoded_body(encoding, app.config["COMPRESSION_LEVEL"])
+        response = app.response_class(body, mimetype=app.json.mimetype)
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response = app.response_class(entry.body, mimetype=app.json.mimetype)
+
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def list_response(collection, store, filters=None, sort=None):
+    """
+    Cached page of a collection, offset or cursor depending on the query
+
+    filters / sort come from query_args(); cursor pages are always in id
+    order, so they can be filtered but not sorted.
+    """
+    collection = cache_scope(collection)
+
+    # Filtered/sorted pages get their own keys; client-supplied values can't
+    # go into an ETag as-is, so they are hashed
+    query = ()
+    if filters or sort:
+        digest = hashlib.blake2b(repr((filters, sort)).encode(), digest_size=8)
+        query = (digest.hexdigest(),)
+
+    if wants_cursor():
+        if sort:
+            raise InvalidQuery("?sort= can't be combined with ?after= / ?limit=")
+        after, limit = cursor_args()
+        key = (collection, "after", after, limit, *query)
+
+        def read_page():
+            return store.page_after(after=after, limit=limit, filters=filters)
+
+    else:
+        page, per_page = page_args()
+        key = (collection, "page", page, per_page, *query)
+
+        def read_page():
+            return store.page(page=page, per_page=per_page, filters=filters, sort=sort)
+
+    # Any write may shift pages, so pages carry the store-wide version
+    etag = "-".join(map(str, (store.instance, *key[1:], store.version)))
+
+    def build():
+        response = read_page()
+        response["support"] = SUPPORT
+        tags = [collection, f"{collection}:list"]
+        tags.extend(f"{collection}:{item['id']}" for item in response["data"])
+        return response, tags
+
+    return cached_json(key, etag, build)
+
+
+def record_response(collection, store, record_id):
+    """Cached single record, or 404"""
+    collection = cache_scope(collection)
+    etag = f"{store.instance}-{record_id}-{store.record_version(record_id)}"
+
+    def build():
+        record = store.get(record_id)
+        if record is None:
+            return None
+        tags = [collection, f"{collection}:{record_id}"]
+        return {"data": record, "support": SUPPORT}, tags
+
+    return cached_json((collection, record_id), etag, build)
+
+
+@app.errorhandler(InvalidCursor)
+@app.errorhandler(InvalidQuery)
+def invalid_query(error):
+    """Reject ?after= values that aren't cursors or ids, and unknown ?sort= fields"""
+    return jsonify({"error": str(error)}), 400
+
+
+@app.errorhandler(DuplicateKey)
+def duplicate_key(error):
+    """A create or update reused a unique value, e.g. another user's email"""
+    return jsonify({"error": duplicate_result(error)["error"]}), 409
+
+
+@app.errorhandler(InvalidTenant)
+def invalid_tenant(error):
+    """Reject malformed tenant names, and new tenants over MAX_TENANTS"""
+    return jsonify({"error": str(error)}), 400
+
+
+@app.errorhandler(InvalidProfile)
+def invalid_profile(error):
+    """Reject fault profiles that can't be understood"""
+    return jsonify({"error": str(error)}), 400
+
+
+def rate_limit_key():
+    """Bucket key for this request, built from RATE_LIMIT_KEY"""
+    parts = []
+    for part in RATE_LIMIT_KEY:
+        if part == "route":
+            parts.append(request.endpoint)
+            continue
+
+        auth = request.authorization
+        if part == "token" and auth is not None and auth.type == "bearer":
+            parts.append(f"token:{auth.token}")
+        else:
+            # ip, or a caller without a token
+            parts.append(request.remote_addr)
+    return tuple(parts)
+
+
+def acquire_rate_limit():
+    """Spend a token for the caller; None when the request isn't limited"""
+    if RATE_LIMITER is None or request.endpoint in ("health", "metrics", "static"):
+        return None
+    if request.path.startswith("/__"):
+        return None
+
+    return RATE_LIMITER.acquire(rate_limit_key())
+
+
+def rate_limit_environ(environ):
+    """acquire_rate_limit() for a WSGI environ, before it is dispatched"""
+    if RATE_LIMITER is None:
+        return None
+    with app.request_context(environ):
+        return acquire_rate_limit()
+
+
+@app.before_request
+def rate_limit():
+    """Spend a token for the caller, or answer 429 when their bucket is empty"""
+    if RATE_LIMIT_ENVIRON_KEY in request.environ:
+        g.rate_limit = request.environ[RATE_LIMIT_ENVIRON_KEY]
+    else:
+        g.rate_limit = acquire_rate_limit()
+
+    if g.rate_limit is not None and not g.rate_limit.allowed:
+        return jsonify({"error": "Too many requests"}), 429
+    return None
+
+
+@app.after_request
+def rate_limit_headers(response):
+    """X-RateLimit-* on every limited response, plus Retry-After on 429s"""
+    decision = g.get("rate_limit")
+    if decision is not None:
+        response.headers.update(decision.headers())
+    return response
+
+
+@app.before_request
+def inject_faults():
+    """Delay and/or fail the request as the active fault profile says"""
+    fault = request.environ.get(FAULT_ENVIRON_KEY)
+    if fault is None:
+        delay, status = FAULTS.draw(request.endpoint, request.path)
+        if delay > 0:
+            time.sleep(delay)
+    else:
+        _, status = fault
+
+    if status is not None:
+        return jsonify({"error": "Injected fault", "status": status}), status
+
+
+@app.before_request
+def select_tenant():
+    """Point g.users / g.resources at the X-Mock-Tenant tenant's stores"""
+    g.tenant = request.headers.get(TENANT_HEADER)
+    if g.tenant is None:
+        g.users, g.resources = USERS, RESOURCES
+    else:
+        stores = TENANTS.stores(g.tenant)
+        g.users, g.resources = stores["users"], stores["resources"]
+
+
 # ========== USER ENDPOINTS ==========
 
 
 @app.route("/api/users", methods=["GET"])
 def get_users():
-    """GET /api/users - Get list of users with pagination"""
-    page = int(request.args.get("page", 1))
+    """
+    GET /api/users - Get list of users with pagination
+
+    Optional ?email=, ?last_name= exact-match filters and ?sort=field[,-field]
+    """
     delay = int(request.args.get("delay", 0))
 
-    # Simulate delay if requested
+    # Simulate delay if requested (async mode awaits it before we get here)
     if delay > 0:
-        import time
-
         time.sleep(delay)
 
-    response = paginate(USERS, page=page)
-    response["support"] = {
-        "url": "https://reqres.in/#support-heading",
-        "text": "Some text displayed!",
-    }
-
-    return jsonify(response), 200
+    filters, sort = query_args(USER_FILTERS, USER_SORT_FIELDS)
+    return list_response("users", g.users, filters=filters, sort=sort)
 
 
 @app.route("/api/users/<int:user_id>", methods=["GET"])
 def get_user(user_id):
     """GET /api/users/{id} - Get single user"""
-    user = USERS.get(user_id)
-
-    if user:
-        return (
-            jsonify(
-                {
-                    "data": user,
-                    "support": {
-                        "url": "https://reqres.in/#support-heading",
-                        "text": "Some text displayed!",
-                    },
-                }
-            ),
-            200,
-        )
-    else:
-        return jsonify({}), 404
+    return record_response("users", g.users, user_id)
 
 
 @app.route("/api/users", methods=["POST"])
 def create_user():
     """POST /api/users - Create new user"""
-    global next_user_id
-
     data = request.get_json()
+    user_id = g.users.allocate_id()
 
-    new_user = {
-        "name": data.get("name"),
-        "job": data.get("job"),
-        "id": str(next_user_id),
-        "createdAt": datetime.utcnow().isoformat() + "Z",
-    }
+    new_user = created_response(user_id, data)
 
     # Add to in-memory database
-    USERS[next_user_id] = {
-        "id": next_user_id,
-        "email": data.get("email", f"user{next_user_id}@example.com"),
-        "first_name": data.get("name", "Unknown").split()[0],
-        "last_name": (
-            data.get("name", "Unknown").split()[-1]
-            if len(data.get("name", "").split()) > 1
-            else ""
-        ),
-        "avatar": f"https://reqres.in/img/faces/{next_user_id}-image.jpg",
-    }
-
-    next_user_id += 1
+    g.users.put(new_user_record(user_id, data))
+    invalidate("users:list")
 
     return jsonify(new_user), 201
 
@@ -256,17 +667,8 @@ def update_user(user_id):
     }
 
     # Update in-memory database if user exists
-    if user_id in USERS:
-        USERS[user_id].update(
-            {
-                "first_name": data.get("name", "Unknown").split()[0],
-                "last_name": (
-                    data.get("name", "Unknown").split()[-1]
-                    if len(data.get("name", "").split()) > 1
-                    else ""
-                ),
-            }
-        )
+    if g.users.update(user_id, name_fields(data)) is not None:
+        invalidate(f"users:{user_id}")
 
     return jsonify(response), 200
 
@@ -279,6 +681,11 @@ def patch_user(user_id):
     response = data.copy()
     response["updatedAt"] = datetime.utcnow().isoformat() + "Z"
 
+    # Apply any stored user fields, e.g. {"first_name": "someone"}
+    fields = {key: data[key] for key in USER_FIELDS if key in data}
+    if fields and g.users.update(user_id, fields) is not None:
+        invalidate(f"users:{user_id}")
+
     return jsonify(response), 200
 
 
@@ -286,49 +693,190 @@ def patch_user(user_id):
 def delete_user(user_id):
     """DELETE /api/users/{id} - Delete user"""
     # Remove from in-memory database
-    if user_id in USERS:
-        del USERS[user_id]
+    if g.users.delete(user_id):
+        invalidate("users:list", f"users:{user_id}")
 
     return "", 204
 
 
+# ========== BULK USER ENDPOINTS ==========
+
+
+class InvalidBulkLine(ValueError):
+    """Raised for an NDJSON bulk or load line that can't be used (400)"""
+
+
+def is_id(value):
+    """True for an integer record id (bools are ints to Python, not ids)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def read_bulk_items():
+    """
+    Items of a bulk request: a JSON array, or NDJSON with one item per line
+
+    Raises InvalidBulkLine (400) naming the first NDJSON line that fails to parse.
+    """
+    if request.mimetype == NDJSON:
+        items = []
+        for number, line in enumerate(request.stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(app.json.loads(line))
+            except ValueError:
+                raise InvalidBulkLine(f"Line {number} is not valid JSON") from None
+        return items
+
+    items = request.get_json()
+    return items if isinstance(items, list) else None
+
+
+def bulk_response(results):
+    """Per-item results as {"results": [...]}, or NDJSON lines for NDJSON requests"""
+    if request.mimetype == NDJSON:
+        lines = (app.json.dumps(result) + "\n" for result in results)
+        return app.response_class(lines, mimetype=NDJSON)
+
+    return jsonify({"results": results}), 200
+
+
+def bulk_body_error():
+    return jsonify({"error": "Expected a JSON array or NDJSON body"}), 400
+
+
+@app.errorhandler(InvalidBulkLine)
+def invalid_bulk_line(error):
+    return jsonify({"error": str(error)}), 400
+
+
+def duplicate_result(error):
+    """Per-item status for a bulk write rejected by a unique index"""
+    return {"status": 409, "error": f"{error.field} already in use: {error.value}"}
+
+
+def bulk_item_id(item):
+    """User id from a bulk PATCH/DELETE item: {"id": N, ...} or a bare N"""
+    user_id = item.get("id") if isinstance(item, dict) else item
+    return user_id if is_id(user_id) else None
+
+
+@app.route("/api/users/bulk", methods=["POST"])
+def bulk_create_users():
+    """POST /api/users/bulk - Create many users in one transaction"""
+    items = read_bulk_items()
+    if items is None:
+        return bulk_body_error()
+
+    results = []
+    ops = []
+    # Index in results of the item behind each op
+    positions = []
+    for data in items:
+        if not isinstance(data, dict):
+            results.append({"status": 400, "error": "Expected a JSON object"})
+            continue
+
+        user_id = g.users.allocate_id()
+        ops.append(("put", new_user_record(user_id, data)))
+        positions.append(len(results))
+        results.append({"status": 201, **created_response(user_id, data)})
+
+    for n, error in zip(positions, g.users.apply(ops)):
+        if isinstance(error, DuplicateKey):
+            results[n] = duplicate_result(error)
+
+    if ops:
+        invalidate("users:list")
+
+    return bulk_response(results)
+
+
+@app.route("/api/users/bulk", methods=["PATCH"])
+def bulk_patch_users():
+    """PATCH /api/users/bulk - Partially update many users in one transaction"""
+    items = read_bulk_items()
+    if items is None:
+        return bulk_body_error()
+
+    results = []
+    ops = []
+    # Index in results of the item behind each op
+    positions = []
+    for item in items:
+        user_id = bulk_item_id(item)
+        if user_id is None or not isinstance(item, dict):
+            results.append({"status": 400, "error": "Each item needs an integer id"})
+            continue
+
+        fields = {key: item[key] for key in USER_FIELDS if key in item}
+        ops.append(("update", user_id, fields))
+        positions.append(len(results))
+        # The item is echoed back, but its own "status" can't replace ours
+        results.append(
+            {**item, "status": 200, "updatedAt": datetime.utcnow().isoformat() + "Z"}
+        )
+
+    tags = []
+    for n, (_, user_id, _), updated in zip(positions, ops, g.users.apply(ops)):
+        result = results[n]
+        if updated is None:
+            result.update({"status": 404, "error": "User not found"})
+            result.pop("updatedAt")
+        elif isinstance(updated, DuplicateKey):
+            result.update(duplicate_result(updated))
+            result.pop("updatedAt")
+        else:
+            tags.append(f"users:{user_id}")
+
+    invalidate(*tags)
+
+    return bulk_response(results)
+
+
+@app.route("/api/users/bulk", methods=["DELETE"])
+def bulk_delete_users():
+    """DELETE /api/users/bulk - Delete many users in one transaction"""
+    items = read_bulk_items()
+    if items is None:
+        return bulk_body_error()
+
+    user_ids = [bulk_item_id(item) for item in items]
+    deleted = iter(
+        g.users.apply(
+            [("delete", user_id) for user_id in user_ids if user_id is not None]
+        )
+    )
+
+    results = []
+    tags = ["users:list"]
+    for user_id in user_ids:
+        if user_id is None:
+            results.append({"status": 400, "error": "Each item needs an integer id"})
+        elif next(deleted):
+            results.append({"id": user_id, "status": 204})
+            tags.append(f"users:{user_id}")
+        else:
+            results.append({"id": user_id, "status": 404, "error": "User not found"})
+
+    invalidate(*tags)
+
+    return bulk_response(results)
+
+
 # ========== RESOURCE ENDPOINTS ==========
 
 
 @app.route("/api/unknown", methods=["GET"])
 def get_resources():
     """GET /api/unknown - Get list of resources"""
-    page = int(request.args.get("page", 1))
-    response = paginate(RESOURCES, page=page)
-
-    response["support"] = {
-        "url": "https://reqres.in/#support-heading",
-        "text": "Some text displayed!",
-    }
-
-    return jsonify(response), 200
+    return list_response("resources", g.resources)
 
 
 @app.route("/api/unknown/<int:resource_id>", methods=["GET"])
 def get_resource(resource_id):
     """GET /api/unknown/{id} - Get single resource"""
-    resource = RESOURCES.get(resource_id)
-
-    if resource:
-        return (
-            jsonify(
-                {
-                    "data": resource,
-                    "support": {
-                        "url": "https://reqres.in/#support-heading",
-                        "text": "Some text displayed!",
-                    },
-                }
-            ),
-            200,
-        )
-    else:
-        return jsonify({}), 404
+    return record_response("resources", g.resources, resource_id)
 
 
 # ========== AUTHENTICATION ENDPOINTS ==========
@@ -363,9 +911,164 @@ def login():
     return jsonify({"token": "QpwL5tke4Pnpja7X4"}), 200
 
 
+# ========== ADMIN ENDPOINTS ==========
+
+
+def count_applied(results):
+    """Writes in a store.apply() batch that weren't rejected"""
+    return sum(not isinstance(result, DuplicateKey) for result in results)
+
+
+def read_load_records():
+    """
+    Records of an NDJSON load, every line checked before any is written
+
+    Raises InvalidBulkLine (400) naming the first line that isn't a JSON
+    object with an integer "id".
+    """
+    records = []
+    for number, line in enumerate(request.stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = app.json.loads(line)
+        except ValueError:
+            raise InvalidBulkLine(f"Line {number} is not valid JSON") from None
+        if not isinstance(record, dict) or not is_id(record.get("id")):
+            raise InvalidBulkLine(
+                f'Line {number} is not a JSON object with an integer "id"'
+            )
+        records.append(record)
+    return records
+
+
+@app.route("/__admin/load/<collection>", methods=["POST"])
+def admin_load(collection):
+    """
+    POST /__admin/load/{users|unknown} - Bulk load NDJSON records as-is
+
+    Records reusing a unique value (e.g. an existing email) are skipped.
+    """
+    stores = {"users": ("users", g.users), "unknown": ("resources", g.resources)}
+    if collection not in stores:
+        return jsonify({"error": f"Unknown collection: {collection}"}), 404
+
+    name, store = stores[collection]
+    records = read_load_records()
+
+    # Write in batches so a shared store sees one call per batch
+    loaded = 0
+    for start in range(0, len(records), 1000):
+        batch = [("put", record) for record in records[start : start + 1000]]
+        loaded += count_applied(store.apply(batch))
+
+    invalidate(name)
+
+    return jsonify({"loaded": loaded, "total": len(store)}), 200
+
+
+@app.route("/__admin/cache", methods=["GET"])
+def admin_cache():
+    """GET /__admin/cache - Response cache hit/miss counters"""
+    return jsonify(RESPONSE_CACHE.stats()), 200
+
+
+@app.route("/__admin/faults", methods=["GET"])
+def admin_faults():
+    """GET /__admin/faults - The active fault profile"""
+    return jsonify(FAULTS.profile), 200
+
+
+@app.route("/__admin/faults", methods=["PUT"])
+def admin_set_faults():
+    """PUT /__admin/faults - Replace the fault profile (see faults.py)"""
+    FAULTS.load(request.get_json())
+    return jsonify(FAULTS.profile), 200
+
+
+@app.route("/__admin/faults", methods=["DELETE"])
+def admin_clear_faults():
+    """DELETE /__admin/faults - Stop injecting latency and errors"""
+    FAULTS.clear()
+    return "", 204
+
+
+@app.route("/__admin/tenants", methods=["GET"])
+def admin_tenants():
+    """GET /__admin/tenants - Names of the live tenants"""
+    return jsonify({"tenants": TENANTS.names()}), 200
+
+
+@app.route("/__admin/tenants/<name>", methods=["DELETE"])
+def admin_drop_tenant(name):
+    """DELETE /__admin/tenants/{name} - Drop a tenant and its data"""
+    if not TENANTS.drop(name):
+        return jsonify({"error": f"Unknown tenant: {name}"}), 404
+
+    RESPONSE_CACHE.invalidate(f"{name}/users", f"{name}/resources")
+    return "", 204
+
+
+@app.route("/__admin/snapshot", methods=["POST"])
+def admin_snapshot():
+    """
+    POST /__admin/snapshot - Mark users, resources and next ids for a restore
+
+    Name it with {"name": "..."}, or one is made up. Snapshots belong to
+    the request's tenant and cost O(1) whatever the data size.
+    """
+    data = request.get_json(silent=True) or {}
+    name = str(data.get("name") or uuid.uuid4().hex[:8])
+    g.users.snapshot(name)
+    g.resources.snapshot(name)
+    return jsonify({"name": name}), 201
+
+
+@app.route("/__admin/restore/<name>", methods=["POST"])
+def admin_restore(name):
+    """POST /__admin/restore/{name} - Undo every write made since the snapshot"""
+    try:
+        reverted = g.users.restore(name) + g.resources.restore(name)
+    except KeyError:
+        return jsonify({"error": f"Unknown snapshot: {name}"}), 404
+
+    invalidate("users", "resources")
+    return jsonify({"name": name, "reverted": reverted}), 200
+
+
+@app.route("/__admin/snapshots/<name>", methods=["DELETE"])
+def admin_drop_snapshot(name):
+    """DELETE /__admin/snapshots/{name} - Forget a snapshot and its undo log"""
+    dropped = g.users.drop_snapshot(name)
+    dropped = g.resources.drop_snapshot(name) or dropped
+    if not dropped:
+        return jsonify({"error": f"Unknown snapshot: {name}"}), 404
+    return "", 204
+
+
 # ========== HEALTH CHECK ==========
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """GET /metrics - Request counts, in-flight requests and latency (Prometheus)"""
+    records = {
+        (("collection", "users"),): len(USERS),
+        (("collection", "resources"),): len(RESOURCES),
+    }
+    body = METRICS.render(
+        gauges=[
+            ("mock_api_store_records", "Records per collection", records),
+            (
+                "mock_api_response_cache_entries",
+                "Cached bodies",
+                {(): len(RESPONSE_CACHE)},
+            ),
+        ]
+    )
+    return app.response_class(body, mimetype=None, content_type=METRICS_CONTENT_TYPE)
+
+
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint"""
@@ -374,8 +1077,8 @@ def health():
             {
                 "status": "healthy",
                 "message": "Mock API server is running",
-                "total_users": len(USERS),
-                "total_resources": len(RESOURCES),
+                "total_users": len(g.users),
+                "total_resources": len(g.resources),
             }
         ),
         200,
@@ -391,22 +1094,51 @@ def home():
                 "message": "Mock ReqRes API Server",
                 "endpoints": {
                     "users": {
-                        "GET /api/users": "List users (supports ?page=N and ?delay=N)",
+                        "GET /api/users": (
+                            "List users (supports ?page=N, ?per_page=N, "
+                            "?after=CURSOR&limit=N, ?email=, ?last_name=, "
+                            "?sort=field[,-field] and ?delay=N)"
+                        ),
                         "GET /api/users/{id}": "Get single user",
                         "POST /api/users": "Create user",
                         "PUT /api/users/{id}": "Update user",
                         "PATCH /api/users/{id}": "Partially update user",
                         "DELETE /api/users/{id}": "Delete user",
+                        "POST /api/users/bulk": "Create many users (JSON array or NDJSON)",
+                        "PATCH /api/users/bulk": "Patch many users ([{id, ...}])",
+                        "DELETE /api/users/bulk": "Delete many users ([id, ...])",
                     },
                     "resources": {
-                        "GET /api/unknown": "List resources",
+                        "GET /api/unknown": (
+                            "List resources (supports ?page=N, ?per_page=N "
+                            "and ?after=CURSOR&limit=N)"
+                        ),
                         "GET /api/unknown/{id}": "Get single resource",
                     },
                     "auth": {
                         "POST /api/register": "Register (email + password required)",
                         "POST /api/login": "Login (email + password required)",
                     },
-                    "health": {"GET /health": "Health check"},
+                    "health": {
+                        "GET /health": "Health check",
+                        "GET /metrics": "Prometheus request metrics",
+                    },
+                    "admin": {
+                        "POST /__admin/load/{users|unknown}": (
+                            "Bulk load NDJSON records (see datagen.py)"
+                        ),
+                        "GET /__admin/cache": "Response cache hit/miss counts",
+                        "GET|PUT|DELETE /__admin/faults": (
+                            "Per-route latency/error injection profile"
+                        ),
+                        "GET /__admin/tenants": "Live X-Mock-Tenant namespaces",
+                        "DELETE /__admin/tenants/{name}": "Drop a tenant's data",
+                        "POST /__admin/snapshot": "Mark the data for a restore",
+                        "POST /__admin/restore/{name}": (
+                            "Undo every write since a snapshot"
+                        ),
+                        "DELETE /__admin/snapshots/{name}": "Forget a snapshot",
+                    },
                 },
                 "note": "This is a mock API for testing. All operations work without authentication.",
             }
@@ -415,24 +1147,96 @@ def home():
     )
 
 
+def parse_args(argv=None):
+    """Command line options for running the server directly"""
+    parser = argparse.ArgumentParser(description="Mock ReqRes API server")
+    parser.add_argument("--port", type=int, default=5000, help="Port to listen on")
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Serve through the ASGI app so ?delay=N does not hold a thread",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Pre-fork N worker processes sharing one store (no debug/reloader)",
+    )
+    parser.add_argument(
+        "--faults",
+        help="JSON fault profile: per-route latency and error rates (see faults.py)",
+    )
+    parser.add_argument(
+        "--data-dir",
+        help="Persist users/resources here (snapshot + write-ahead log)",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="Append every request to this JSONL file (replay with replay.py)",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args()
+
+    # prefork / asgi_app import this module by name: share the running copy
+    sys.modules.setdefault("mock_api_server", sys.modules[__name__])
+
+    compactor = init_persistence(args.data_dir) if args.data_dir else None
+    if args.faults:
+        FAULTS.load_file(args.faults)
+    if args.record and RECORDER is None:
+        start_recording(args.record)
+
     print("\n" + "=" * 60)
     print("🚀 Mock API Server Starting...")
     print("=" * 60)
-    print("📍 Server running at: http://localhost:5000")
+    print(f"📍 Server running at: http://localhost:{args.port}")
+    if args.workers:
+        print(f"⚙️  Mode: {args.workers} pre-forked workers (WSGI)")
+    else:
+        print(f"⚙️  Mode: {'async (ASGI)' if args.use_async else 'threaded (WSGI)'}")
+    print(f"🧾 JSON backend: {app.json.backend.name}")
     print(f"📊 Total users: {len(USERS)}")
     print(f"📊 Total resources: {len(RESOURCES)}")
+    if args.data_dir:
+        print(f"💾 Data directory: {args.data_dir}")
+    if args.faults:
+        print(f"💥 Fault profile: {args.faults}")
+    if RECORDER is not None:
+        print(f"📼 Recording traffic to: {RECORDER.path}")
     print("\n📚 Available Endpoints:")
-    print("   GET    http://localhost:5000/api/users")
-    print("   GET    http://localhost:5000/api/users/{id}")
-    print("   POST   http://localhost:5000/api/users")
-    print("   PUT    http://localhost:5000/api/users/{id}")
-    print("   PATCH  http://localhost:5000/api/users/{id}")
-    print("   DELETE http://localhost:5000/api/users/{id}")
-    print("   GET    http://localhost:5000/api/unknown")
-    print("   POST   http://localhost:5000/api/register")
-    print("   POST   http://localhost:5000/api/login")
+    print(f"   GET    http://localhost:{args.port}/api/users")
+    print(f"   GET    http://localhost:{args.port}/api/users/{{id}}")
+    print(f"   POST   http://localhost:{args.port}/api/users")
+    print(f"   PUT    http://localhost:{args.port}/api/users/{{id}}")
+    print(f"   PATCH  http://localhost:{args.port}/api/users/{{id}}")
+    print(f"   DELETE http://localhost:{args.port}/api/users/{{id}}")
+    print(f"   GET    http://localhost:{args.port}/api/unknown")
+    print(f"   POST   http://localhost:{args.port}/api/register")
+    print(f"   POST   http://localhost:{args.port}/api/login")
     print("\n💡 Press Ctrl+C to stop the server")
     print("=" * 60 + "\n")
 
-    app.run(debug=True, port=5000)
+    if args.workers:
+        from prefork import serve
+
+        serve(port=args.port, workers=args.workers, compactor=compactor)
+    else:
+        if compactor is not None:
+            compactor.start()
+
+        if args.use_async:
+            from asgi_app import serve
+
+            serve(port=args.port)
+        else:
+            # The reloader would open the data files from two processes
+            app.run(
+                debug=True,
+                port=args.port,
+                use_reloader=compactor is None,
+                request_handler=KeepAliveRequestHandler,
+            )
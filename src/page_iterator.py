@@ -0,0 +1,96 @@
+"""
+Walk every page of a paginated list endpoint, prefetching concurrently
+
+    for user in iter_records(session, f"{base_url}/api/users"):
+        ...
+
+Works with any ReqRes-style ?page= endpoint (/api/users, /api/unknown).
+Page 1 says how many pages there are; after that up to `prefetch` pages
+are in flight at once on a thread pool, so walking N pages takes about
+N / prefetch round trips instead of N. Pages are still yielded in order,
+and no more than prefetch + 1 of them are held at any time, however many
+there are.
+
+Offset pages shift when records are created or deleted during the walk;
+walk data that isn't changing, or page with ?after= cursors instead.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PREFETCH = 4
+DEFAULT_TIMEOUT = 10
+
+
+def fetch_page(session, url, params, page, timeout=DEFAULT_TIMEOUT, headers=None):
+    """Body of one page; raises requests.HTTPError unless it answers 200"""
+    response = session.get(
+        url, params={**params, "page": page}, timeout=timeout, headers=headers
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def iter_pages(
+    session,
+    url,
+    params=None,
+    prefetch=DEFAULT_PREFETCH,
+    timeout=DEFAULT_TIMEOUT,
+    headers=None,
+):
+    """
+    Yield each page body of url in order, fetching ahead concurrently
+
+    session is a requests.Session, shared by the prefetch threads; params
+    are extra query parameters such as per_page, headers extra request
+    headers. Stopping early cancels the pages not yet started.
+    """
+    params = dict(params or {})
+    first = fetch_page(session, url, params, 1, timeout, headers)
+    total_pages = first["total_pages"]
+    if total_pages <= 1:
+        yield first
+        return
+
+    window = max(1, prefetch)
+    pool = ThreadPoolExecutor(max_workers=window, thread_name_prefix="page-prefetch")
+    pending = deque()
+    next_page = 2
+
+    def fill():
+        nonlocal next_page
+        while next_page <= total_pages and len(pending) < window:
+            pending.append(
+                pool.submit(
+                    fetch_page, session, url, params, next_page, timeout, headers
+                )
+            )
+            next_page += 1
+
+    try:
+        # Start on the next pages before the caller gets the first one
+        fill()
+        yield first
+        while pending:
+            page = pending.popleft().result()
+            fill()
+            yield page
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_records(
+    session,
+    url,
+    params=None,
+    prefetch=DEFAULT_PREFETCH,
+    timeout=DEFAULT_TIMEOUT,
+    headers=None,
+):
+    """Yield every record of every page of url, in order (see iter_pages)"""
+    pages = iter_pages(
+        session, url, params, prefetch=prefetch, timeout=timeout, headers=headers
+    )
+    for page in pages:
+        yield from page["data"]
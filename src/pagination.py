@@ -0,0 +1,210 @@
+"""
+Pagination helpers for the mock API server
+Pages are sliced from an ordered id index instead of copying the whole store
+
+Two modes are supported:
+- offset pages: ?page=N&per_page=N (ReqRes compatible)
+- keyset cursors: ?after=<cursor>&limit=N, stable while writes happen
+
+Offset pages can also be sorted with ?sort=field[,-field]
+"""
+
+import base64
+import binascii
+from bisect import bisect_left, bisect_right
+
+DEFAULT_PER_PAGE = 6
+
+
+class OrderedIndex:
+    """
+    Sorted list of record ids kept in step with a store dict
+
+    New ids are always the largest, so adds are amortized O(1) appends.
+    Page slices cost O(per_page) and the total is just len(index).
+    Copies share the list until one of them changes it.
+    """
+
+    def __init__(self, ids=()):
+        self._ids = sorted(ids)
+        self._shared = False
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, item_id):
+        pos = bisect_left(self._ids, item_id)
+        return pos < len(self._ids) and self._ids[pos] == item_id
+
+    def last(self):
+        """Largest id, or None when the index is empty"""
+        return self._ids[-1] if self._ids else None
+
+    def copy(self):
+        """Index of the same ids in O(1), copy-on-write"""
+        clone = OrderedIndex()
+        clone._ids = self._ids
+        clone._shared = self._shared = True
+        return clone
+
+    def _own(self):
+        # Views handed out earlier keep the old list, which is never changed
+        if self._shared:
+            self._ids = list(self._ids)
+            self._shared = False
+        return self._ids
+
+    def add(self, item_id):
+        """Insert an id, keeping the index sorted"""
+        ids = self._own()
+        if not ids or item_id > ids[-1]:
+            ids.append(item_id)
+            return
+
+        pos = bisect_left(ids, item_id)
+        if pos == len(ids) or ids[pos] != item_id:
+            ids.insert(pos, item_id)
+
+    def discard(self, item_id):
+        """Remove an id if present"""
+        pos = bisect_left(self._ids, item_id)
+        if pos < len(self._ids) and self._ids[pos] == item_id:
+            del self._own()[pos]
+
+    def slice(self, start, stop):
+        """Ids at positions [start, stop) in sort order"""
+        return self._ids[start:stop]
+
+    def after(self, item_id, limit):
+        """Up to `limit` ids strictly greater than item_id (None = from start)"""
+        start = 0 if item_id is None else bisect_right(self._ids, item_id)
+        return self._ids[start : start + limit]
+
+    def ordered(self, descending=False):
+        """The ids as a sliceable view, optionally largest first"""
+        return SliceView(self._ids, descending)
+
+
+class SliceView:
+    """
+    Read-only view of an ordered list that pages can be sliced from
+
+    Works like OrderedIndex.slice() for paginate(). Descending views slice
+    from the end, so either direction costs O(per_page). id_of maps list
+    items to ids (e.g. for (value, id) pairs).
+    """
+
+    def __init__(self, items, descending=False, id_of=None):
+        self._items = items
+        self._descending = descending
+        self._id_of = id_of
+
+    def __len__(self):
+        return len(self._items)
+
+    def slice(self, start, stop):
+        """Ids at positions [start, stop) in view order"""
+        if self._descending:
+            count = len(self._items)
+            items = self._items[max(count - stop, 0) : max(count - start, 0)]
+            items.reverse()
+        else:
+            items = self._items[start:stop]
+
+        if self._id_of is None:
+            return items
+        return [self._id_of(item) for item in items]
+
+
+class InvalidCursor(ValueError):
+    """Raised when an ?after= value can't be decoded"""
+
+
+class InvalidQuery(ValueError):
+    """Raised when filter or ?sort= parameters can't be served"""
+
+
+def parse_sort(value, fields):
+    """
+    ?sort=last_name,-id as [("last_name", False), ("id", True)]
+
+    A leading "-" sorts that field descending. Only `fields` are accepted.
+    """
+    spec = []
+    for part in value.split(","):
+        part = part.strip()
+        field = part.lstrip("-")
+        if field not in fields:
+            raise InvalidQuery(
+                f"Cannot sort by {field!r} (sortable: {', '.join(fields)})"
+            )
+        spec.append((field, part.startswith("-")))
+    return spec
+
+
+def encode_cursor(item_id):
+    """Opaque cursor token for the last id of a page"""
+    return base64.urlsafe_b64encode(f"id:{item_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Turn an ?after= value back into an id
+
+    Accepts tokens from encode_cursor() as well as plain integer ids.
+    """
+    if token.isdecimal():
+        return int(token)
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        prefix, _, item_id = base64.urlsafe_b64decode(padded).decode().partition(":")
+        if prefix != "id":
+            raise ValueError(token)
+        return int(item_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(f"Invalid cursor: {token}") from None
+
+
+def lookup(items_dict, ids):
+    """Records for ids, skipping any deleted after the index was read"""
+    return [record for record in map(items_dict.get, ids) if record is not None]
+
+
+def paginate(items_dict, index, page=1, per_page=DEFAULT_PER_PAGE):
+    """Build a ReqRes-style page from a store dict and its ordered index"""
+    total = len(index)
+    total_pages = (total + per_page - 1) // per_page
+
+    start = (page - 1) * per_page
+    end = start + per_page
+
+    return {
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "total_pages": total_pages,
+        "data": lookup(items_dict, index.slice(start, end)),
+    }
+
+
+def paginate_after(items_dict, index, after=None, limit=DEFAULT_PER_PAGE):
+    """
+    Build a keyset page of records with ids greater than `after`
+
+    Costs O(log n + limit) at any depth, and rows never shift between pages
+    when other records are created or deleted.
+    """
+    ids = index.after(after, limit + 1)
+    has_more = len(ids) > limit
+    ids = ids[:limit]
+
+    return {
+        "limit": limit,
+        "total": len(index),
+        "data": lookup(items_dict, ids),
+        "next_cursor": encode_cursor(ids[-1]) if has_more else None,
+    }
@@ -0,0 +1,339 @@
+"""
+Optional persistence for the mock API server stores
+
+Each collection gets two files in the data directory:
+- <name>.snapshot: compact binary snapshot, memory-mapped at startup. A
+  record is decoded each time it is read and never cached, so startup cost
+  doesn't grow with JSON parsing of the whole dataset and memory stays at
+  the mapped file. It also keeps each record's secondary index keys, so
+  indexes are rebuilt without decoding records
+- <name>.wal: append-only JSON lines of every put/update/delete since the
+  snapshot, replayed on startup
+
+A background thread periodically writes a fresh snapshot and starts a new
+log. Replaying ops that are already in a snapshot is harmless, so a crash
+at any point in that sequence loses nothing.
+
+Enable with: python mock_api_server.py --data-dir ./data
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+
+from indexes import index_key
+from store import LayeredRecords, Store
+
+MAGIC = b"MOCKSNP2"
+# magic, record count, next id to allocate, index keys offset (0: none)
+HEADER = struct.Struct("<8sQQQ")
+
+# Snapshots written before index keys were saved; still readable
+MAGIC_V1 = b"MOCKSNP1"
+HEADER_V1 = struct.Struct("<8sQQ")
+
+DEFAULT_SNAPSHOT_INTERVAL = 300
+
+
+def paths_for(directory, name):
+    """(snapshot, wal, rotated wal) paths for a collection"""
+    base = os.path.join(directory, name)
+    return f"{base}.snapshot", f"{base}.wal", f"{base}.wal.old"
+
+
+def encode_record(record):
+    return json.dumps(record, separators=(",", ":")).encode()
+
+
+class SnapshotRecords:
+    """
+    Read-only records in a memory-mapped snapshot file
+
+    Layout after the header: sorted ids (int64), count + 1 offsets (uint64)
+    into the blob, then the JSON-encoded records back to back, then
+    {field: [index key per record, in id order]} as JSON.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as snapshot_file:
+            self._map = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic = self._map[:8]
+        if magic == MAGIC:
+            _, count, self.next_id, self._keys_at = HEADER.unpack_from(self._map)
+            ids_start = HEADER.size
+        elif magic == MAGIC_V1:
+            _, count, self.next_id = HEADER_V1.unpack_from(self._map)
+            self._keys_at = 0
+            ids_start = HEADER_V1.size
+        else:
+            raise ValueError(f"{path} is not a mock API snapshot")
+
+        offsets_start = ids_start + 8 * count
+        self._blob_start = offsets_start + 8 * (count + 1)
+
+        view = memoryview(self._map)
+        self.ids = view[ids_start:offsets_start].cast("q")
+        self._offsets = view[offsets_start : self._blob_start].cast("Q")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, record_id):
+        return self._position(record_id) is not None
+
+    def _position(self, record_id):
+        pos = bisect_left(self.ids, record_id)
+        if pos < len(self.ids) and self.ids[pos] == record_id:
+            return pos
+        return None
+
+    def raw(self, record_id):
+        """Encoded bytes of a record, or None"""
+        pos = self._position(record_id)
+        return None if pos is None else self._raw_at(pos)
+
+    def _raw_at(self, pos):
+        start = self._blob_start + self._offsets[pos]
+        end = self._blob_start + self._offsets[pos + 1]
+        return self._map[start:end]
+
+    def get(self, record_id, default=None):
+        """A freshly decoded copy of a record (nothing is cached), or default"""
+        raw = self.raw(record_id)
+        return default if raw is None else json.loads(raw)
+
+    def index_keys(self, fields):
+        """
+        {field: index key of every record, in id order}, or None
+
+        None when the snapshot didn't save one of fields. Parsed on every
+        call rather than kept: indexes are built from it once.
+        """
+        if not self._keys_at:
+            return None
+        saved = json.loads(self._map[self._keys_at :])
+        if not all(field in saved for field in fields):
+            return None
+        return {field: saved[field] for field in fields}
+
+    def index_pairs(self, fields):
+        """{field: (id, index key) pairs}, or None (see index_keys())"""
+        keys = self.index_keys(fields)
+        if keys is None:
+            return None
+        return {field: zip(self.ids, column) for field, column in keys.items()}
+
+
+def snapshot_entries(records, ids, fields):
+    """
+    (encoded record, index keys) for each id
+
+    Records unchanged since the old snapshot are copied straight from it,
+    keys and all; only records written since are encoded.
+    """
+    base = None
+    if isinstance(records, LayeredRecords) and isinstance(
+        records.base, SnapshotRecords
+    ):
+        base = records.base
+    base_keys = base.index_keys(fields) if base is not None and fields else None
+
+    for record_id in ids:
+        if base is None or record_id in records.overlay:
+            record = records.get(record_id)
+            yield encode_record(record), [
+                index_key(record.get(field)) for field in fields
+            ]
+            continue
+
+        pos = base._position(record_id)
+        raw = base._raw_at(pos)
+        if base_keys is not None:
+            yield raw, [base_keys[field][pos] for field in fields]
+        elif fields:
+            record = json.loads(raw)
+            yield raw, [index_key(record.get(field)) for field in fields]
+        else:
+            yield raw, ()
+
+
+def write_snapshot(path, ids, records, next_id, fields=()):
+    """
+    Write records (in id order) to a snapshot file, replacing it atomically
+
+    fields are the records' secondary index fields, whose keys are saved too.
+    """
+    fields = list(fields)
+    offsets = array("Q", [0]) * (len(ids) + 1)
+    keys = {field: [] for field in fields}
+    temp_path = f"{path}.tmp"
+
+    with open(temp_path, "wb") as out:
+        out.write(HEADER.pack(MAGIC, len(ids), next_id, 0))
+        out.write(array("q", ids).tobytes())
+
+        # Reserve the offsets table, fill it in once the blob is written
+        offsets_at = out.tell()
+        out.write(offsets.tobytes())
+
+        position = 0
+        entries = snapshot_entries(records, ids, fields)
+        for n, (raw, record_keys) in enumerate(entries):
+            out.write(raw)
+            position += len(raw)
+            offsets[n + 1] = position
+            for column, key in zip(keys.values(), record_keys):
+                column.append(key)
+
+        keys_at = 0
+        if fields:
+            keys_at = out.tell()
+            out.write(json.dumps(keys, separators=(",", ":")).encode())
+
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, len(ids), next_id, keys_at))
+        out.seek(offsets_at)
+        out.write(offsets.tobytes())
+        out.flush()
+        os.fsync(out.fileno())
+
+    os.replace(temp_path, path)
+
+
+class WriteAheadLog:
+    """Append-only JSON-lines log of store writes"""
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, entry):
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def rotate(self, old_path):
+        """Move the current log to old_path and start an empty one"""
+        with self._lock:
+            self._file.close()
+            os.replace(self.path, old_path)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def replay(path, store):
+    """
+    Apply logged writes to a store (which must not have a WAL attached yet)
+
+    Stops at a torn final line from a crash mid-write, and cuts it off the
+    file, so the next write starts on a line of its own.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    ops = []
+    complete = 0
+    with open(path, "rb") as log:
+        for line in log:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entry = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                break
+            complete += len(line)
+
+            if entry["op"] == "put":
+                ops.append(("put", entry["record"]))
+            elif entry["op"] == "update":
+                ops.append(("update", entry["id"], entry["fields"]))
+            else:
+                ops.append(("delete", entry["id"]))
+
+    if complete < os.path.getsize(path):
+        os.truncate(path, complete)
+
+    store.replay(ops)
+    return len(ops)
+
+
+def compact(store, directory, name):
+    """Write a fresh snapshot of store and drop the log it replaces"""
+    snapshot_path, _, old_wal_path = paths_for(directory, name)
+
+    ids, records, next_id = store.checkpoint(
+        rotate=lambda: store.wal.rotate(old_wal_path)
+    )
+    write_snapshot(snapshot_path, ids, records, next_id, fields=store.indexes)
+    os.remove(old_wal_path)
+
+
+def open_store(directory, name, seed, fsync=False, indexes=None):
+    """
+    Load a collection from the data directory, or from seed on first run
+
+    Returns a Store (with the given secondary indexes) that logs every write
+    to <name>.wal. The indexes are built from the snapshot's saved keys on
+    a background thread, so startup doesn't wait for them.
+    """
+    os.makedirs(directory, exist_ok=True)
+    snapshot_path, wal_path, old_wal_path = paths_for(directory, name)
+
+    if os.path.exists(snapshot_path):
+        snapshot = SnapshotRecords(snapshot_path)
+        store = Store(
+            LayeredRecords(snapshot), next_id=snapshot.next_id, indexes=indexes
+        )
+    else:
+        store = Store(seed, indexes=indexes)
+
+    interrupted = os.path.exists(old_wal_path)
+    replay(old_wal_path, store)
+    replay(wal_path, store)
+
+    store.wal = WriteAheadLog(wal_path, fsync=fsync)
+    if interrupted or not os.path.exists(snapshot_path):
+        # First run, or a compaction was cut short: settle on a clean snapshot
+        compact(store, directory, name)
+
+    if store.indexes:
+        threading.Thread(
+            target=store.build_indexes, name=f"{name}-indexes", daemon=True
+        ).start()
+    return store
+
+
+class Compactor(threading.Thread):
+    """Background thread snapshotting stores every `interval` seconds"""
+
+    def __init__(self, stores, directory, interval=DEFAULT_SNAPSHOT_INTERVAL):
+        super().__init__(name="snapshot-compactor", daemon=True)
+        self.stores = stores
+        self.directory = directory
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            for name, store in self.stores.items():
+                if os.path.getsize(store.wal.path):
+                    compact(store, self.directory, name)
+
+    def stop(self):
+        self._stopped.set()
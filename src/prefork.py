@@ -0,0 +1,253 @@
+"""
+Pre-fork multi-worker launcher for the mock API server
+
+The parent binds one listening socket, starts a store process that owns
+USERS and RESOURCES, then forks N worker processes that all accept on the
+shared socket. Workers reach the store through proxies, so a POST handled
+by one worker is visible to a GET on any other. X-Mock-Tenant tenants are
+kept in the store process as well.
+
+Run with: python mock_api_server.py --workers 4
+"""
+
+import os
+import signal
+import socket
+import sys
+from multiprocessing.managers import BaseManager, BaseProxy
+
+from werkzeug.serving import make_server
+
+import mock_api_server
+from keepalive import KeepAliveRequestHandler
+
+
+class StoreProxy(BaseProxy):
+    """Worker-side handle on a Store living in the store process"""
+
+    _exposed_ = (
+        "__contains__",
+        "__getattribute__",
+        "__len__",
+        "allocate_id",
+        "apply",
+        "delete",
+        "drop_snapshot",
+        "get",
+        "page",
+        "page_after",
+        "put",
+        "record_version",
+        "restore",
+        "snapshot",
+        "update",
+    )
+
+    def __len__(self):
+        return self._callmethod("__len__")
+
+    def __contains__(self, record_id):
+        return self._callmethod("__contains__", (record_id,))
+
+    @property
+    def instance(self):
+        return self._callmethod("__getattribute__", ("instance",))
+
+    @property
+    def version(self):
+        return self._callmethod("__getattribute__", ("version",))
+
+    def get(self, record_id):
+        return self._callmethod("get", (record_id,))
+
+    def record_version(self, record_id):
+        return self._callmethod("record_version", (record_id,))
+
+    def page(
+        self, page=1, per_page=mock_api_server.DEFAULT_PER_PAGE, filters=None, sort=None
+    ):
+        return self._callmethod("page", (page, per_page, filters, sort))
+
+    def page_after(
+        self, after=None, limit=mock_api_server.DEFAULT_PER_PAGE, filters=None
+    ):
+        return self._callmethod("page_after", (after, limit, filters))
+
+    def allocate_id(self):
+        return self._callmethod("allocate_id")
+
+    def put(self, record):
+        return self._callmethod("put", (record,))
+
+    def update(self, record_id, fields):
+        return self._callmethod("update", (record_id, fields))
+
+    def delete(self, record_id):
+        return self._callmethod("delete", (record_id,))
+
+    def apply(self, ops):
+        return self._callmethod("apply", (ops,))
+
+    def snapshot(self, name):
+        return self._callmethod("snapshot", (name,))
+
+    def restore(self, name):
+        return self._callmethod("restore", (name,))
+
+    def drop_snapshot(self, name):
+        return self._callmethod("drop_snapshot", (name,))
+
+
+class TenantsProxy(BaseProxy):
+    """Worker-side handle on the store process's Tenants"""
+
+    _exposed_ = ("__len__", "drop", "names", "store")
+    # store() answers with a proxy for the tenant's Store, not a copy of it
+    _method_to_typeid_ = {"store": "tenant_store"}
+
+    def __len__(self):
+        return self._callmethod("__len__")
+
+    def store(self, name, collection):
+        return self._callmethod("store", (name, collection))
+
+    def drop(self, name):
+        return self._callmethod("drop", (name,))
+
+    def names(self):
+        return self._callmethod("names")
+
+
+class SharedTenants:
+    """Tenants as a worker sees them, held in the store process"""
+
+    def __init__(self, registry):
+        self._registry = registry
+
+    def __len__(self):
+        return len(self._registry)
+
+    def stores(self, name):
+        # Fresh proxies per request, so a dropped tenant is never served
+        return {
+            collection: self._registry.store(name, collection)
+            for collection in ("users", "resources")
+        }
+
+    def drop(self, name):
+        return self._registry.drop(name)
+
+    def names(self):
+        return self._registry.names()
+
+
+def get_store(name):
+    """Runs in the store process: the process-wide Store for a collection"""
+    stores = {"users": mock_api_server.USERS, "resources": mock_api_server.RESOURCES}
+    return stores[name]
+
+
+def get_tenants():
+    """Runs in the store process: the process-wide Tenants"""
+    return mock_api_server.TENANTS
+
+
+class StoreManager(BaseManager):
+    """Local store process shared by all workers"""
+
+
+StoreManager.register("store", callable=get_store, proxytype=StoreProxy)
+StoreManager.register("tenants", callable=get_tenants, proxytype=TenantsProxy)
+StoreManager.register("tenant_store", proxytype=StoreProxy, create_method=False)
+
+
+def init_store_process(compactor=None):
+    """Runs once in the store process before it starts serving proxies"""
+    # Let the parent shut the store process down after the workers exit
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Snapshots are written where the writes happen
+    if compactor is not None:
+        compactor.start()
+
+
+def stop(signum, frame):
+    """SIGTERM handler: shut down the way Ctrl+C does"""
+    raise KeyboardInterrupt
+
+
+def run_worker(manager, listener, host):
+    """Serve requests on the shared socket against the shared store"""
+    mock_api_server.USERS = manager.store("users")
+    mock_api_server.RESOURCES = manager.store("resources")
+    mock_api_server.TENANTS = SharedTenants(manager.tenants())
+
+    server = make_server(
+        host,
+        0,
+        mock_api_server.app,
+        threaded=True,
+        request_handler=KeepAliveRequestHandler,
+        fd=listener.fileno(),
+    )
+    # The parent stops workers with SIGTERM, right after a Ctrl+C reached
+    # the whole process group: both end up in the finally block below
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # A second signal mustn't cut the recording short
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        # Workers leave through os._exit, which skips atexit handlers
+        if mock_api_server.RECORDER is not None:
+            mock_api_server.RECORDER.close()
+
+
+def serve(host="127.0.0.1", port=5000, workers=None, compactor=None):
+    """
+    Start the store process and fork `workers` servers on one socket
+
+    compactor is a persistence.Compactor for the stores, if they are persisted.
+    """
+    if not hasattr(os, "fork"):
+        sys.exit("Multi-worker mode needs os.fork (Linux/macOS)")
+
+    workers = workers or os.cpu_count() or 1
+
+    manager = StoreManager(authkey=os.urandom(16))
+    manager.start(initializer=init_store_process, initargs=(compactor,))
+
+    listener = socket.create_server((host, port), backlog=1024)
+    listener.set_inheritable(True)
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(manager, listener, host)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        # Ignore repeat signals while the workers are torn down
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ChildProcessError, ProcessLookupError):
+                pass
+    finally:
+        listener.close()
+        manager.shutdown()
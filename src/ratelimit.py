@@ -0,0 +1,134 @@
+"""
+Token-bucket rate limiting for the mock API server
+
+Each client key (IP, bearer token, route, or a combination) gets a bucket
+holding up to `burst` tokens that refills at `rate` tokens per second; a
+request spends one token or is answered 429 with Retry-After.
+
+Buckets are two numbers, refilled lazily on use, and kept in LRU order:
+a bucket idle long enough to be full again is indistinguishable from a new
+one, so it is dropped, and the least recently used are dropped beyond
+max_clients. Memory stays O(active clients).
+
+Enable with MOCK_API_RATE_LIMIT_RATE=10 (and optionally _BURST, _KEY,
+_MAX_CLIENTS); see mock_api_server.py.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_CLIENTS = 10000
+
+# What a bucket can be keyed by; combine with commas, e.g. "ip,route"
+KEY_PARTS = ("ip", "token", "route")
+
+
+class Bucket:
+    """Tokens left and when they were last counted"""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class Decision:
+    """Outcome of one request against its bucket, with header values"""
+
+    __slots__ = ("allowed", "limit", "remaining", "reset_after", "retry_after")
+
+    def __init__(self, allowed, limit, remaining, reset_after, retry_after):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_after = reset_after
+        self.retry_after = retry_after
+
+    def headers(self):
+        """X-RateLimit-* (and Retry-After when throttled), in whole seconds"""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
+
+
+class RateLimiter:
+    """Token buckets per client key"""
+
+    def __init__(
+        self, rate, burst=None, max_clients=DEFAULT_MAX_CLIENTS, clock=time.monotonic
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = float(rate)
+        self.burst = int(burst or max(1, math.ceil(rate)))
+        self.max_clients = max_clients
+        self.clock = clock
+        # Seconds for an empty bucket to fill up again
+        self.refill_time = self.burst / self.rate
+
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def acquire(self, key):
+        """Spend a token from key's bucket if there is one"""
+        now = self.clock()
+
+        with self._lock:
+            self._evict_idle(now)
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = Bucket(self.burst, now)
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                elapsed = now - bucket.updated
+                bucket.tokens = min(self.burst, bucket.tokens + elapsed * self.rate)
+                bucket.updated = now
+                self._buckets.move_to_end(key)
+
+            allowed = bucket.tokens >= 1
+            if allowed:
+                bucket.tokens -= 1
+            tokens = bucket.tokens
+
+        return Decision(
+            allowed=allowed,
+            limit=self.burst,
+            remaining=int(tokens),
+            reset_after=(self.burst - tokens) / self.rate,
+            retry_after=0 if allowed else (1 - tokens) / self.rate,
+        )
+
+    def _evict_idle(self, now):
+        """Drop buckets that would be full by now (oldest first, O(1) each)"""
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if now - bucket.updated < self.refill_time:
+                return
+            del buckets[key]
+
+
+def parse_key_spec(spec):
+    """Split a key spec like "ip,route" into its validated parts"""
+    parts = tuple(part.strip() for part in spec.split(",") if part.strip())
+    unknown = [part for part in parts if part not in KEY_PARTS]
+    if not parts or unknown:
+        raise ValueError(
+            f"Rate limit key must be a mix of {', '.join(KEY_PARTS)}, got {spec!r}"
+        )
+    return parts
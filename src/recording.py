@@ -0,0 +1,214 @@
+"""
+Traffic recording for the mock API server
+
+RecordingMiddleware wraps the WSGI app and logs every request to a JSONL
+file, one object per line:
+
+{"ts": 1700000000.123, "method": "POST", "path": "/api/users",
+ "query": "", "headers": {"Content-Type": "application/json"},
+ "body": "{\"name\": \"x\"}", "status": 201, "duration_ms": 0.84}
+
+ts is the wall-clock start time, duration_ms runs until the response body
+is fully sent. Bodies that aren't UTF-8 are stored base64 in "body_b64".
+
+Requests only put the entry on a queue; a writer thread encodes batches
+and appends them with a single write, flushing at least every
+flush_interval seconds. The file is opened O_APPEND and every write holds
+whole lines, so pre-forked workers can share one recording. Queued
+entries are written on a clean exit, which for pre-forked workers includes
+Ctrl+C and the SIGTERM their parent stops them with; a SIGTERM to a
+single-process server loses at most the last flush_interval seconds.
+
+Enable with --record traffic.jsonl (or MOCK_API_RECORD_TRAFFIC); send it
+back with replay.py.
+"""
+
+import base64
+import io
+import json
+import os
+import queue
+import threading
+import time
+
+from werkzeug.wsgi import ClosingIterator, get_input_stream
+
+from tenants import TENANT_HEADER
+
+# Request headers worth keeping to replay a request faithfully
+RECORDED_HEADERS = (
+    "Content-Type",
+    "Accept",
+    "Accept-Encoding",
+    "Authorization",
+    "If-None-Match",
+    TENANT_HEADER,
+)
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+_CLOSE = object()
+
+
+class TrafficRecorder:
+    """Buffered, thread-safe JSONL writer for recorded requests"""
+
+    def __init__(
+        self,
+        path,
+        flush_interval=DEFAULT_FLUSH_INTERVAL,
+        buffer_size=DEFAULT_BUFFER_SIZE,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._writer = None
+
+    def _start(self):
+        # Lazily, and again in each forked child: threads don't survive fork
+        with self._lock:
+            if self._fd is None:
+                # Closed: responses finishing after close() aren't recorded
+                return None
+            if self._pid != os.getpid():
+                self._queue = queue.SimpleQueue()
+                self._writer = threading.Thread(
+                    target=self._write_loop,
+                    args=(self._queue,),
+                    name="traffic-recorder",
+                    daemon=True,
+                )
+                self._writer.start()
+                # Last, so record() never sees this pid with the old queue
+                self._pid = os.getpid()
+            return self._queue
+
+    def record(self, entry):
+        """Queue one entry (a JSON-serialisable dict) for writing"""
+        queue_ = self._queue if self._pid == os.getpid() else self._start()
+        if queue_ is not None:
+            queue_.put(entry)
+
+    def _write_loop(self, entries):
+        buffer = []
+        size = 0
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                entry = entries.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                entry = None
+
+            if entry is not None and entry is not _CLOSE:
+                line = json.dumps(entry, separators=(",", ":")) + "\n"
+                buffer.append(line)
+                size += len(line)
+
+            if (
+                entry is _CLOSE
+                or size >= self.buffer_size
+                or (time.monotonic() >= deadline)
+            ):
+                if buffer:
+                    os.write(self._fd, "".join(buffer).encode("utf-8"))
+                    buffer.clear()
+                    size = 0
+                deadline = time.monotonic() + self.flush_interval
+
+            if entry is _CLOSE:
+                return
+
+    def close(self):
+        """Write out everything queued so far and close the file"""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._queue.put(_CLOSE)
+                self._writer.join()
+                self._pid = None
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+class RecordingMiddleware:
+    """WSGI middleware recording every request through a TrafficRecorder"""
+
+    def __init__(self, app, recorder):
+        self.app = app
+        self.recorder = recorder
+
+    def __call__(self, environ, start_response):
+        ts = time.time()
+        started = time.perf_counter()
+
+        # Read the body up front so it can be both recorded and handled
+        body = get_input_stream(environ).read()
+        environ["wsgi.input"] = io.BytesIO(body)
+        environ["CONTENT_LENGTH"] = str(len(body))
+        environ.pop("wsgi.input_terminated", None)
+
+        status = []
+
+        def recording_start_response(status_line, headers, exc_info=None):
+            status[:] = [int(status_line.split(" ", 1)[0])]
+            return start_response(status_line, headers, exc_info)
+
+        def record():
+            entry = {
+                "ts": round(ts, 6),
+                "method": environ["REQUEST_METHOD"],
+                "path": environ.get("PATH_INFO", ""),
+                "query": environ.get("QUERY_STRING", ""),
+                "headers": recorded_headers(environ),
+                "status": status[0] if status else None,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+            if body:
+                try:
+                    entry["body"] = body.decode("utf-8")
+                except UnicodeDecodeError:
+                    entry["body_b64"] = base64.b64encode(body).decode("ascii")
+            self.recorder.record(entry)
+
+        return ClosingIterator(self.app(environ, recording_start_response), record)
+
+
+def recorded_headers(environ):
+    headers = {}
+    for name in RECORDED_HEADERS:
+        key = name.upper().replace("-", "_")
+        value = environ.get(key if key == "CONTENT_TYPE" else f"HTTP_{key}")
+        if value:
+            headers[name] = value
+    return headers
+
+
+def entry_body(entry):
+    """The recorded request body as bytes"""
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+def load_recording(path):
+    """
+    Recorded entries from a JSONL file, oldest first
+
+    A torn last line (the server was killed mid-write) is skipped.
+    """
+    entries = []
+    with open(path, encoding="utf-8") as recording:
+        for line in recording:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries
@@ -0,0 +1,163 @@
+"""
+Replay recorded mock API traffic (see recording.py)
+
+Run with: python src/replay.py traffic.jsonl --url http://localhost:5000
+
+--timing original (default) sends each request at its recorded offset from
+the first one, divided by --speed. Latency is measured from that scheduled
+time, so queueing behind --concurrency busy connections counts against the
+server instead of quietly slowing the replay down.
+
+--timing fast sends everything back to back from --concurrency
+connections, for the maximum throughput of the recorded mix.
+
+Reports throughput, latency percentiles, statuses, and how many statuses
+differ from the recording; --json prints the same as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from async_http import DEFAULT_TIMEOUT, AsyncHTTPClient
+from loadstats import Results, format_summary
+from recording import entry_body, load_recording
+
+DEFAULT_CONCURRENCY = 16
+
+
+async def send(client, entry, results, scheduled, mismatches):
+    try:
+        response = await client.request(
+            entry["method"],
+            entry["path"],
+            query=entry.get("query") or None,
+            body=entry_body(entry),
+            headers=entry.get("headers"),
+        )
+    except (OSError, asyncio.TimeoutError, ValueError) as error:
+        results.add(0, error=error)
+        return
+    results.add(time.perf_counter() - scheduled, status=response.status)
+    if entry.get("status") is not None and response.status != entry["status"]:
+        mismatches[0] += 1
+
+
+async def replay_original(client, entries, results, speed, mismatches):
+    """Open loop: every request at its recorded offset"""
+    started = time.perf_counter()
+    first = entries[0]["ts"]
+    tasks = []
+
+    for entry in entries:
+        scheduled = started + (entry["ts"] - first) / speed
+        wait = scheduled - time.perf_counter()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        tasks.append(
+            asyncio.create_task(send(client, entry, results, scheduled, mismatches))
+        )
+
+    await asyncio.gather(*tasks)
+
+
+async def replay_fast(client, entries, results, concurrency, mismatches):
+    """Closed loop: `concurrency` senders working through the entries"""
+    pending = iter(entries)
+
+    async def sender():
+        for entry in pending:
+            await send(client, entry, results, time.perf_counter(), mismatches)
+
+    await asyncio.gather(*(sender() for _ in range(concurrency)))
+
+
+async def replay(
+    entries,
+    url,
+    timing="original",
+    concurrency=DEFAULT_CONCURRENCY,
+    speed=1.0,
+    timeout=DEFAULT_TIMEOUT,
+):
+    """Send entries to url; returns the summary dict"""
+    results = Results()
+    mismatches = [0]
+
+    started = time.perf_counter()
+    async with AsyncHTTPClient(
+        url, max_connections=concurrency, timeout=timeout
+    ) as client:
+        if entries and timing == "original":
+            await replay_original(client, entries, results, speed, mismatches)
+        elif entries:
+            await replay_fast(client, entries, results, concurrency, mismatches)
+    elapsed = time.perf_counter() - started
+
+    summary = results.summary(elapsed)
+    summary["status_mismatches"] = mismatches[0]
+    if entries:
+        summary["recorded_span_s"] = round(entries[-1]["ts"] - entries[0]["ts"], 3)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded mock API traffic")
+    parser.add_argument("recording", help="JSONL file written by --record")
+    parser.add_argument(
+        "--url", default="http://localhost:5000", help="Server to replay against"
+    )
+    parser.add_argument(
+        "--timing",
+        choices=("original", "fast"),
+        default="original",
+        help="Keep the recorded spacing, or send as fast as possible",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Connections (and, with --timing fast, requests) in flight",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="With --timing original, replay this many times faster",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds per request"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1 or args.speed <= 0:
+        parser.error("--concurrency and --speed must be positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    entries = load_recording(args.recording)
+    summary = asyncio.run(
+        replay(
+            entries,
+            args.url,
+            timing=args.timing,
+            concurrency=args.concurrency,
+            speed=args.speed,
+            timeout=args.timeout,
+        )
+    )
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_summary(summary, title=f"Replay of {args.recording}"))
+        print(f"Mismatches:  {summary['status_mismatches']} statuses differ")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
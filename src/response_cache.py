@@ -0,0 +1,140 @@
+"""
+Bounded cache of pre-encoded response bodies for hot GET routes
+
+Entries are keyed by route + parameters and tagged with what they contain
+(e.g. "users:list", "users:7"), so a write invalidates only the entries
+that could have changed. Compressed variants are stored on the entry the
+first time a client asks for them.
+"""
+
+import gzip
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+
+DEFAULT_MAX_ENTRIES = 1024
+
+# Content-Encoding -> compressor(body, level), in server preference order
+COMPRESSORS = {
+    "gzip": lambda body, level: gzip.compress(body, compresslevel=level, mtime=0),
+    "deflate": lambda body, level: zlib.compress(body, level),
+}
+
+
+class CachedResponse:
+    """One cached response body, its ETag and the tags it was stored under"""
+
+    __slots__ = ("body", "etag", "tags", "encoded")
+
+    def __init__(self, body, etag, tags):
+        self.body = body
+        self.etag = etag
+        self.tags = tags
+        self.encoded = {}
+
+    def encoded_body(self, encoding, level):
+        """Body compressed with `encoding`, compressing only on first use"""
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = COMPRESSORS[encoding](self.body, level)
+            self.encoded[encoding] = body
+        return body
+
+
+class ResponseCache:
+    """LRU of encoded bodies with tag-based invalidation and hit/miss counters"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._keys_by_tag = defaultdict(set)
+        self._lock = threading.Lock()
+        # Bumped on every invalidation, see set()
+        self.epoch = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, etag=None):
+        """
+        Cached entry for key, or None (counted as a miss)
+
+        With an etag, an entry built for a different version is treated as
+        a miss and dropped. This keeps per-process caches correct when
+        another process writes to a shared store.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and etag is not None and entry.etag != etag:
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, body, tags, epoch, etag=None):
+        """
+        Store a body built from data read at `epoch`, returning its entry
+
+        If anything was invalidated since then the body may already be stale,
+        so the entry is returned but not cached.
+        """
+        entry = CachedResponse(body, etag, tags)
+
+        with self._lock:
+            if epoch != self.epoch or self.max_entries <= 0:
+                return entry
+
+            self._discard(key)
+            self._entries[key] = entry
+            for tag in tags:
+                self._keys_by_tag[tag].add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+        return entry
+
+    def invalidate(self, *tags):
+        """Drop every entry stored under any of the given tags"""
+        with self._lock:
+            self.epoch += 1
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._discard(key)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self.epoch += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def stats(self):
+        """Counters for the admin endpoint"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
@@ -0,0 +1,128 @@
+"""
+Pluggable JSON encoding for the mock API server
+
+Every route serializes through app.json, which is a JSONProvider backed by
+the fastest library available:
+- orjson (pip install orjson)
+- ujson (pip install ujson)
+- the stdlib json module, always available
+
+Pick one explicitly with MOCK_API_JSON_BACKEND=orjson|ujson|json (default
+"auto"). Output is the same JSON document whichever backend is used: keys
+sorted, dates and other Flask-supported types converted the same way.
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # optional speedup
+    ujson = None
+
+
+class JSONBackend:
+    """One JSON library behind a common dumps (to bytes) / loads interface"""
+
+    def __init__(self, name, dumps, loads):
+        self.name = name
+        self._dumps = dumps
+        self.loads = loads
+
+    def dumps(self, obj, default=None, sort_keys=True, indent=False):
+        """Encode obj as UTF-8 JSON bytes (compact unless indent)"""
+        return self._dumps(obj, default, sort_keys, indent)
+
+    def __repr__(self):
+        return f"<JSONBackend {self.name}>"
+
+
+def stdlib_dumps(obj, default, sort_keys, indent):
+    if indent:
+        text = json.dumps(obj, default=default, sort_keys=sort_keys, indent=2)
+    else:
+        text = json.dumps(
+            obj, default=default, sort_keys=sort_keys, separators=(",", ":")
+        )
+    return text.encode()
+
+
+def orjson_dumps(obj, default, sort_keys, indent):
+    # Let Flask's default() format datetimes/dataclasses, as the stdlib path does
+    option = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=default, option=option)
+
+
+def ujson_dumps(obj, default, sort_keys, indent):
+    text = ujson.dumps(
+        obj,
+        default=default,
+        sort_keys=sort_keys,
+        indent=2 if indent else 0,
+        escape_forward_slashes=False,
+    )
+    return text.encode()
+
+
+# Name -> backend, fastest first; only installed libraries are listed
+BACKENDS = {}
+if orjson is not None:
+    BACKENDS["orjson"] = JSONBackend("orjson", orjson_dumps, orjson.loads)
+if ujson is not None:
+    BACKENDS["ujson"] = JSONBackend("ujson", ujson_dumps, ujson.loads)
+BACKENDS["json"] = JSONBackend("json", stdlib_dumps, json.loads)
+
+
+def get_backend(name="auto"):
+    """Backend by name, or the fastest installed one for "auto" """
+    if name == "auto":
+        return next(iter(BACKENDS.values()))
+    if name not in BACKENDS:
+        raise ValueError(
+            f"JSON backend {name!r} is not available (installed: {', '.join(BACKENDS)})"
+        )
+    return BACKENDS[name]
+
+
+class BackendJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes and decodes with a JSONBackend
+
+    Calls with extra json.dumps/json.loads keyword arguments fall back to
+    the stdlib, so extensions relying on them keep working.
+    """
+
+    backend = get_backend()
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.backend.dumps(obj, self.default, self.sort_keys).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self.backend.loads(s)
+
+    def encode(self, obj):
+        """Response body bytes for obj, formatted the way response() formats it"""
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self.backend.dumps(obj, self.default, self.sort_keys, indent) + b"\n"
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
@@ -0,0 +1,582 @@
+"""
+Thread-safe in-memory record store for the mock API server
+
+- ids are allocated atomically, so concurrent POSTs never share an id
+- writes lock only the stripe owning their key, plus the id index for
+  creates/deletes, so unrelated writes don't wait on each other
+- reads take no locks: records are replaced, never mutated in place, so a
+  reader sees either the old or the new version of a record
+- every write bumps a version counter; records remember the version of
+  their last write, which is what ETags are built from
+- an optional write-ahead log (see persistence.py) receives every write
+- optional secondary indexes (see indexes.py) serve filtered and sorted
+  pages; they are built on first use and then kept current by every write
+  under their own lock. Over a persisted snapshot they are built from the
+  index keys it saved, without decoding a record, and replaying the
+  write-ahead log leaves them unbuilt
+- fork() starts a new store from this one's records in O(1), sharing them
+  copy-on-write (see tenants.py)
+- snapshot() marks the current state in O(1); while any snapshot exists,
+  writes keep the record they replaced in an undo journal, so restore()
+  costs O(writes since the snapshot) however large the store is
+"""
+
+import threading
+import uuid
+from contextlib import ExitStack, contextmanager
+
+from indexes import DuplicateKey, index_key
+from pagination import (
+    DEFAULT_PER_PAGE,
+    InvalidQuery,
+    OrderedIndex,
+    SliceView,
+    lookup,
+    paginate,
+    paginate_after,
+)
+
+DEFAULT_STRIPES = 64
+
+
+class LayeredRecords:
+    """
+    Writable view over a read-only base mapping
+
+    Writes land in an overlay dict and deletes in a tombstone set, so the
+    base (e.g. a memory-mapped snapshot) is shared and never copied.
+    """
+
+    def __init__(self, base, overlay=None, deleted=None):
+        self.base = base
+        self.overlay = overlay if overlay is not None else {}
+        self.deleted = deleted if deleted is not None else set()
+
+    def get(self, record_id, default=None):
+        record = self.overlay.get(record_id)
+        if record is not None:
+            return record
+        if record_id in self.deleted:
+            return default
+        return self.base.get(record_id, default)
+
+    def __contains__(self, record_id):
+        return self.get(record_id) is not None
+
+    def __iter__(self):
+        for record_id in self.base:
+            if record_id not in self.deleted and record_id not in self.overlay:
+                yield record_id
+        yield from self.overlay
+
+    def __setitem__(self, record_id, record):
+        self.overlay[record_id] = record
+        self.deleted.discard(record_id)
+
+    def __delitem__(self, record_id):
+        # Tombstone first, so readers never fall through to the base record
+        self.deleted.add(record_id)
+        self.overlay.pop(record_id, None)
+
+    def copy(self):
+        """New view sharing the base, with its own overlay and tombstones"""
+        return LayeredRecords(self.base, dict(self.overlay), set(self.deleted))
+
+    def index_pairs(self, fields):
+        """
+        {field: (id, index key) pairs} for every record, or None
+
+        Uses the keys the base saved for its records (see persistence.py),
+        so base records aren't decoded; None if the base has no saved keys.
+        """
+        base_pairs = getattr(self.base, "index_pairs", None)
+        pairs = base_pairs(fields) if base_pairs is not None else None
+        if pairs is None or not (self.overlay or self.deleted):
+            return pairs
+        return {field: self._pairs(field, pairs[field]) for field in fields}
+
+    def _pairs(self, field, base_pairs):
+        overlay, deleted = self.overlay, self.deleted
+        for record_id, key in base_pairs:
+            if record_id not in overlay and record_id not in deleted:
+                yield record_id, key
+        for record_id, record in overlay.items():
+            yield record_id, index_key(record.get(field))
+
+
+class Store:
+    """Records keyed by integer id, with an ordered index for pagination"""
+
+    def __init__(
+        self,
+        records=None,
+        stripes=DEFAULT_STRIPES,
+        next_id=None,
+        indexes=None,
+        id_index=None,
+    ):
+        if isinstance(records, LayeredRecords):
+            self._records = records
+        else:
+            self._records = dict(records or {})
+        # id_index: an OrderedIndex of exactly these records' ids, if known
+        self._index = id_index if id_index is not None else OrderedIndex(self._records)
+        self._index_lock = threading.Lock()
+        self._id_lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._next_id = max(next_id or 0, (self._index.last() or 0) + 1)
+
+        # Set by persistence.open_store() to log every write
+        self.wal = None
+
+        # field -> HashIndex / SortedIndex, filled in by _ensure_indexes()
+        self.indexes = dict(indexes or {})
+        self._indexes_built = not self.indexes
+        self._secondary_lock = threading.Lock()
+        # Set while replay() runs, so writes leave unbuilt indexes alone
+        self._replaying = False
+
+        # Versions restart with the process, so ETags also carry this token
+        self.instance = uuid.uuid4().hex[:8]
+        self.version = 0
+        self._versions = {}
+        self._version_lock = threading.Lock()
+
+        # (record_id, record before the write or None), kept while snapshots
+        # exist; _journal_start is the position of its first entry
+        self._journal = None
+        self._journal_start = 0
+        # name -> (journal position, next_id)
+        self._snapshots = {}
+
+    def _lock_for(self, record_id):
+        return self._stripes[hash(record_id) % len(self._stripes)]
+
+    def _tick(self):
+        with self._version_lock:
+            self.version += 1
+            return self.version
+
+    @contextmanager
+    def _all_stripes(self):
+        with ExitStack() as stack:
+            for lock in self._stripes:
+                stack.enter_context(lock)
+            yield
+
+    def _log(self, entry):
+        if self.wal is not None:
+            self.wal.append(entry)
+
+    def _journal_write(self, record_id, previous):
+        if self._journal is not None:
+            self._journal.append((record_id, previous))
+
+    def _ensure_indexes(self):
+        """Build secondary indexes from the records (caller holds _secondary_lock)"""
+        if self._indexes_built:
+            return
+
+        pairs = None
+        if isinstance(self._records, LayeredRecords):
+            pairs = self._records.index_pairs(list(self.indexes))
+        if pairs is None:
+            with self._index_lock:
+                ids = self._index.slice(0, None)
+            records = lookup(self._records, ids)
+            pairs = {
+                field: [
+                    (record["id"], index_key(record.get(field))) for record in records
+                ]
+                for field in self.indexes
+            }
+
+        for field, index in self.indexes.items():
+            index.extend(pairs[field])
+        self._indexes_built = True
+
+    def build_indexes(self):
+        """Build the secondary indexes now instead of on first use"""
+        with self._secondary_lock:
+            self._ensure_indexes()
+
+    def _reindex(self, record_id, old, new):
+        """
+        Move a record's secondary index entries from `old` to `new`
+
+        Either may be None (create / delete). Raises DuplicateKey, before
+        changing anything, if `new` breaks a unique index.
+        """
+        if not self.indexes:
+            return
+        if self._replaying and not self._indexes_built:
+            # Built from the records later, replayed writes included
+            return
+
+        with self._secondary_lock:
+            self._ensure_indexes()
+            changes = []
+            for field, index in self.indexes.items():
+                before = None if old is None else index_key(old.get(field))
+                after = None if new is None else index_key(new.get(field))
+                if before != after or old is None or new is None:
+                    index.check(record_id, after)
+                    changes.append((index, before, after))
+
+            for index, before, after in changes:
+                if old is not None:
+                    index.discard(record_id, before)
+                if new is not None:
+                    index.add(record_id, after)
+
+    # ---------- reads (lock free) ----------
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, record_id):
+        return record_id in self._records
+
+    def get(self, record_id):
+        """Record for an id, or None"""
+        return self._records.get(record_id)
+
+    def record_version(self, record_id):
+        """
+        Store version of a record's last write (0 for untouched seed data)
+
+        Read this before the record itself: writes store the record first,
+        so a version never ends up paired with an older body.
+        """
+        return self._versions.get(record_id, 0)
+
+    def page(self, page=1, per_page=DEFAULT_PER_PAGE, filters=None, sort=None):
+        """
+        Offset page (?page=N&per_page=N)
+
+        filters is {field: value} for indexed fields; sort is a list of
+        (field, descending) pairs as returned by pagination.parse_sort().
+        """
+        index = self._index
+        if filters or sort:
+            index = self._ordered(filters, sort)
+        return paginate(self._records, index, page=page, per_page=per_page)
+
+    def page_after(self, after=None, limit=DEFAULT_PER_PAGE, filters=None):
+        """Keyset page (?after=<id>&limit=N), optionally filtered"""
+        index = self._index
+        if filters:
+            index = OrderedIndex(self._matching(filters))
+        return paginate_after(self._records, index, after=after, limit=limit)
+
+    def _matching(self, filters):
+        """Ids of records whose fields equal every filter value, ascending"""
+        for field in filters:
+            if field not in self.indexes:
+                raise InvalidQuery(f"Cannot filter by {field!r}")
+
+        with self._secondary_lock:
+            self._ensure_indexes()
+            candidates = min(
+                (self.indexes[field].lookup(value) for field, value in filters.items()),
+                key=len,
+            )
+
+        # Indexes are updated just before records, so check the records too
+        return [
+            record["id"]
+            for record in lookup(self._records, candidates)
+            if all(index_key(record.get(f)) == v for f, v in filters.items())
+        ]
+
+    def _ordered(self, filters, sort):
+        """
+        Sliceable ids matching filters, in sort order
+
+        Ties sort by id in the direction of the first sort field. Filtered
+        results are sorted in O(k log k); unfiltered ones are served straight
+        from the id or a secondary index when the sort fits it, and fall back
+        to sorting every record otherwise.
+        """
+        sort = list(sort or [("id", False)])
+        if "id" not in (field for field, _ in sort):
+            sort.append(("id", sort[0][1]))
+
+        if not filters:
+            field, descending = sort[0]
+            if field == "id":
+                return self._index.ordered(descending)
+
+            index = self.indexes.get(field)
+            if sort[1:] == [("id", descending)] and hasattr(index, "ordered"):
+                with self._secondary_lock:
+                    self._ensure_indexes()
+                return index.ordered(descending)
+
+            with self._index_lock:
+                ids = self._index.slice(0, None)
+        else:
+            ids = self._matching(filters)
+
+        records = lookup(self._records, ids)
+        for field, descending in reversed(sort):
+            if field == "id":
+                records.sort(key=lambda record: record["id"], reverse=descending)
+            else:
+                records.sort(
+                    key=lambda record: index_key(record.get(field)) or "",
+                    reverse=descending,
+                )
+        return SliceView([record["id"] for record in records])
+
+    # ---------- writes ----------
+
+    def allocate_id(self):
+        """Reserve the next unused id"""
+        with self._id_lock:
+            record_id = self._next_id
+            self._next_id += 1
+        return record_id
+
+    def _reserve_through(self, record_id):
+        """Make sure allocate_id() never hands out record_id or anything below it"""
+        with self._id_lock:
+            if record_id >= self._next_id:
+                self._next_id = record_id + 1
+
+    def put(self, record):
+        """
+        Insert or replace a record under its own "id"
+
+        Raises DuplicateKey if a unique index already holds one of its values.
+        """
+        with self._lock_for(record["id"]):
+            return self._put(record)
+
+    def update(self, record_id, fields):
+        """
+        Merge fields into a record, returning the new record (None if missing)
+
+        Raises DuplicateKey like put().
+        """
+        with self._lock_for(record_id):
+            return self._update(record_id, fields)
+
+    def delete(self, record_id):
+        """Remove a record, returning True if it existed"""
+        with self._lock_for(record_id):
+            return self._delete(record_id)
+
+    def apply(self, ops):
+        """
+        Run a batch of writes as one transaction
+
+        ops are ("put", record), ("update", id, fields) or ("delete", id).
+        Every stripe is held for the whole batch, so no other write can
+        interleave with it. Returns one result per op, as the single-op
+        methods would; an op rejected by a unique index gets its DuplicateKey
+        error as the result and the rest of the batch still applies.
+        """
+        with self._all_stripes():
+            return [self._apply_one(op, *args) for op, *args in ops]
+
+    def replay(self, ops):
+        """
+        apply() for writes logged earlier (write-ahead log replay)
+
+        They passed the unique indexes when first made, so secondary indexes
+        not built yet stay that way, instead of being built (decoding every
+        record) just to take these writes; they're built on first use.
+        """
+        with self._all_stripes():
+            self._replaying = True
+            try:
+                return [self._apply_one(op, *args) for op, *args in ops]
+            finally:
+                self._replaying = False
+
+    def _apply_one(self, op, *args):
+        try:
+            return getattr(self, f"_{op}")(*args)
+        except DuplicateKey as error:
+            return error
+
+    def checkpoint(self, rotate=None):
+        """
+        Consistent copy of the store for writing a snapshot
+
+        Holds every stripe while calling rotate() (e.g. to start a new WAL)
+        and copying, so the copy lines up exactly with the log cut. Returns
+        (ids, records, next_id); records shares unchanged data with the store.
+        """
+        with self._all_stripes():
+            if rotate is not None:
+                rotate()
+            with self._index_lock:
+                ids = self._index.slice(0, None)
+            return ids, self._records.copy(), self._next_id
+
+    def fork(self):
+        """
+        New store holding this one's current records, in O(1)
+
+        Both stores go on over the records as they are now, each writing to
+        its own LayeredRecords layer, and share the id index until either
+        one creates or deletes a record. The fork builds its own secondary
+        indexes on first use and doesn't inherit the write-ahead log.
+        """
+        with self._all_stripes():
+            records = self._records
+            if isinstance(records, LayeredRecords) and not (
+                records.overlay or records.deleted
+            ):
+                # Nothing written on top of the base yet: share the base itself
+                base = records.base
+            else:
+                base = records
+                self._records = LayeredRecords(base)
+            with self._index_lock:
+                id_index = self._index.copy()
+            next_id = self._next_id
+
+        return Store(
+            LayeredRecords(base),
+            stripes=len(self._stripes),
+            next_id=next_id,
+            indexes={field: index.empty() for field, index in self.indexes.items()},
+            id_index=id_index,
+        )
+
+    # ---------- snapshots ----------
+
+    def snapshot(self, name):
+        """
+        Remember the current state under name, in O(1)
+
+        Records are never copied: the journal keeps the old version of
+        whatever later writes replace. Reusing a name moves the snapshot.
+        """
+        with self._all_stripes():
+            if self._journal is None:
+                self._journal = []
+                self._journal_start = 0
+            position = self._journal_start + len(self._journal)
+            with self._id_lock:
+                self._snapshots[name] = (position, self._next_id)
+
+    def snapshots(self):
+        return sorted(self._snapshots)
+
+    def restore(self, name):
+        """
+        Undo every write made since snapshot `name`
+
+        Returns the number of writes undone. The snapshot stays, for the
+        next restore; snapshots taken after it are dropped. Raises KeyError
+        for an unknown name.
+        """
+        with self._all_stripes():
+            position, next_id = self._snapshots[name]
+            start = position - self._journal_start
+            undo = self._journal[start:]
+            del self._journal[start:]
+
+            for record_id, previous in reversed(undo):
+                self._revert(record_id, previous)
+            with self._id_lock:
+                self._next_id = next_id
+
+            self._snapshots = {
+                other: mark
+                for other, mark in self._snapshots.items()
+                if mark[0] <= position
+            }
+            return len(undo)
+
+    def drop_snapshot(self, name):
+        """Forget a snapshot, returning True if it existed"""
+        with self._all_stripes():
+            if self._snapshots.pop(name, None) is None:
+                return False
+
+            if not self._snapshots:
+                self._journal = None
+                return True
+            # Entries older than the oldest remaining snapshot can't be used
+            oldest = min(position for position, _ in self._snapshots.values())
+            del self._journal[: oldest - self._journal_start]
+            self._journal_start = oldest
+            return True
+
+    def _revert(self, record_id, previous):
+        """Put a record back as it was (None: absent); caller holds every stripe"""
+        current = self._records.get(record_id)
+        self._reindex(record_id, current, previous)
+        if previous is None:
+            if current is None:
+                return
+            self._log({"op": "delete", "id": record_id})
+            with self._index_lock:
+                self._index.discard(record_id)
+            del self._records[record_id]
+        else:
+            self._log({"op": "put", "record": previous})
+            self._records[record_id] = previous
+            with self._index_lock:
+                self._index.add(record_id)
+
+        # A fresh version, so no ETag handed out since the snapshot matches
+        version = self._tick()
+        if previous is None:
+            self._versions.pop(record_id, None)
+        else:
+            self._versions[record_id] = version
+
+    # Callers hold the stripe lock for the record id
+
+    def _put(self, record):
+        record_id = record["id"]
+        current = self._records.get(record_id)
+
+        self._reindex(record_id, current, record)
+        self._log({"op": "put", "record": record})
+        self._journal_write(record_id, current)
+        self._records[record_id] = record
+        with self._index_lock:
+            self._index.add(record_id)
+        # Tick last, once the record is visible to pages as well
+        self._versions[record_id] = self._tick()
+        self._reserve_through(record_id)
+
+        return record
+
+    def _update(self, record_id, fields):
+        current = self._records.get(record_id)
+        if current is None:
+            return None
+
+        updated = {**current, **fields}
+        self._reindex(record_id, current, updated)
+        self._log({"op": "update", "id": record_id, "fields": fields})
+        self._journal_write(record_id, current)
+        self._records[record_id] = updated
+        self._versions[record_id] = self._tick()
+
+        return updated
+
+    def _delete(self, record_id):
+        current = self._records.get(record_id)
+        if current is None:
+            return False
+
+        self._reindex(record_id, current, None)
+        self._log({"op": "delete", "id": record_id})
+        self._journal_write(record_id, current)
+        # Drop from the index first so pages never list a missing record
+        with self._index_lock:
+            self._index.discard(record_id)
+        del self._records[record_id]
+        self._versions.pop(record_id, None)
+        self._tick()
+
+        return True
@@ -0,0 +1,80 @@
+"""
+Tenant namespaces for the mock API server
+
+A request with an X-Mock-Tenant header reads and writes that tenant's own
+users and resources instead of the shared ones, so parallel test workers
+pointed at one server never see each other's creates, deletes or totals.
+
+A tenant is created by its first request as a fork of the seed stores
+(Store.fork()): O(1) whatever the seed size, with records shared
+copy-on-write until the tenant changes them. DELETE /__admin/tenants/<name>
+drops it again.
+"""
+
+import re
+import threading
+
+TENANT_HEADER = "X-Mock-Tenant"
+
+DEFAULT_MAX_TENANTS = 256
+
+TENANT_NAME = re.compile(r"[A-Za-z0-9_.-]{1,64}")
+
+
+class InvalidTenant(ValueError):
+    """Raised for a malformed tenant name, or one tenant too many"""
+
+
+def check_name(name):
+    """Raise InvalidTenant unless name is 1-64 of A-Z a-z 0-9 _ . -"""
+    if not TENANT_NAME.fullmatch(name):
+        raise InvalidTenant(
+            f"Invalid {TENANT_HEADER}: {name!r} (1-64 of A-Z a-z 0-9 _ . -)"
+        )
+
+
+class Tenants:
+    """Named forks of template stores, created on first use"""
+
+    def __init__(self, templates, max_tenants=DEFAULT_MAX_TENANTS):
+        # {collection: Store}; never written, so every fork can share them
+        self.templates = templates
+        self.max_tenants = max_tenants
+        self._tenants = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tenants)
+
+    def stores(self, name):
+        """{collection: Store} for a tenant, forking the templates on first use"""
+        stores = self._tenants.get(name)
+        if stores is not None:
+            return stores
+
+        check_name(name)
+        with self._lock:
+            stores = self._tenants.get(name)
+            if stores is None:
+                if len(self._tenants) >= self.max_tenants:
+                    raise InvalidTenant(
+                        f"Tenant limit ({self.max_tenants}) reached, drop one first"
+                    )
+                stores = {
+                    collection: template.fork()
+                    for collection, template in self.templates.items()
+                }
+                self._tenants[name] = stores
+        return stores
+
+    def store(self, name, collection):
+        """One collection's Store for a tenant"""
+        return self.stores(name)[collection]
+
+    def drop(self, name):
+        """Forget a tenant and its data, returning True if it existed"""
+        with self._lock:
+            return self._tenants.pop(name, None) is not None
+
+    def names(self):
+        return sorted(self._tenants)
@@ -0,0 +1,279 @@
+"""
+Pytest configuration and fixtures
+This file is automatically loaded by pytest
+
+Tests that talk HTTP send requests through `http`, a pooled keep-alive
+session, to `base_url`:
+- API_BASE_URL set: that server (e.g. https://reqres.in in CI)
+- otherwise the mock app, started in-process on a free port for the session
+- API_TEST_MODE=wsgi: no server at all; `http` hands requests for
+  WSGI_BASE_URL straight to the app through its WSGI interface
+
+Against the mock, `http` sends every request in the worker's own tenant
+(X-Mock-Tenant, see src/tenants.py), so parallel workers sharing one
+server start from the seed data and never see each other's writes. After
+each test that used `http`, the tenant is restored to a snapshot taken
+before the first one, so tests never depend on each other's writes.
+"""
+
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+from werkzeug.serving import make_server
+
+from api_client import ApiClient
+from keepalive import KeepAliveRequestHandler
+from mock_api_server import app
+from tenants import TENANT_HEADER
+
+logger = logging.getLogger(__name__)
+
+# Placeholder host for zero-socket mode, never resolved
+WSGI_BASE_URL = "http://mock-api.wsgi"
+
+READY_TIMEOUT = 5.0
+
+# Connections kept open to the server under test
+POOL_SIZE = 16
+
+
+class WSGIAdapter(HTTPAdapter):
+    """requests transport adapter that calls a WSGI app instead of a socket"""
+
+    def __init__(self, wsgi_app):
+        super().__init__()
+        self.client = wsgi_app.test_client(use_cookies=False)
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        response = self.client.open(
+            url.path,
+            base_url=f"{url.scheme}://{url.netloc}",
+            query_string=url.query,
+            method=request.method,
+            headers=dict(request.headers),
+            data=request.body or b"",
+            buffered=True,
+        )
+        # build_response() decodes gzip/deflate and fills in the rest,
+        # exactly as for a response read off a socket
+        raw = HTTPResponse(
+            body=io.BytesIO(response.get_data()),
+            headers=list(response.headers.items()),
+            status=response.status_code,
+            reason=response.status.partition(" ")[2],
+            preload_content=False,
+            decode_content=True,
+        )
+        return self.build_response(request, raw)
+
+
+def wait_until_ready(url, timeout=READY_TIMEOUT):
+    """Poll GET /health until it answers 200"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if requests.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Mock API at {url} not ready after {timeout}s")
+        time.sleep(0.01)
+
+
+@pytest.fixture(scope="session")
+def live_server():
+    """
+    The mock app served on a free port in a background thread
+
+    Yields its base URL; the server is shut down when the session ends.
+    """
+    server = make_server(
+        "127.0.0.1",
+        0,
+        app,
+        threaded=True,
+        request_handler=KeepAliveRequestHandler,
+    )
+    thread = threading.Thread(
+        target=server.serve_forever,
+        kwargs={"poll_interval": 0.05},
+        name="mock-api-server",
+        daemon=True,
+    )
+    thread.start()
+
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        wait_until_ready(url)
+        logger.info(f"Mock API serving at {url}")
+        yield url
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@pytest.fixture(scope="session")
+def base_url(request):
+    """
+    Base URL of the API under test
+
+    For local testing: the in-process mock server (API_TEST_MODE=wsgi
+    for zero-socket mode)
+    For CI/CD: Set API_BASE_URL environment variable
+    """
+    url = os.getenv("API_BASE_URL")
+    if url is None:
+        mode = os.getenv("API_TEST_MODE", "server")
+        if mode not in ("server", "wsgi"):
+            raise pytest.UsageError(f"API_TEST_MODE must be server or wsgi, not {mode}")
+        url = (
+            WSGI_BASE_URL if mode == "wsgi" else request.getfixturevalue("live_server")
+        )
+
+    logger.info(f"Tests configured to use API: {url}")
+    return url
+
+
+@pytest.fixture
+def mock_http(live_server):
+    """
+    requests.Session on the in-process mock, in a tenant of its own
+
+    For tests of mock-only features (admin routes, tenants), which must not
+    run against API_BASE_URL. The tenant is dropped after the test.
+    """
+    tenant = f"test-{uuid.uuid4().hex[:8]}"
+    session = requests.Session()
+    session.headers[TENANT_HEADER] = tenant
+    yield session
+    session.delete(f"{live_server}/__admin/tenants/{tenant}")
+    session.close()
+
+
+@pytest.fixture
+def mock_client():
+    """
+    Flask test client in a tenant of its own
+
+    Writes made through it never reach the shared USERS / RESOURCES seen by
+    other tests. The tenant is dropped after the test.
+    """
+    tenant = f"test-{uuid.uuid4().hex[:8]}"
+    client = app.test_client()
+    client.environ_base[f"HTTP_{TENANT_HEADER.upper().replace('-', '_')}"] = tenant
+    yield client
+    client.delete(f"/__admin/tenants/{tenant}")
+
+
+def is_mock(base_url):
+    """True unless the tests run against a remote API (e.g. reqres.in)"""
+    return os.getenv("API_BASE_URL") is None or "localhost" in base_url
+
+
+@pytest.fixture(scope="session")
+def tenant(base_url):
+    """
+    Tenant name for this test worker, or None against a remote API
+
+    One per pytest-xdist worker ("master" without xdist) and process, so
+    concurrent sessions against one server stay apart too.
+    """
+    if not is_mock(base_url):
+        return None
+    worker = os.getenv("PYTEST_XDIST_WORKER", "master")
+    return f"pytest-{worker}-{os.getpid()}"
+
+
+@pytest.fixture(scope="session")
+def http(base_url, tenant):
+    """
+    requests.Session shared by the whole test session
+
+    Reuses up to POOL_SIZE keep-alive connections to base_url instead of
+    connecting for every request; in zero-socket mode it calls the app.
+    Requests go to the worker's tenant, which is dropped at the end.
+    """
+    session = requests.Session()
+    if base_url == WSGI_BASE_URL:
+        session.mount(WSGI_BASE_URL, WSGIAdapter(app))
+    else:
+        session.mount(base_url, HTTPAdapter(pool_maxsize=POOL_SIZE))
+    if tenant is not None:
+        session.headers[TENANT_HEADER] = tenant
+
+    yield session
+
+    if tenant is not None:
+        session.delete(f"{base_url}/__admin/tenants/{tenant}")
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def api(http, base_url):
+    """ApiClient (src/api_client.py) sending through the `http` session"""
+    return ApiClient(base_url, session=http)
+
+
+@pytest.fixture(scope="session")
+def baseline_snapshot(http, base_url, tenant):
+    """Snapshot of the worker's tenant before any test wrote to it"""
+    if tenant is None:
+        return None
+    response = http.post(f"{base_url}/__admin/snapshot", json={"name": "baseline"})
+    response.raise_for_status()
+    return response.json()["name"]
+
+
+@pytest.fixture(autouse=True)
+def restore_state(request):
+    """
+    Undo the writes of each test that used `http` (or `api`)
+
+    Restores cost O(writes made by the test), not O(data size).
+    """
+    if "http" not in request.fixturenames and "api" not in request.fixturenames:
+        yield
+        return
+
+    snapshot = request.getfixturevalue("baseline_snapshot")
+    yield
+    if snapshot is not None:
+        http = request.getfixturevalue("http")
+        base_url = request.getfixturevalue("base_url")
+        http.post(f"{base_url}/__admin/restore/{snapshot}").raise_for_status()
+
+
+@pytest.fixture(scope="session")
+def api_info(base_url):
+    """
+    Provide API information for tests
+    """
+    return {"base_url": base_url, "timeout": 10, "is_local": is_mock(base_url)}
+
+
+def pytest_configure(config):
+    """
+    Register custom markers
+    """
+    config.addinivalue_line(
+        "markers", "smoke: Quick smoke tests for critical functionality"
+    )
+    config.addinivalue_line("markers", "regression: Full regression test suite")
+    config.addinivalue_line("markers", "positive: Positive test scenarios (happy path)")
+    config.addinivalue_line(
+        "markers", "negative: Negative test scenarios (error handling)"
+    )
+    config.addinivalue_line("markers", "performance: Performance and timing tests")
+    config.addinivalue_line("markers", "api: API integration tests")
@@ -0,0 +1,130 @@
+"""
+API Client Tests
+File: tests/test_api_client.py
+
+Run tests: pytest -v tests/test_api_client.py
+"""
+
+import logging
+import socket
+import time
+
+import pytest
+import requests
+
+from api_client import ApiClient
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def client(live_server):
+    """Client on its own pool, recording backoff waits instead of sleeping"""
+    client = ApiClient(live_server, retries=4, seed=7)
+    client.waits = []
+    client._sleep = client.waits.append
+    yield client
+    client.clear_faults()
+    client.close()
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class TestApiClient:
+    """Test suite for the retrying, pooled API client"""
+
+    @pytest.mark.regression
+    def test_idempotent_requests_retried(self, client):
+        """Test that GETs get through injected 503s and POSTs are sent once"""
+        profile = {"error_rate": 0.5, "error_statuses": [503]}
+        client.set_faults({"seed": 1, "routes": {"get_user": profile}})
+
+        statuses = [client.get_user(2).status_code for _ in range(20)]
+        assert statuses == [200] * 20
+        assert client.waits, "Some GETs should have been retried"
+
+        client.set_faults({"routes": {"create_user": {"error_rate": 1.0}}})
+        client.waits.clear()
+        response = client.create_user(name="Once Only", job="QA")
+        assert response.status_code == 500
+        assert client.waits == [], "POST must not be retried"
+
+        logger.info("✅ Only idempotent requests retried")
+
+    @pytest.mark.regression
+    def test_connection_errors_retried_then_raised(self):
+        """Test that unreachable servers are retried a bounded number of times"""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        client = ApiClient(f"http://127.0.0.1:{port}", retries=2, timeout=1)
+        waits = []
+        client._sleep = waits.append
+
+        with pytest.raises(requests.ConnectionError):
+            client.health()
+        assert len(waits) == 2
+        with pytest.raises(requests.ConnectionError):
+            client.login(email="eve.holt@reqres.in", password="x")
+        assert len(waits) == 2, "POST gets no retries"
+
+        logger.info("✅ Connection errors retried, then raised")
+
+    @pytest.mark.regression
+    def test_backoff_is_jittered_and_capped(self):
+        """Test full-jitter bounds, the cap and Retry-After"""
+        client = ApiClient("http://unused", backoff=0.1, backoff_max=1.0, seed=3)
+
+        for attempt in range(8):
+            delays = [client.backoff_delay(attempt) for _ in range(50)]
+            ceiling = min(1.0, 0.1 * 2**attempt)
+            assert all(0 <= delay <= ceiling for delay in delays)
+            assert len(set(delays)) > 1, "Delays should be jittered"
+
+        assert client.backoff_delay(0, FakeResponse({"Retry-After": "0.5"})) == 0.5
+        assert client.backoff_delay(0, FakeResponse({})) <= 0.1
+
+        logger.info("✅ Backoff jittered within its bounds")
+
+    @pytest.mark.negative
+    @pytest.mark.parametrize("header", ["2", "86400", "1e309", "inf", "nan"])
+    def test_retry_after_is_capped(self, header):
+        """Test that a huge or non-finite Retry-After can't stall the client"""
+        client = ApiClient("http://unused", backoff=0.1, backoff_max=1.0, seed=3)
+
+        delay = client.backoff_delay(0, FakeResponse({"Retry-After": header}))
+
+        assert 0 <= delay <= 1.0
+
+        logger.info(f"✅ Retry-After {header} waited {delay:.2f}s")
+
+    @pytest.mark.performance
+    def test_first_available_probes_concurrently(self, client):
+        """Test that probing waits about one round trip, not one per id"""
+        latency = {"latency": {"dist": "fixed", "ms": 100}}
+        client.set_faults({"routes": {"get_user": latency}})
+        candidates = [999_991, 999_992, 999_993, 999_994, 999_995, 3]
+
+        started = time.perf_counter()
+        response, user_id = client.first_available_user(candidates)
+        elapsed = time.perf_counter() - started
+
+        assert user_id == 3 and response.json()["data"]["id"] == 3
+        assert elapsed < 0.35, f"Took {elapsed:.3f}s for {len(candidates)} probes"
+        assert client.first_available_user([999_991, 999_992]) == (None, None)
+
+        logger.info(f"✅ {len(candidates)} ids probed in {elapsed:.3f}s")
+
+    @pytest.mark.regression
+    def test_tenant_and_pages(self, live_server):
+        """Test that a tenant client pages through its own data only"""
+        with ApiClient(live_server, tenant="api-client-test") as client:
+            assert client.delete_user(1).status_code == 204
+            ids = [user["id"] for user in client.iter_users(per_page=5)]
+            assert ids == list(range(2, 13))
+            assert client.drop_tenant("api-client-test").status_code == 204
+
+        logger.info("✅ Tenant client walked its own pages")
@@ -0,0 +1,158 @@
+"""
+Async (ASGI) Serving Mode Tests
+File: tests/test_asgi.py
+
+Drives the ASGI app in-process, no server needed
+Run tests: pytest -v tests/test_asgi.py
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+import pytest
+
+import mock_api_server
+from asgi_app import app, split_delay
+from faults import FaultInjector
+from mock_api_server import FAULTS
+from ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+async def asgi_get(path, query=b""):
+    """Send one GET through the ASGI app and return (status, body)"""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "query_string": query,
+        "headers": [(b"host", b"testserver")],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    status = messages[0]["status"]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return status, body
+
+
+class TestAsyncServing:
+    """Test suite for the ASGI serving mode"""
+
+    @pytest.mark.regression
+    def test_get_user_via_asgi(self):
+        """Test that ASGI mode serves the same routes - GET /api/users/{id}"""
+        status, body = asyncio.run(asgi_get("/api/users/1"))
+
+        assert status == 200, f"Expected 200, got {status}"
+        assert json.loads(body)["data"]["id"] == 1
+
+        logger.info("✅ ASGI app served /api/users/1")
+
+    @pytest.mark.regression
+    def test_split_delay_keeps_other_params(self):
+        """Test that ?delay=N is removed and other params are kept"""
+        assert split_delay("page=2&delay=3") == (3, "page=2")
+        assert split_delay("page=2") == (0, "page=2")
+        assert split_delay("delay=abc") == (0, "delay=abc")
+
+    @pytest.mark.performance
+    def test_delayed_requests_do_not_starve_fast_routes(self):
+        """Test that many concurrent ?delay=1 requests don't block /health"""
+        slow_count = 500
+
+        async def scenario():
+            slow = [
+                asyncio.create_task(asgi_get("/api/users", b"delay=1"))
+                for _ in range(slow_count)
+            ]
+            await asyncio.sleep(0.05)
+
+            started = time.perf_counter()
+            health_status, _ = await asgi_get("/health")
+            health_time = time.perf_counter() - started
+
+            results = await asyncio.gather(*slow)
+            return health_status, health_time, results
+
+        started = time.perf_counter()
+        health_status, health_time, results = asyncio.run(scenario())
+        total_time = time.perf_counter() - started
+
+        assert health_status == 200
+        assert health_time < 0.5, f"/health took {health_time:.2f}s behind sleepers"
+        assert all(status == 200 for status, _ in results)
+        assert total_time < 5.0, f"{slow_count} delayed requests took {total_time:.2f}s"
+
+        logger.info(
+            f"✅ {slow_count} delayed requests finished in {total_time:.2f}s, "
+            f"/health answered in {health_time * 1000:.1f}ms"
+        )
+
+    @pytest.mark.performance
+    def test_injected_latency_is_awaited(self):
+        """Test that fault-profile latency doesn't hold the event loop"""
+        FAULTS.load({"routes": {"get_user": {"latency": {"dist": "fixed", "ms": 300}}}})
+
+        async def scenario():
+            return await asyncio.gather(*(asgi_get("/api/users/1") for _ in range(50)))
+
+        try:
+            started = time.perf_counter()
+            results = asyncio.run(scenario())
+            elapsed = time.perf_counter() - started
+        finally:
+            FAULTS.clear()
+
+        assert all(status == 200 for status, _ in results)
+        assert 0.3 <= elapsed < 2.0, f"50 x 300ms requests took {elapsed:.2f}s"
+
+        logger.info(f"✅ 50 requests with 300ms injected latency in {elapsed:.2f}s")
+
+    @pytest.mark.regression
+    def test_rate_limit_before_faults(self, monkeypatch):
+        """Test that a rate-limited request gets its 429 before any fault"""
+        limiter = RateLimiter(rate=0.001, burst=2)
+        monkeypatch.setattr(mock_api_server, "RATE_LIMITER", limiter)
+        FAULTS.load(
+            {
+                "seed": 7,
+                "routes": {
+                    "get_user": {
+                        "latency": {"dist": "fixed", "ms": 200},
+                        "error_rate": 0.5,
+                    }
+                },
+            }
+        )
+        expected = FaultInjector(FAULTS.profile)
+
+        async def scenario():
+            return [await asgi_get("/api/users/1") for _ in range(4)]
+
+        try:
+            started = time.perf_counter()
+            statuses = [status for status, _ in asyncio.run(scenario())]
+            elapsed = time.perf_counter() - started
+            next_draw = FAULTS.draw("get_user")
+        finally:
+            FAULTS.clear()
+
+        allowed = [expected.draw("get_user") for _ in range(2)]
+        assert statuses == [status or 200 for _, status in allowed] + [429, 429]
+        assert elapsed < 0.6, "The 429s waited out the injected latency"
+        assert next_draw == expected.draw("get_user"), "429s took fault draws"
+
+        logger.info(f"✅ Rate limit applied before faults: {statuses}")
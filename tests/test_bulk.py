@@ -0,0 +1,159 @@
+"""
+Bulk User Endpoint Tests
+File: tests/test_bulk.py
+
+Run tests: pytest -v tests/test_bulk.py
+"""
+
+import json
+import logging
+
+import pytest
+
+from store import Store
+
+logger = logging.getLogger(__name__)
+
+NDJSON = "application/x-ndjson"
+
+
+class TestBulkUsers:
+    """Test suite for /api/users/bulk"""
+
+    @pytest.mark.regression
+    def test_bulk_create(self, mock_client):
+        """Test creating many users in one request - POST /api/users/bulk"""
+        users = [{"name": f"Bulk User{n}", "job": "QA"} for n in range(100)]
+
+        response = mock_client.post("/api/users/bulk", json=users)
+        results = response.json["results"]
+
+        assert response.status_code == 200
+        assert [result["status"] for result in results] == [201] * 100
+        assert len({result["id"] for result in results}) == 100
+
+        last = mock_client.get(f"/api/users/{results[-1]['id']}").json["data"]
+        assert last["first_name"] == "Bulk" and last["last_name"] == "User99"
+
+        logger.info("✅ Created 100 users in one request")
+
+    @pytest.mark.regression
+    def test_bulk_patch_reports_missing_users(self, mock_client):
+        """Test per-item statuses for PATCH /api/users/bulk"""
+        created = mock_client.post("/api/users/bulk", json=[{"name": "Patch Me"}])
+        user_id = int(created.json["results"][0]["id"])
+
+        response = mock_client.patch(
+            "/api/users/bulk",
+            json=[{"id": user_id, "first_name": "Patched"}, {"id": 999999}, {}],
+        )
+        statuses = [result["status"] for result in response.json["results"]]
+
+        assert statuses == [200, 404, 400]
+        patched = mock_client.get(f"/api/users/{user_id}").json["data"]
+        assert patched["first_name"] == "Patched"
+
+    @pytest.mark.regression
+    def test_bulk_delete(self, mock_client):
+        """Test deleting many users in one request - DELETE /api/users/bulk"""
+        created = mock_client.post("/api/users/bulk", json=[{"name": "A B"}] * 3)
+        ids = [int(result["id"]) for result in created.json["results"]]
+
+        response = mock_client.delete("/api/users/bulk", json=ids + [{"id": 999999}])
+        statuses = [result["status"] for result in response.json["results"]]
+
+        assert statuses == [204, 204, 204, 404]
+        assert all(mock_client.get(f"/api/users/{i}").status_code == 404 for i in ids)
+
+    @pytest.mark.regression
+    def test_bulk_create_ndjson(self, mock_client):
+        """Test the NDJSON variant streams one result line per input line"""
+        body = "".join(json.dumps({"name": f"Nd User{n}"}) + "\n" for n in range(5))
+
+        response = mock_client.post("/api/users/bulk", data=body, content_type=NDJSON)
+        lines = [json.loads(line) for line in response.data.splitlines()]
+
+        assert response.mimetype == NDJSON
+        assert [line["status"] for line in lines] == [201] * 5
+
+    @pytest.mark.regression
+    def test_bulk_patch_item_status_field(self, mock_client):
+        """Test that an item's own "status" field doesn't shift the results"""
+        created = mock_client.post("/api/users/bulk", json=[{"name": "A B"}] * 2)
+        first, second = (int(result["id"]) for result in created.json["results"])
+
+        response = mock_client.patch(
+            "/api/users/bulk",
+            json=[
+                {"id": first, "status": 404, "first_name": "One"},
+                {"id": 999999},
+                {"id": second, "first_name": "Two"},
+            ],
+        )
+        statuses = [result["status"] for result in response.json["results"]]
+
+        assert statuses == [200, 404, 200]
+        assert (
+            mock_client.get(f"/api/users/{first}").json["data"]["first_name"] == "One"
+        )
+        assert (
+            mock_client.get(f"/api/users/{second}").json["data"]["first_name"] == "Two"
+        )
+
+    @pytest.mark.negative
+    def test_bulk_rejects_malformed_ndjson(self, mock_client):
+        """Test that a bad NDJSON line gets a 400 naming the line"""
+        body = '{"name": "Ok User"}\n{"name": \n'
+
+        response = mock_client.post("/api/users/bulk", data=body, content_type=NDJSON)
+
+        assert response.status_code == 400
+        assert "Line 2" in response.json["error"]
+
+    @pytest.mark.negative
+    @pytest.mark.parametrize("method", ["patch", "delete"])
+    def test_bulk_rejects_boolean_ids(self, mock_client, method):
+        """Test that true/false aren't taken as user ids 1/0"""
+        send = getattr(mock_client, method)
+
+        response = send("/api/users/bulk", json=[True, {"id": True, "name": "X Y"}])
+
+        assert [r["status"] for r in response.json["results"]] == [400, 400]
+        user = mock_client.get("/api/users/1").json["data"]
+        assert user["first_name"] != "X"
+
+    @pytest.mark.negative
+    def test_bulk_rejects_non_array(self, mock_client):
+        """Test that a JSON object body is rejected with 400"""
+        response = mock_client.post("/api/users/bulk", json={"name": "Not A List"})
+
+        assert response.status_code == 400
+        assert "error" in response.json
+
+
+class TestStoreTransaction:
+    """Test suite for Store.apply"""
+
+    @pytest.mark.regression
+    def test_apply_returns_per_op_results(self):
+        """Test that a batch returns what each single-op method would"""
+        store = Store({1: {"id": 1, "name": "one"}})
+
+        results = store.apply(
+            [
+                ("put", {"id": 2, "name": "two"}),
+                ("update", 1, {"name": "uno"}),
+                ("update", 3, {"name": "missing"}),
+                ("delete", 2),
+                ("delete", 2),
+            ]
+        )
+
+        assert results == [
+            {"id": 2, "name": "two"},
+            {"id": 1, "name": "uno"},
+            None,
+            True,
+            False,
+        ]
+        assert len(store) == 1 and store.allocate_id() == 3
@@ -0,0 +1,83 @@
+"""
+Response Compression Tests
+File: tests/test_compression.py
+
+Run tests: pytest -v tests/test_compression.py
+"""
+
+import gzip
+import json
+import logging
+import zlib
+
+import pytest
+
+from mock_api_server import RESPONSE_CACHE, app
+
+logger = logging.getLogger(__name__)
+
+BIG_PAGE = {"page": 1, "per_page": 100}
+
+
+class TestCompression:
+    """Test suite for Accept-Encoding negotiation on list endpoints"""
+
+    @pytest.mark.regression
+    def test_gzip_list_page(self):
+        """Test that a large page is gzipped when the client accepts gzip"""
+        client = app.test_client()
+        plain = client.get("/api/users", query_string=BIG_PAGE)
+        zipped = client.get(
+            "/api/users",
+            query_string=BIG_PAGE,
+            headers={"Accept-Encoding": "gzip, deflate"},
+        )
+
+        assert zipped.status_code == 200
+        assert zipped.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in zipped.headers["Vary"]
+        assert len(zipped.data) < len(plain.data)
+        assert json.loads(gzip.decompress(zipped.data)) == plain.json
+        assert zipped.headers["ETag"] != plain.headers["ETag"]
+
+        logger.info(f"✅ gzip: {len(plain.data)} -> {len(zipped.data)} bytes")
+
+    @pytest.mark.regression
+    def test_deflate_by_preference(self):
+        """Test that q-values pick deflate over gzip"""
+        client = app.test_client()
+        response = client.get(
+            "/api/users",
+            query_string=BIG_PAGE,
+            headers={"Accept-Encoding": "gzip;q=0.5, deflate"},
+        )
+
+        assert response.headers["Content-Encoding"] == "deflate"
+        assert json.loads(zlib.decompress(response.data))["page"] == 1
+
+    @pytest.mark.negative
+    def test_small_bodies_are_not_compressed(self):
+        """Test that bodies under the size threshold are sent as-is"""
+        client = app.test_client()
+        headers = {"Accept-Encoding": "gzip"}
+
+        for path in ("/api/users/1", "/health"):
+            response = client.get(path, headers=headers)
+            assert "Content-Encoding" not in response.headers, path
+
+    @pytest.mark.regression
+    def test_compressed_bytes_are_cached(self, monkeypatch):
+        """Test that a repeated page reuses the cached compressed bytes"""
+        monkeypatch.setitem(app.config, "COMPRESSION_MIN_SIZE", 0)
+        client = app.test_client()
+        params = {"page": 1, "per_page": 50}
+        headers = {"Accept-Encoding": "gzip"}
+
+        first = client.get("/api/unknown", query_string=params, headers=headers)
+        entry = RESPONSE_CACHE.get(("resources", "page", 1, 50))
+        cached = entry.encoded["gzip"]
+        second = client.get("/api/unknown", query_string=params, headers=headers)
+
+        assert first.headers["Content-Encoding"] == "gzip"
+        assert second.data == first.data == cached
+        assert entry.encoded["gzip"] is cached, "Page should not be recompressed"
@@ -0,0 +1,100 @@
+"""
+Synthetic Dataset Generator Tests
+File: tests/test_datagen.py
+
+Run tests: pytest -v tests/test_datagen.py
+"""
+
+import io
+import json
+import logging
+
+import pytest
+
+from datagen import chunked, generate_resources, generate_users, to_ndjson, write_jsonl
+from mock_api_server import RESOURCES, USERS
+
+logger = logging.getLogger(__name__)
+
+
+class TestDatasetGenerator:
+    """Test suite for the synthetic data generator"""
+
+    @pytest.mark.regression
+    def test_same_seed_same_rows(self):
+        """Test that a seed always produces identical rows"""
+        first = list(generate_users(50, seed=7))
+        second = list(generate_users(50, seed=7))
+        other = list(generate_users(50, seed=8))
+
+        assert first == second, "Same seed should give the same rows"
+        assert first != other, "Different seeds should give different rows"
+
+    @pytest.mark.regression
+    def test_rows_match_store_shape(self):
+        """Test that generated rows have the same fields as the seed data"""
+        user = next(generate_users(1, start_id=100))
+        resource = next(generate_resources(1, start_id=100))
+
+        assert set(user) == set(USERS.get(1)), "User fields should match USERS"
+        assert set(resource) == set(RESOURCES.get(1)), "Resource fields should match"
+        assert user["id"] == 100 and resource["id"] == 100
+
+    @pytest.mark.regression
+    def test_chunks_are_bounded(self):
+        """Test that streaming never builds chunks larger than chunk_size"""
+        sizes = [len(chunk) for chunk in chunked(generate_users(2500), 1000)]
+        assert sizes == [1000, 1000, 500]
+
+        out = io.StringIO()
+        written = write_jsonl(generate_resources(25), out, chunk_size=10)
+        lines = out.getvalue().splitlines()
+
+        assert written == 25 and len(lines) == 25
+        assert json.loads(lines[-1])["id"] == 25
+
+    @pytest.mark.regression
+    def test_admin_load_into_store(self, mock_client):
+        """Test loading NDJSON chunks into the server - POST /__admin/load/users"""
+        users = list(generate_users(20, seed=1, start_id=5000))
+
+        response = mock_client.post(
+            "/__admin/load/users",
+            data=to_ndjson(users),
+            content_type="application/x-ndjson",
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()["loaded"] == 20
+        assert mock_client.get("/api/users/5019").get_json()["data"] == users[-1]
+
+        created = mock_client.post("/api/users", json={"name": "After Load"}).get_json()
+        assert int(created["id"]) > 5019, "New ids should follow loaded ids"
+
+        logger.info("✅ Loaded 20 generated users into the store")
+
+    @pytest.mark.negative
+    @pytest.mark.parametrize(
+        "bad_line",
+        [
+            "{not json",
+            '["id", 1]',
+            '{"first_name": "No Id"}',
+            '{"id": "77"}',
+            '{"id": true}',
+        ],
+    )
+    def test_admin_load_rejects_bad_lines(self, mock_client, bad_line):
+        """Test that a bad NDJSON line gets a 400 and nothing is loaded"""
+        users = list(generate_users(3, seed=2, start_id=6000))
+        body = to_ndjson(users[:2]) + bad_line + "\n" + to_ndjson(users[2:])
+
+        response = mock_client.post(
+            "/__admin/load/users", data=body, content_type="application/x-ndjson"
+        )
+
+        assert response.status_code == 400
+        assert "Line 3" in response.get_json()["error"]
+        assert mock_client.get("/api/users/6000").status_code == 404
+
+        logger.info(f"✅ {bad_line!r} rejected before loading")
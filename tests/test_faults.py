@@ -0,0 +1,169 @@
+"""
+Latency and Error Injection Tests
+File: tests/test_faults.py
+
+Run tests: pytest -v tests/test_faults.py
+"""
+
+import logging
+import statistics
+import time
+
+import pytest
+
+from faults import FaultInjector, InvalidProfile, RouteFaults
+from mock_api_server import FAULTS, app
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def client():
+    """Test client; the shared fault profile is cleared afterwards"""
+    yield app.test_client()
+    FAULTS.clear()
+
+
+def draws(route, count):
+    return [route.draw() for _ in range(count)]
+
+
+class TestFaultProfiles:
+    """Test suite for fault profile sampling"""
+
+    @pytest.mark.regression
+    def test_lognormal_matches_percentiles(self):
+        """Test that lognormal latency hits the configured p50 and p99"""
+        route = RouteFaults(
+            {"latency": {"dist": "lognormal", "p50_ms": 40, "p99_ms": 800}}, seed=1
+        )
+        delays = sorted(delay for delay, _ in draws(route, 20000))
+
+        p50 = delays[len(delays) // 2] * 1000
+        p99 = delays[int(len(delays) * 0.99)] * 1000
+
+        assert 36 < p50 < 44, f"p50 was {p50:.1f}ms"
+        assert 640 < p99 < 960, f"p99 was {p99:.1f}ms"
+
+        logger.info(f"✅ lognormal p50={p50:.1f}ms p99={p99:.1f}ms")
+
+    @pytest.mark.regression
+    def test_errors_follow_rate_and_statuses(self):
+        """Test the error rate and that only configured statuses are returned"""
+        route = RouteFaults({"error_rate": 0.25, "error_statuses": [502, 503]}, seed=2)
+        statuses = [status for _, status in draws(route, 8000)]
+        errors = [status for status in statuses if status is not None]
+
+        assert 0.22 < len(errors) / len(statuses) < 0.28
+        assert set(errors) == {502, 503}
+        assert statistics.mean(delay for delay, _ in draws(route, 10)) == 0
+
+        logger.info(f"✅ {len(errors)} of {len(statuses)} requests failed")
+
+    @pytest.mark.regression
+    def test_seeded_runs_are_reproducible(self):
+        """Test that a seed gives the same draws per route, however routes interleave"""
+        profile = {
+            "seed": 42,
+            "routes": {
+                "get_user": {
+                    "latency": {"dist": "uniform", "min_ms": 1, "max_ms": 100},
+                    "error_rate": 0.3,
+                },
+                "*": {"latency": {"dist": "uniform", "min_ms": 1, "max_ms": 5}},
+            },
+        }
+        first, second = FaultInjector(profile), FaultInjector(profile)
+
+        expected = [first.draw("get_user") for _ in range(50)]
+        interleaved = []
+        for _ in range(50):
+            second.draw("get_users")
+            interleaved.append(second.draw("get_user"))
+
+        assert interleaved == expected
+
+        logger.info("✅ Seeded draws reproducible per route")
+
+    @pytest.mark.negative
+    @pytest.mark.parametrize(
+        "profile",
+        [
+            {"routes": {"*": {"latency": {"dist": "pareto"}}}},
+            {"routes": {"*": {"latency": {"dist": "uniform", "min_ms": 5}}}},
+            {"routes": {"*": {"error_rate": 1.5}}},
+            {"routes": ["get_users"]},
+            {"routes": {"*": "slow"}},
+            {"routes": {"*": {"latency": 50}}},
+            {"routes": {"*": {"error_rate": 0.5, "error_statuses": ["boom"]}}},
+            {"routes": {"*": {"error_rate": 0.5, "error_statuses": 503}}},
+            {"routes": {"*": {"error_rate": 0.5, "error_statuses": [42]}}},
+            {"routes": {"*": {"error_rate": 0.5, "error_statuses": [101]}}},
+            {"routes": {"*": {"error_rate": 0.5, "error_statuses": [204]}}},
+        ],
+    )
+    def test_invalid_profiles_rejected(self, profile):
+        """Test that malformed profiles raise InvalidProfile"""
+        with pytest.raises(InvalidProfile):
+            FaultInjector(profile)
+
+        logger.info("✅ Invalid profile rejected")
+
+
+class TestFaultInjectionRoutes:
+    """Test suite for faults applied to the running routes"""
+
+    @pytest.mark.regression
+    def test_errors_injected_per_route(self, client):
+        """Test that a route fails as profiled while /health and admin don't"""
+        profile = {
+            "routes": {
+                "get_user": {"error_rate": 1, "error_statuses": [503]},
+                "*": {"error_rate": 1, "error_statuses": [500]},
+            }
+        }
+        assert client.put("/__admin/faults", json=profile).status_code == 200
+
+        assert client.get("/api/users/1").status_code == 503
+        assert client.get("/api/unknown").status_code == 500
+        assert client.get("/health").status_code == 200
+        assert client.get("/__admin/faults").json == profile
+
+        assert client.delete("/__admin/faults").status_code == 204
+        assert client.get("/api/users/1").status_code == 200
+
+        logger.info("✅ Errors injected per route")
+
+    @pytest.mark.regression
+    def test_latency_injected(self, client):
+        """Test that a fixed latency delays the profiled route"""
+        client.put(
+            "/__admin/faults",
+            json={"routes": {"get_users": {"latency": {"dist": "fixed", "ms": 150}}}},
+        )
+
+        started = time.perf_counter()
+        response = client.get("/api/users")
+        elapsed = time.perf_counter() - started
+
+        assert response.status_code == 200
+        assert elapsed >= 0.15, f"Request took only {elapsed * 1000:.0f}ms"
+
+        logger.info(f"✅ Request delayed {elapsed * 1000:.0f}ms")
+
+    @pytest.mark.negative
+    @pytest.mark.parametrize(
+        "route",
+        [{"error_rate": "x"}, {"error_rate": 1, "error_statuses": [101]}],
+    )
+    def test_invalid_profile_via_admin(self, client, route):
+        """Test that PUT /__admin/faults rejects a bad profile and keeps the old one"""
+        good = {"routes": {"get_user": {"error_rate": 0}}}
+        client.put("/__admin/faults", json=good)
+
+        response = client.put("/__admin/faults", json={"routes": {"get_user": route}})
+
+        assert response.status_code == 400
+        assert client.get("/__admin/faults").json == good
+
+        logger.info("✅ Invalid profile rejected by admin API")
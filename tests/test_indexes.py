@@ -0,0 +1,197 @@
+"""
+Secondary Index, Filtering and Sorting Tests
+File: tests/test_indexes.py
+
+Run tests: pytest -v tests/test_indexes.py
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from datagen import generate_users
+from indexes import DuplicateKey
+from mock_api_server import app, user_indexes
+from pagination import parse_sort
+from store import Store
+
+logger = logging.getLogger(__name__)
+
+SORT_FIELDS = ("id", "email", "first_name", "last_name")
+
+
+def make_users(count):
+    """Indexed store of synthetic users 1..count"""
+    users = {user["id"]: user for user in generate_users(count, seed=7)}
+    return Store(users, indexes=user_indexes())
+
+
+def expected_order(store, sort):
+    """Reference ordering: sort every record, ties by id in the first direction"""
+    keys = [*sort]
+    if "id" not in (field for field, _ in keys):
+        keys.append(("id", keys[0][1]))
+
+    records = [store.get(record_id) for record_id in range(1, len(store) + 1)]
+    for field, descending in reversed(keys):
+        records.sort(key=lambda record: record[field], reverse=descending)
+    return [record["id"] for record in records]
+
+
+class TestSecondaryIndexes:
+    """Test suite for filtered and sorted store pages"""
+
+    @pytest.mark.regression
+    def test_filters_follow_writes(self):
+        """Test that email/last_name filters see creates, updates and deletes"""
+        store = make_users(500)
+        holt = store.page(per_page=100, filters={"last_name": "Holt"})["data"]
+        assert holt and all(user["last_name"] == "Holt" for user in holt)
+
+        moved = holt[0]["id"]
+        store.update(moved, {"last_name": "Moved"})
+        store.put({"id": 501, "email": "new@mail.test", "last_name": "Holt"})
+        store.delete(holt[1]["id"])
+
+        after = store.page(per_page=100, filters={"last_name": "Holt"})["data"]
+        ids = [user["id"] for user in after]
+        assert moved not in ids and holt[1]["id"] not in ids and 501 in ids
+        assert store.page(filters={"email": "new@mail.test"})["data"][0]["id"] == 501
+        assert store.page(filters={"last_name": "Moved"})["total"] == 1
+
+        logger.info("✅ Filters stay current through writes")
+
+    @pytest.mark.regression
+    @pytest.mark.parametrize(
+        "sort", ["-id", "last_name", "-last_name", "last_name,-id", "email,first_name"]
+    )
+    def test_sorted_pages_match_full_sort(self, sort):
+        """Test that sorted pages (indexed or not) match sorting every record"""
+        store = make_users(300)
+        spec = parse_sort(sort, SORT_FIELDS)
+        expected = expected_order(store, spec)
+
+        ids = []
+        for page in range(1, 8):
+            data = store.page(page=page, per_page=50, sort=spec)["data"]
+            ids.extend(user["id"] for user in data)
+
+        assert ids == expected
+
+        logger.info(f"✅ sort={sort} matches a full sort")
+
+    @pytest.mark.regression
+    def test_unique_email(self):
+        """Test that two users can never share an email"""
+        store = make_users(10)
+        taken = store.get(1)["email"]
+
+        with pytest.raises(DuplicateKey):
+            store.put({"id": 11, "email": taken})
+        with pytest.raises(DuplicateKey):
+            store.update(2, {"email": taken})
+
+        results = store.apply([("put", {"id": 12, "email": taken}), ("delete", 1)])
+        assert isinstance(results[0], DuplicateKey) and results[1] is True
+
+        store.put({"id": 13, "email": taken})
+        assert store.update(13, {"first_name": "Same"})["email"] == taken
+        assert 11 not in store and 12 not in store
+
+        logger.info("✅ Duplicate emails rejected")
+
+    @pytest.mark.regression
+    def test_concurrent_creates_with_same_email(self):
+        """Test that racing creates with one email leave exactly one user"""
+        store = make_users(10)
+
+        def create(n):
+            try:
+                store.put({"id": store.allocate_id(), "email": "race@mail.test"})
+                return True
+            except DuplicateKey:
+                return False
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            created = list(pool.map(create, range(200)))
+
+        assert created.count(True) == 1
+        assert store.page(filters={"email": "race@mail.test"})["total"] == 1
+
+        logger.info("✅ One of 200 racing creates won the email")
+
+    @pytest.mark.performance
+    def test_filtered_lookup_does_not_scan(self):
+        """Test that filtered pages cost about the same at 200k users as at 2k"""
+        small, large = make_users(2000), make_users(200_000)
+        email = large.get(150_000)["email"]
+
+        def time_lookups(store, email):
+            store.page(filters={"email": email})  # builds the indexes
+            started = time.perf_counter()
+            for _ in range(200):
+                store.page(filters={"email": email})
+            return time.perf_counter() - started
+
+        small_time = time_lookups(small, small.get(1500)["email"])
+        large_time = time_lookups(large, email)
+
+        assert large.page(filters={"email": email})["data"][0]["id"] == 150_000
+        assert large_time < small_time * 5 + 0.01
+
+        logger.info(
+            f"✅ 200 lookups: {small_time:.4f}s at 2k, {large_time:.4f}s at 200k"
+        )
+
+
+class TestUserQueryRoutes:
+    """Test suite for ?email=, ?last_name= and ?sort= on GET /api/users"""
+
+    @pytest.mark.regression
+    def test_filter_and_sort_params(self):
+        """Test filtering and sorting through GET /api/users"""
+        client = app.test_client()
+
+        by_name = client.get("/api/users", query_string={"last_name": "Three"})
+        by_email = client.get("/api/users", query_string={"email": "user5@gmail.com"})
+        newest = client.get("/api/users", query_string={"sort": "-id", "per_page": 1})
+
+        assert [user["id"] for user in by_name.json["data"]] == [3]
+        assert by_name.json["total"] == 1
+        assert [user["id"] for user in by_email.json["data"]] == [5]
+        last = client.get(
+            "/api/users", query_string={"per_page": 1, "page": newest.json["total"]}
+        )
+        assert newest.json["data"] == last.json["data"]
+
+        logger.info("✅ Filter and sort params served")
+
+    @pytest.mark.negative
+    @pytest.mark.parametrize(
+        "query", [{"sort": "password"}, {"sort": "id", "limit": 5}]
+    )
+    def test_bad_sort_rejected(self, query):
+        """Test unknown sort fields and sorted cursor pages get a 400"""
+        response = app.test_client().get("/api/users", query_string=query)
+
+        assert response.status_code == 400
+        assert "error" in response.json
+
+        logger.info(f"✅ {query} rejected")
+
+    @pytest.mark.negative
+    def test_duplicate_email_conflicts(self, mock_client):
+        """Test that creating a user with a taken email returns 409"""
+        body = {"name": "Dup Licate", "job": "QA", "email": "dup@mail.test"}
+
+        first = mock_client.post("/api/users", json=body)
+        second = mock_client.post("/api/users", json=body)
+        bulk = mock_client.post("/api/users/bulk", json=[body, {"name": "Fresh One"}])
+
+        assert first.status_code == 201
+        assert second.status_code == 409
+        assert [r["status"] for r in bulk.json["results"]] == [409, 201]
+
+        logger.info("✅ Duplicate email answered with 409")
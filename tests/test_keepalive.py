@@ -0,0 +1,119 @@
+"""
+HTTP/1.1 Keep-Alive Tests
+File: tests/test_keepalive.py
+
+Run tests: pytest -v tests/test_keepalive.py
+"""
+
+import http.client
+import logging
+from urllib.parse import urlsplit
+
+import pytest
+
+from mock_api_server import app
+from recording import RecordingMiddleware, TrafficRecorder
+
+logger = logging.getLogger(__name__)
+
+
+def connect(live_server):
+    url = urlsplit(live_server)
+    return http.client.HTTPConnection(url.hostname, url.port, timeout=5)
+
+
+class TestKeepAlive:
+    """Test suite for persistent connections on the server"""
+
+    @pytest.mark.regression
+    def test_connection_reused(self, live_server):
+        """Test that consecutive requests share one connection"""
+        conn = connect(live_server)
+
+        statuses = []
+        for path in ("/api/users/1", "/api/users?page=2", "/health"):
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            statuses.append(response.status)
+            if path == "/api/users/1":
+                sock = conn.sock
+            assert response.getheader("Connection") != "close"
+
+        assert statuses == [200, 200, 200]
+        assert conn.sock is sock, "No reconnect between requests"
+        conn.close()
+
+        logger.info("✅ Three requests on one connection")
+
+    @pytest.mark.regression
+    def test_unread_body_drained(self, live_server):
+        """Test that a body the route ignores doesn't corrupt the next request"""
+        conn = connect(live_server)
+
+        conn.request("DELETE", "/api/users/999999", body=b"GET /evil HTTP/1.1\r\n\r\n")
+        first = conn.getresponse()
+        first.read()
+        sock = conn.sock
+        conn.request("GET", "/api/users/2")
+        second = conn.getresponse()
+
+        assert first.status == 204
+        assert second.status == 200 and second.read()
+        assert conn.sock is sock
+        conn.close()
+
+        logger.info("✅ Unread request body skipped")
+
+    @pytest.mark.negative
+    def test_close_when_asked(self, live_server):
+        """Test that Connection: close and chunked uploads still close"""
+        conn = connect(live_server)
+        conn.request("GET", "/health", headers={"Connection": "close"})
+        response = conn.getresponse()
+        response.read()
+        assert response.getheader("Connection") == "close"
+        conn.close()
+
+        conn = connect(live_server)
+        conn.request(
+            "POST",
+            "/api/login",
+            body=iter([b'{"email": "a@b.c", ', b'"password": "x"}']),
+            headers={"Content-Type": "application/json"},
+            encode_chunked=True,
+        )
+        response = conn.getresponse()
+        assert response.status == 200 and response.read()
+        assert response.getheader("Connection") == "close"
+        conn.close()
+
+        logger.info("✅ Connection closed on request")
+
+    @pytest.mark.regression
+    def test_replaced_input_stream(self, live_server, tmp_path, monkeypatch):
+        """Test that middleware swapping wsgi.input (recording) keeps reuse"""
+        traffic = TrafficRecorder(tmp_path / "traffic.jsonl")
+        monkeypatch.setattr(app, "wsgi_app", RecordingMiddleware(app.wsgi_app, traffic))
+        conn = connect(live_server)
+
+        conn.request(
+            "POST",
+            "/api/login",
+            body=b'{"email": "x"}',
+            headers={"Content-Type": "application/json"},
+        )
+        first = conn.getresponse()
+        first.read()
+        sock = conn.sock
+        conn.request("GET", "/api/users/2")
+        second = conn.getresponse()
+
+        assert first.status == 400
+        assert second.status == 200 and second.read()
+        assert conn.sock is sock
+        conn.close()
+        monkeypatch.undo()
+        traffic.close()
+
+        logger.info("✅ Connection reused under the recording middleware")
@@ -0,0 +1,101 @@
+"""
+Load Generator Tests
+File: tests/test_loadgen.py
+
+Run tests: pytest -v tests/test_loadgen.py
+"""
+
+import argparse
+import asyncio
+import logging
+from collections import Counter
+
+import pytest
+
+from loadgen import (
+    DEFAULT_MIX,
+    Workload,
+    format_routes,
+    generate_load,
+    parse_args,
+    parse_mix,
+)
+from mock_api_server import USERS
+
+logger = logging.getLogger(__name__)
+
+
+class TestWorkload:
+    """Test suite for the weighted route mix"""
+
+    @pytest.mark.regression
+    def test_mix_weights_followed(self):
+        """Test that routes are picked in proportion to their weights"""
+        workload = Workload(parse_mix("get_user=3,login=1"), seed=1)
+
+        picked = Counter(workload.next_request()[0] for _ in range(4000))
+
+        assert set(picked) == {"get_user", "login"}
+        assert 2.6 < picked["get_user"] / picked["login"] < 3.4
+
+        logger.info(f"✅ Mix followed: {dict(picked)}")
+
+    @pytest.mark.negative
+    def test_bad_mix_rejected(self):
+        """Test that unknown routes and bad weights are rejected"""
+        bad_mixes = ("get_user=1,nope=2", "get_user=x", "get_user=-1", "login=0")
+        for bad in bad_mixes + ("get_user=nan", "get_user=inf"):
+            with pytest.raises(argparse.ArgumentTypeError):
+                parse_mix(bad)
+
+        logger.info("✅ Bad mixes rejected")
+
+    @pytest.mark.negative
+    def test_bad_mix_reported_by_cli(self, capsys):
+        """Test that --mix errors reach the user instead of argparse's generic one"""
+        with pytest.raises(SystemExit):
+            parse_args(["--mix", "get_user=1,nope=2"])
+
+        assert "Unknown route 'nope'" in capsys.readouterr().err
+
+        logger.info("✅ --mix error shown")
+
+
+class TestLoadGenerator:
+    """Test suite for load runs against a live server"""
+
+    @pytest.mark.performance
+    def test_closed_loop(self, live_server):
+        """Test a closed-loop run covers every route without errors"""
+        users_before = len(USERS)
+
+        summary = asyncio.run(
+            generate_load(live_server, concurrency=4, requests=300, seed=7)
+        )
+
+        assert summary["mode"] == "closed"
+        assert summary["requests"] == 300 and summary["failed"] == 0
+        assert set(summary["routes"]) == set(DEFAULT_MIX)
+        assert summary["server_errors"] == 0
+        assert summary["connections_opened"] <= 4, "Connections are kept alive"
+        assert summary["latency_ms"]["p95"] <= summary["latency_ms"]["max"]
+        assert "get_user" in format_routes(summary)
+        assert len(USERS) - users_before <= summary["routes"]["create_user"]["requests"]
+
+        logger.info(f"✅ Closed loop: {summary['throughput_rps']} req/s")
+
+    @pytest.mark.performance
+    def test_open_loop_rate(self, live_server):
+        """Test that an open-loop run sends at the requested rate"""
+        summary = asyncio.run(
+            generate_load(
+                live_server, mix={"get_user": 1}, rate=100, duration=1.0, seed=7
+            )
+        )
+
+        assert summary["mode"] == "open"
+        assert summary["requests"] == 100
+        assert summary["statuses"] == {"200": 100}
+        assert 0.95 <= summary["elapsed_s"] < 1.5
+
+        logger.info(f"✅ Open loop: 100 requests in {summary['elapsed_s']}s")
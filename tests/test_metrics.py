@@ -0,0 +1,113 @@
+"""
+Prometheus Metrics Tests
+File: tests/test_metrics.py
+
+Run tests: pytest -v tests/test_metrics.py
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from metrics import Metrics
+from mock_api_server import app
+
+logger = logging.getLogger(__name__)
+
+
+def scrape(client):
+    """GET /metrics as {sample line without value: value}"""
+    samples = {}
+    for line in client.get("/metrics").get_data(as_text=True).splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+class TestMetrics:
+    """Test suite for request metrics recording and /metrics"""
+
+    @pytest.mark.regression
+    def test_routes_counted_by_status(self):
+        """Test that requests are counted per route, method and status"""
+        client = app.test_client()
+        ok = 'mock_api_requests_total{endpoint="get_user",method="GET",status="200"}'
+        missing = (
+            'mock_api_requests_total{endpoint="unmatched",method="GET",status="404"}'
+        )
+        count = 'mock_api_request_duration_seconds_count{endpoint="get_user"}'
+
+        before = scrape(client)
+        for _ in range(5):
+            client.get("/api/users/1")
+        client.get("/no/such/route")
+        after = scrape(client)
+
+        assert after[ok] - before.get(ok, 0) == 5
+        assert after[missing] - before.get(missing, 0) == 1
+        assert after[count] - before.get(count, 0) == 5
+        assert after['mock_api_store_records{collection="users"}'] >= 12
+
+        logger.info("✅ Requests counted per route and status")
+
+    @pytest.mark.regression
+    def test_histogram_and_in_flight(self):
+        """Test histogram buckets are cumulative and in-flight tracks open requests"""
+        metrics = Metrics(buckets=(0.01, 0.1))
+        metrics.begin("slow")
+        metrics.begin("slow")
+        metrics.observe("slow", "GET", 200, 0.005)
+        metrics.observe("slow", "GET", 200, 0.05)
+        metrics.begin("slow")
+
+        text = metrics.render()
+
+        bucket = 'mock_api_request_duration_seconds_bucket{endpoint="slow",le='
+
+        assert 'mock_api_requests_in_flight{endpoint="slow"} 1' in text
+        assert f'{bucket}"0.01"}} 1' in text
+        assert f'{bucket}"0.1"}} 2' in text
+        assert f'{bucket}"+Inf"}} 2' in text
+        assert 'mock_api_request_duration_seconds_sum{endpoint="slow"} 0.055' in text
+
+        logger.info("✅ Histogram and in-flight gauge rendered")
+
+    @pytest.mark.regression
+    def test_concurrent_recording_is_exact(self):
+        """Test that parallel recording loses no counts"""
+        metrics = Metrics()
+
+        def work(n):
+            for _ in range(5000):
+                metrics.begin("route")
+                metrics.observe("route", "GET", 200, 0.002)
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(work, range(16)))
+
+        requests, in_flight, latency = metrics.totals()
+
+        assert requests["route", "GET", 200] == 80000
+        assert in_flight["route"] == 0
+        assert sum(latency["route"][:-1]) == 80000
+
+        logger.info("✅ 80k concurrent observations all counted")
+
+    @pytest.mark.performance
+    def test_recording_overhead(self):
+        """Test that recording a request costs only a few microseconds"""
+        metrics = Metrics()
+        count = 100_000
+
+        started = time.perf_counter()
+        for n in range(count):
+            metrics.begin("get_users")
+            metrics.observe("get_users", "GET", 200, n * 1e-6)
+        per_request = (time.perf_counter() - started) / count * 1e6
+
+        assert per_request < 10, f"Recording took {per_request:.2f}us per request"
+
+        logger.info(f"✅ Recording costs {per_request:.2f}us per request")
@@ -0,0 +1,108 @@
+"""
+Prefetching Page Iterator Tests
+File: tests/test_page_iterator.py
+
+Run tests: pytest -v tests/test_page_iterator.py
+"""
+
+import logging
+import threading
+import time
+
+import pytest
+
+from page_iterator import iter_pages, iter_records
+
+logger = logging.getLogger(__name__)
+
+
+class SlowPages:
+    """Stand-in session serving numbered pages slowly, tracking concurrency"""
+
+    def __init__(self, total_pages, per_page=3, delay=0.05):
+        self.total_pages = total_pages
+        self.per_page = per_page
+        self.delay = delay
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None, headers=None):
+        page = params["page"]
+        with self._lock:
+            self.requested.append(page)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later pages answer sooner, to catch out-of-order output
+        time.sleep(self.delay / page)
+        with self._lock:
+            self.in_flight -= 1
+        return SlowResponse(
+            {
+                "page": page,
+                "total_pages": self.total_pages,
+                "data": [
+                    {"id": (page - 1) * self.per_page + n}
+                    for n in range(1, self.per_page + 1)
+                ],
+            }
+        )
+
+
+class SlowResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class TestPageIterator:
+    """Test suite for iter_pages / iter_records"""
+
+    @pytest.mark.regression
+    def test_records_in_order(self, mock_http, live_server):
+        """Test that every user comes back once, in id order"""
+        url = f"{live_server}/api/users"
+        total = mock_http.get(url).json()["total"]
+
+        users = list(iter_records(mock_http, url, params={"per_page": 1}, prefetch=4))
+
+        ids = [user["id"] for user in users]
+        assert len(ids) == total
+        assert ids == sorted(set(ids))
+
+        logger.info(f"✅ {len(ids)} users walked one per page, in order")
+
+    @pytest.mark.performance
+    def test_pages_fetched_concurrently(self):
+        """Test that prefetching overlaps requests but stays bounded"""
+        session = SlowPages(total_pages=20)
+
+        started = time.perf_counter()
+        pages = [page["page"] for page in iter_pages(session, "/x", prefetch=5)]
+        elapsed = time.perf_counter() - started
+
+        assert pages == list(range(1, 21)), "Pages in order despite finish order"
+        assert 1 < session.max_in_flight <= 5
+        serial = sum(session.delay / page for page in range(1, 21))
+        assert elapsed < serial, f"{elapsed:.3f}s is no faster than serial"
+
+        logger.info(f"✅ 20 pages in {elapsed:.3f}s (serial: {serial:.3f}s)")
+
+    @pytest.mark.regression
+    def test_early_stop_cancels_the_rest(self):
+        """Test that breaking out fetches only what was already prefetched"""
+        session = SlowPages(total_pages=100, delay=0.01)
+
+        for record in iter_records(session, "/x", prefetch=3):
+            if record["id"] == 4:
+                break
+
+        assert len(session.requested) <= 1 + 3 + 1, "Stopped prefetching"
+
+        logger.info(f"✅ Stopped after {len(session.requested)} page requests")
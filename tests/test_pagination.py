@@ -0,0 +1,130 @@
+"""
+Pagination Engine Tests
+File: tests/test_pagination.py
+
+Unit tests for the ordered index behind ?page= and ?per_page=
+Run tests: pytest -v tests/test_pagination.py
+"""
+
+import logging
+
+import pytest
+
+from pagination import (
+    InvalidCursor,
+    OrderedIndex,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    paginate_after,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def make_store(count):
+    """Build a store dict with ids 1..count"""
+    return {i: {"id": i} for i in range(1, count + 1)}
+
+
+class TestOrderedIndex:
+    """Test suite for the ordered id index"""
+
+    @pytest.mark.regression
+    def test_index_stays_sorted(self):
+        """Test that adds and discards keep ids sorted and unique"""
+        index = OrderedIndex([5, 1, 3])
+        index.add(7)
+        index.add(2)
+        index.add(3)
+        index.discard(5)
+        index.discard(42)
+
+        assert list(index) == [1, 2, 3, 7]
+        assert len(index) == 4
+        assert 2 in index and 5 not in index
+
+    @pytest.mark.regression
+    def test_paginate_matches_dict_order(self):
+        """Test that pages match the old list-slicing behaviour"""
+        store = make_store(13)
+        index = OrderedIndex(store)
+
+        for page in range(1, 5):
+            result = paginate(store, index, page=page, per_page=6)
+            expected = list(store.values())[(page - 1) * 6 : page * 6]
+
+            assert result["data"] == expected
+            assert result["total"] == 13
+            assert result["total_pages"] == 3
+
+    @pytest.mark.regression
+    def test_paginate_follows_writes(self):
+        """Test that totals and pages reflect adds and deletes"""
+        store = make_store(12)
+        index = OrderedIndex(store)
+
+        del store[2]
+        index.discard(2)
+        store[13] = {"id": 13}
+        index.add(13)
+
+        result = paginate(store, index, page=2, per_page=6)
+
+        assert result["total"] == 12
+        assert [item["id"] for item in result["data"]] == [8, 9, 10, 11, 12, 13]
+
+        logger.info("✅ Pagination follows store writes")
+
+
+class TestCursorPagination:
+    """Test suite for ?after=<cursor>&limit=N keyset pages"""
+
+    @pytest.mark.regression
+    def test_cursor_round_trip(self):
+        """Test that cursors decode back to ids and plain ids are accepted"""
+        assert decode_cursor(encode_cursor(1234)) == 1234
+        assert decode_cursor("17") == 17
+
+        with pytest.raises(InvalidCursor):
+            decode_cursor("not-a-cursor")
+        with pytest.raises(InvalidCursor):
+            decode_cursor("\u00b2")
+
+    @pytest.mark.regression
+    def test_cursor_walk_is_stable_under_writes(self):
+        """Test that deletes and creates between reads don't shift cursor pages"""
+        store = make_store(12)
+        index = OrderedIndex(store)
+
+        first = paginate_after(store, index, limit=5)
+        assert [item["id"] for item in first["data"]] == [1, 2, 3, 4, 5]
+
+        # Writes between page reads, on both sides of the cursor
+        for item_id in (2, 7):
+            del store[item_id]
+            index.discard(item_id)
+        store[13] = {"id": 13}
+        index.add(13)
+
+        seen = [item["id"] for item in first["data"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            result = paginate_after(store, index, decode_cursor(cursor), limit=5)
+            seen.extend(item["id"] for item in result["data"])
+            cursor = result["next_cursor"]
+
+        assert seen == [1, 2, 3, 4, 5, 6, 8, 9, 10, 11, 12, 13]
+
+        logger.info("✅ Cursor walk saw every row exactly once")
+
+    @pytest.mark.regression
+    def test_last_cursor_page_has_no_next_cursor(self):
+        """Test that an exactly-full final page returns next_cursor None"""
+        store = make_store(10)
+        index = OrderedIndex(store)
+
+        result = paginate_after(store, index, after=5, limit=5)
+
+        assert [item["id"] for item in result["data"]] == [6, 7, 8, 9, 10]
+        assert result["next_cursor"] is None
@@ -0,0 +1,210 @@
+"""
+Snapshot + Write-Ahead Log Persistence Tests
+File: tests/test_persistence.py
+
+Run tests: pytest -v tests/test_persistence.py
+"""
+
+import logging
+import os
+import time
+
+import pytest
+
+from datagen import generate_users
+from indexes import DuplicateKey, HashIndex, SortedIndex
+from persistence import SnapshotRecords, compact, open_store, paths_for, write_snapshot
+from store import Store
+
+logger = logging.getLogger(__name__)
+
+SEED = {i: {"id": i, "name": f"item{i}"} for i in range(1, 13)}
+
+
+def user_indexes():
+    return {"email": HashIndex("email", unique=True), "name": SortedIndex("name")}
+
+
+def close(store):
+    """Simulate a process exit: stop writing to the log"""
+    store.wal.close()
+
+
+class TestPersistence:
+    """Test suite for restarting a store from its data directory"""
+
+    @pytest.mark.regression
+    def test_writes_survive_restart(self, tmp_path):
+        """Test that creates, updates and deletes are replayed from the log"""
+        store = open_store(tmp_path, "items", SEED)
+        store.put({"id": store.allocate_id(), "name": "new"})
+        store.update(2, {"name": "renamed"})
+        store.delete(3)
+        store.apply([("put", {"id": 50, "name": "bulk"}), ("delete", 4)])
+        close(store)
+
+        reopened = open_store(tmp_path, "items", {})
+
+        assert reopened.get(13) == {"id": 13, "name": "new"}
+        assert reopened.get(2) == {"id": 2, "name": "renamed"}
+        assert reopened.get(3) is None and reopened.get(4) is None
+        assert reopened.get(50) == {"id": 50, "name": "bulk"}
+        assert len(reopened) == 12
+        assert reopened.allocate_id() == 51, "Ids should never be reused"
+
+        logger.info("✅ Writes replayed after restart")
+
+    @pytest.mark.regression
+    def test_compaction_moves_log_into_snapshot(self, tmp_path):
+        """Test that compaction empties the log without losing writes"""
+        store = open_store(tmp_path, "items", SEED)
+        store.update(1, {"name": "before"})
+        compact(store, tmp_path, "items")
+        store.update(1, {"name": "after"})
+        store.delete(12)
+        close(store)
+
+        _, wal_path, old_wal_path = paths_for(tmp_path, "items")
+        assert not os.path.exists(old_wal_path)
+        with open(wal_path, encoding="utf-8") as log:
+            assert len(log.readlines()) == 2, "Only post-snapshot writes logged"
+
+        reopened = open_store(tmp_path, "items", {})
+        assert reopened.get(1)["name"] == "after"
+        assert 12 not in reopened
+        assert reopened.page(page=2, per_page=6)["data"][-1]["id"] == 11
+
+        logger.info("✅ Compaction kept every write")
+
+    @pytest.mark.regression
+    def test_interrupted_compaction_recovers(self, tmp_path):
+        """Test that a log rotated without a new snapshot is still replayed"""
+        store = open_store(tmp_path, "items", SEED)
+        store.put({"id": 100, "name": "rotated"})
+        store.wal.rotate(paths_for(tmp_path, "items")[2])
+        store.put({"id": 101, "name": "current"})
+        close(store)
+
+        reopened = open_store(tmp_path, "items", {})
+
+        assert 100 in reopened and 101 in reopened
+        assert not os.path.exists(paths_for(tmp_path, "items")[2])
+
+        logger.info("✅ Interrupted compaction recovered")
+
+    @pytest.mark.regression
+    def test_torn_last_line_is_ignored(self, tmp_path):
+        """Test that a half-written final log entry does not block startup"""
+        store = open_store(tmp_path, "items", SEED)
+        store.update(5, {"name": "kept"})
+        close(store)
+
+        with open(paths_for(tmp_path, "items")[1], "a", encoding="utf-8") as log:
+            log.write('{"op":"put","rec')
+
+        reopened = open_store(tmp_path, "items", {})
+        assert reopened.get(5)["name"] == "kept"
+
+        logger.info("✅ Torn log line skipped")
+
+    @pytest.mark.regression
+    def test_writes_after_torn_line_survive(self, tmp_path):
+        """Test that writes made after recovering from a torn line aren't lost"""
+        store = open_store(tmp_path, "items", SEED)
+        store.update(5, {"name": "before crash"})
+        close(store)
+
+        with open(paths_for(tmp_path, "items")[1], "a", encoding="utf-8") as log:
+            log.write('{"op":"put","rec')
+
+        recovered = open_store(tmp_path, "items", {})
+        recovered.update(6, {"name": "after crash"})
+        recovered.delete(7)
+        close(recovered)
+
+        reopened = open_store(tmp_path, "items", {})
+        assert reopened.get(5)["name"] == "before crash"
+        assert reopened.get(6)["name"] == "after crash"
+        assert reopened.get(7) is None
+
+        logger.info("✅ Writes after a torn line survive a second restart")
+
+    @pytest.mark.performance
+    def test_large_snapshot_loads_quickly(self, tmp_path):
+        """Test that startup on a 500k-user snapshot does not parse every record"""
+        store = Store({user["id"]: user for user in generate_users(500_000)})
+        snapshot_path = paths_for(tmp_path, "users")[0]
+        ids, records, next_id = store.checkpoint()
+        write_snapshot(snapshot_path, ids, records, next_id)
+
+        started = time.perf_counter()
+        reopened = open_store(tmp_path, "users", {})
+        elapsed = time.perf_counter() - started
+        close(reopened)
+
+        assert len(reopened) == 500_000
+        assert reopened.get(250_000) == store.get(250_000)
+        assert reopened.page_after(after=499_998, limit=6)["data"][-1]["id"] == 500_000
+        assert elapsed < 2.0, f"Startup took {elapsed:.2f}s"
+        assert isinstance(SnapshotRecords(snapshot_path).get(1), dict)
+
+        logger.info(f"✅ 500k users loaded in {elapsed:.3f}s")
+
+    @pytest.mark.regression
+    def test_indexes_rebuilt_without_decoding(self, tmp_path, monkeypatch):
+        """Test that replay and index builds use saved keys, not records"""
+        users = {
+            i: {"id": i, "name": f"user{i:03}", "email": f"u{i}@mail.test"}
+            for i in range(1, 201)
+        }
+        store = open_store(tmp_path, "users", users, indexes=user_indexes())
+        compact(store, tmp_path, "users")
+        store.update(5, {"email": "five@mail.test", "name": "aaa"})
+        store.delete(6)
+        store.put({"id": 300, "name": "zzz", "email": "u6@mail.test"})
+        close(store)
+
+        decoded = []
+        get = SnapshotRecords.get
+
+        def counting_get(snapshot, record_id, default=None):
+            decoded.append(record_id)
+            return get(snapshot, record_id, default)
+
+        monkeypatch.setattr(SnapshotRecords, "get", counting_get)
+        reopened = open_store(tmp_path, "users", {}, indexes=user_indexes())
+        reopened.build_indexes()
+
+        assert set(decoded) <= {5, 6, 300}, "Only replayed writes read records"
+        by_email = reopened.page(filters={"email": "u6@mail.test"})["data"]
+        assert [user["id"] for user in by_email] == [300]
+        assert reopened.page(filters={"email": "u5@mail.test"})["total"] == 0
+        names = reopened.page(per_page=200, sort=[("name", False)])["data"]
+        assert [user["id"] for user in names][:2] == [5, 1]
+        assert names[-1]["id"] == 300 and len(names) == 200
+        with pytest.raises(DuplicateKey):
+            reopened.put({"id": 301, "email": "u7@mail.test"})
+        close(reopened)
+
+        logger.info("✅ Indexes rebuilt from saved keys")
+
+    @pytest.mark.performance
+    def test_replay_skips_index_build(self, tmp_path):
+        """Test that replaying the log on a big indexed snapshot stays quick"""
+        users = {user["id"]: user for user in generate_users(200_000)}
+        store = open_store(tmp_path, "users", users, indexes=user_indexes())
+        for user_id in range(1, 1001):
+            store.update(user_id, {"job": "replayed"})
+        close(store)
+
+        started = time.perf_counter()
+        reopened = open_store(tmp_path, "users", {}, indexes=user_indexes())
+        elapsed = time.perf_counter() - started
+        reopened.build_indexes()
+        close(reopened)
+
+        assert reopened.get(1000)["job"] == "replayed"
+        assert reopened.page(filters={"email": users[7]["email"]})["total"] == 1
+        assert elapsed < 1.0, f"Startup with 1000 log entries took {elapsed:.2f}s"
+
+        logger.info(f"✅ 200k users + 1000 log entries opened in {elapsed:.3f}s")
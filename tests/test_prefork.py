@@ -0,0 +1,152 @@
+"""
+Pre-Fork Multi-Worker Launcher Tests
+File: tests/test_prefork.py
+
+Starts the server with --workers 2 on a free port
+Run tests: pytest -v tests/test_prefork.py
+"""
+
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+from recording import load_recording
+
+logger = logging.getLogger(__name__)
+
+SERVER_SCRIPT = Path(__file__).parent.parent / "src" / "mock_api_server.py"
+
+
+def free_port():
+    """Ask the OS for an unused TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(*args):
+    """Start a 2-worker server in its own process group: (process, url)"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, str(SERVER_SCRIPT), "--workers", "2", "--port", str(port)]
+        + list(args),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            requests.get(f"{url}/health", timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            if time.monotonic() > deadline:
+                process.kill()
+                pytest.fail("Pre-fork server did not start")
+            time.sleep(0.1)
+
+
+@pytest.fixture(scope="module")
+def prefork_url():
+    """Run a 2-worker server for the module and stop it afterwards"""
+    process, url = start_server()
+
+    yield url
+
+    process.terminate()
+    process.wait(timeout=10)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Pre-fork mode needs os.fork")
+class TestPreforkWorkers:
+    """Test suite for the multi-worker launcher"""
+
+    @pytest.mark.regression
+    def test_writes_are_visible_to_every_worker(self, prefork_url):
+        """Test that users created on any worker can be read from all of them"""
+        created = []
+        for n in range(10):
+            response = requests.post(
+                f"{prefork_url}/api/users", json={"name": f"Worker User{n}"}
+            )
+            assert response.status_code == 201
+            created.append(int(response.json()["id"]))
+
+        assert len(set(created)) == 10, "Ids must be unique across workers"
+
+        # New connections each time, so requests spread over both workers
+        for user_id in created:
+            for _ in range(3):
+                response = requests.get(f"{prefork_url}/api/users/{user_id}")
+                assert response.status_code == 200, f"User {user_id} not visible"
+
+        logger.info(f"✅ {len(created)} users visible across workers")
+
+    @pytest.mark.regression
+    def test_deletes_invalidate_other_workers_caches(self, prefork_url):
+        """Test that a delete on one worker isn't hidden by another's cache"""
+        response = requests.post(f"{prefork_url}/api/users", json={"name": "Gone"})
+        user_id = int(response.json()["id"])
+        for _ in range(6):
+            requests.get(f"{prefork_url}/api/users/{user_id}")
+
+        requests.delete(f"{prefork_url}/api/users/{user_id}")
+
+        for _ in range(6):
+            response = requests.get(f"{prefork_url}/api/users/{user_id}")
+            assert response.status_code == 404
+
+    @pytest.mark.regression
+    def test_tenants_shared_by_workers(self, prefork_url):
+        """Test that a tenant's writes are seen by every worker, and only there"""
+        headers = {"X-Mock-Tenant": "prefork-test"}
+        response = requests.post(
+            f"{prefork_url}/api/users", json={"name": "Tenant User"}, headers=headers
+        )
+        user_id = int(response.json()["id"])
+
+        for _ in range(4):
+            response = requests.get(
+                f"{prefork_url}/api/users/{user_id}", headers=headers
+            )
+            assert response.status_code == 200, "Tenant write not seen by a worker"
+
+        totals = [
+            requests.get(f"{prefork_url}/api/users", headers=h).json()["total"]
+            for h in (headers, {"X-Mock-Tenant": "prefork-other"})
+        ]
+        assert totals[0] == totals[1] + 1
+
+        response = requests.delete(f"{prefork_url}/__admin/tenants/prefork-test")
+        assert response.status_code == 204
+        response = requests.get(f"{prefork_url}/api/users/{user_id}", headers=headers)
+        assert response.status_code == 404
+
+    @pytest.mark.regression
+    def test_ctrl_c_keeps_recorded_traffic(self, tmp_path):
+        """Test that Ctrl+C on a recording pre-fork server writes every entry"""
+        path = tmp_path / "traffic.jsonl"
+        process, url = start_server("--record", str(path))
+
+        with requests.Session() as session:
+            for _ in range(50):
+                assert session.get(f"{url}/api/users/2").status_code == 200
+
+        # Ctrl+C signals the whole foreground process group at once
+        os.killpg(process.pid, signal.SIGINT)
+        process.wait(timeout=10)
+
+        entries = [e for e in load_recording(path) if e["path"] == "/api/users/2"]
+        assert len(entries) == 50, "Entries lost when the workers were stopped"
+
+        logger.info("✅ 50 of 50 recorded requests kept after Ctrl+C")
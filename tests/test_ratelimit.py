@@ -0,0 +1,148 @@
+"""
+Rate Limiting Tests
+File: tests/test_ratelimit.py
+
+Run tests: pytest -v tests/test_ratelimit.py
+"""
+
+import logging
+
+import pytest
+
+import mock_api_server
+from mock_api_server import app
+from ratelimit import RateLimiter, parse_key_spec
+
+logger = logging.getLogger(__name__)
+
+
+class FakeClock:
+    """Manually advanced stand-in for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    """Turn on a 2 requests/s, burst 3 limiter for the app, on a fake clock"""
+
+    def install(key="ip"):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=2, burst=3, clock=clock)
+        monkeypatch.setattr(mock_api_server, "RATE_LIMITER", limiter)
+        monkeypatch.setattr(mock_api_server, "RATE_LIMIT_KEY", parse_key_spec(key))
+        return clock
+
+    return install
+
+
+class TestTokenBucket:
+    """Test suite for the token buckets themselves"""
+
+    @pytest.mark.regression
+    def test_burst_then_refill(self):
+        """Test that a bucket allows its burst, then refills at the rate"""
+        clock = FakeClock()
+        limiter = RateLimiter(rate=1, burst=3, clock=clock)
+
+        assert [limiter.acquire("a").allowed for _ in range(4)] == [1, 1, 1, 0]
+
+        clock.now += 0.5
+        denied = limiter.acquire("a")
+        assert not denied.allowed
+        assert denied.retry_after == pytest.approx(0.5)
+        assert denied.headers()["Retry-After"] == "1"
+
+        clock.now += 0.5
+        allowed = limiter.acquire("a")
+        assert allowed.allowed and allowed.remaining == 0
+        assert limiter.acquire("b").allowed, "Other clients have their own bucket"
+
+        logger.info("✅ Burst of 3, then 1 request/s")
+
+    @pytest.mark.regression
+    def test_idle_and_excess_clients_evicted(self):
+        """Test that bucket memory is bounded by active clients"""
+        clock = FakeClock()
+        limiter = RateLimiter(rate=10, burst=10, max_clients=100, clock=clock)
+
+        for client in range(1000):
+            limiter.acquire(client)
+        assert len(limiter) == 100, "Least recently used clients dropped"
+
+        clock.now += limiter.refill_time
+        limiter.acquire("fresh")
+        assert len(limiter) == 1, "Buckets that would be full again are dropped"
+
+        logger.info("✅ Bucket count stays bounded")
+
+    @pytest.mark.negative
+    def test_bad_key_spec_rejected(self):
+        """Test that unknown key parts are rejected"""
+        assert parse_key_spec("ip, route") == ("ip", "route")
+        with pytest.raises(ValueError):
+            parse_key_spec("ip,cookie")
+
+        logger.info("✅ Bad key spec rejected")
+
+
+class TestRateLimitedRoutes:
+    """Test suite for 429s and X-RateLimit-* headers on the routes"""
+
+    @pytest.mark.regression
+    def test_429_with_headers(self, limited):
+        """Test that callers over the limit get 429 with accurate headers"""
+        clock = limited()
+        client = app.test_client()
+
+        responses = [client.get("/api/users/1") for _ in range(4)]
+        statuses = [response.status_code for response in responses]
+        remaining = [r.headers["X-RateLimit-Remaining"] for r in responses]
+
+        assert statuses == [200, 200, 200, 429]
+        assert remaining == ["2", "1", "0", "0"]
+        assert responses[0].headers["X-RateLimit-Limit"] == "3"
+        assert responses[3].headers["Retry-After"] == "1"
+        assert "Retry-After" not in responses[0].headers
+
+        clock.now += 0.5
+        assert client.get("/api/users/1").status_code == 200
+        assert client.get("/health").status_code == 200, "Health is never limited"
+
+        logger.info("✅ 429 with Retry-After after the burst")
+
+    @pytest.mark.regression
+    def test_keyed_by_token(self, limited):
+        """Test that each bearer token gets its own bucket"""
+        limited(key="token")
+        client = app.test_client()
+        token = client.post(
+            "/api/login", json={"email": "eve.holt@reqres.in", "password": "x"}
+        ).json["token"]
+
+        def get(bearer):
+            headers = {"Authorization": f"Bearer {bearer}"}
+            return client.get("/api/users/1", headers=headers).status_code
+
+        assert [get(token) for _ in range(4)] == [200, 200, 200, 429]
+        assert get("another-token") == 200
+
+        logger.info("✅ Buckets keyed by login token")
+
+    @pytest.mark.regression
+    def test_keyed_by_route(self, limited):
+        """Test that route keys give every endpoint its own budget"""
+        limited(key="route")
+        client = app.test_client()
+
+        for _ in range(3):
+            client.get("/api/users/1")
+
+        assert client.get("/api/users/2").status_code == 429, "Same route"
+        assert client.get("/api/unknown/1").status_code == 200, "Other route"
+
+        logger.info("✅ Buckets keyed by route")
@@ -0,0 +1,174 @@
+"""
+Traffic Recording and Replay Tests
+File: tests/test_recording.py
+
+Run tests: pytest -v tests/test_recording.py
+"""
+
+import asyncio
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from werkzeug.test import Client
+
+from mock_api_server import app
+from recording import RecordingMiddleware, TrafficRecorder, load_recording
+from replay import replay
+from tenants import TENANT_HEADER
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def recorder(tmp_path, monkeypatch):
+    """Record the app's traffic to a temporary JSONL file"""
+    traffic = TrafficRecorder(tmp_path / "traffic.jsonl", flush_interval=0.05)
+    monkeypatch.setattr(app, "wsgi_app", RecordingMiddleware(app.wsgi_app, traffic))
+    yield traffic
+    traffic.close()
+
+
+def entry(ts, method, path, query="", body=None, status=200):
+    recorded = {"ts": ts, "method": method, "path": path, "query": query}
+    recorded["status"] = status
+    recorded["headers"] = {"Content-Type": "application/json"} if body else {}
+    if body:
+        recorded["body"] = body
+    return recorded
+
+
+class TestRecording:
+    """Test suite for the recording middleware"""
+
+    @pytest.mark.regression
+    def test_requests_recorded(self, recorder):
+        """Test that method, path, query, body, status and timing are logged"""
+        # Entries are written when the response closes, as servers always do
+        client = app.test_client()
+        client.get("/api/users?page=2", buffered=True)
+        client.post(
+            "/api/login",
+            data='{"email": "eve.holt@reqres.in"}',
+            content_type="application/json",
+            buffered=True,
+        )
+        client.put(
+            "/api/users/2", data=b"\xff\x00", content_type="text/plain", buffered=True
+        )
+        recorder.close()
+
+        get, login, put = load_recording(recorder.path)
+
+        assert (get["method"], get["path"], get["query"]) == (
+            "GET",
+            "/api/users",
+            "page=2",
+        )
+        assert get["status"] == 200 and get["duration_ms"] > 0
+        assert "body" not in get
+        assert login["body"] == '{"email": "eve.holt@reqres.in"}'
+        assert login["status"] == 400
+        assert login["headers"]["Content-Type"] == "application/json"
+        assert put["body_b64"] == "/wA="
+        assert get["ts"] <= login["ts"] <= put["ts"]
+
+        logger.info("✅ Requests recorded with bodies and timing")
+
+    @pytest.mark.regression
+    def test_concurrent_records_all_written(self, tmp_path):
+        """Test that buffered writes from many threads lose no lines"""
+        traffic = TrafficRecorder(tmp_path / "traffic.jsonl", buffer_size=4096)
+
+        def work(thread):
+            for n in range(500):
+                traffic.record({"ts": thread * 1000 + n, "method": "GET"})
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(work, range(8)))
+        traffic.close()
+
+        entries = load_recording(traffic.path)
+
+        assert len(entries) == 4000
+        assert [e["ts"] for e in entries] == sorted(e["ts"] for e in entries)
+
+        logger.info("✅ 4000 concurrently recorded entries all written")
+
+    @pytest.mark.negative
+    def test_torn_last_line_skipped(self, tmp_path):
+        """Test that a half-written final line doesn't break loading"""
+        path = tmp_path / "traffic.jsonl"
+        path.write_text('{"ts": 1, "method": "GET"}\n{"ts": 2, "meth')
+
+        assert load_recording(path) == [{"ts": 1, "method": "GET"}]
+
+        logger.info("✅ Torn line skipped")
+
+
+class TestReplay:
+    """Test suite for replaying recordings against a running server"""
+
+    @pytest.mark.regression
+    def test_fast_replay(self, live_server):
+        """Test that a fast replay sends everything and reports statuses"""
+        entries = [entry(n, "GET", f"/api/unknown/{n % 6 + 1}") for n in range(60)]
+        entries.append(entry(60, "GET", "/api/users/999", status=200))
+        entries.append(
+            entry(61, "POST", "/api/login", body='{"email": "x"}', status=400)
+        )
+
+        summary = asyncio.run(
+            replay(entries, live_server, timing="fast", concurrency=4)
+        )
+
+        assert summary["completed"] == 62 and summary["failed"] == 0
+        assert summary["statuses"] == {"200": 60, "400": 1, "404": 1}
+        assert summary["status_mismatches"] == 1, "The 404 was recorded as 200"
+        assert 0 < summary["latency_ms"]["p50"] <= summary["latency_ms"]["max"]
+
+        logger.info(f"✅ Fast replay at {summary['throughput_rps']} req/s")
+
+    @pytest.mark.performance
+    def test_original_timing_kept(self, live_server):
+        """Test that original timing spaces requests as recorded, scaled by speed"""
+        entries = [entry(n * 0.5, "GET", "/api/users/1") for n in range(5)]
+
+        summary = asyncio.run(replay(entries, live_server, speed=4))
+
+        assert summary["completed"] == 5
+        assert summary["recorded_span_s"] == 2.0
+        assert 0.5 <= summary["elapsed_s"] < 1.5, "2s recording at 4x speed"
+
+        logger.info(f"✅ Replayed a 2s recording in {summary['elapsed_s']}s")
+
+    @pytest.mark.regression
+    def test_conditional_and_tenant_headers_replayed(self, tmp_path, live_server):
+        """Test that If-None-Match and X-Mock-Tenant survive record and replay"""
+        traffic = TrafficRecorder(tmp_path / "traffic.jsonl")
+        # Entries are written when the response closes; buffered closes it
+        client = Client(RecordingMiddleware(app, traffic))
+        tenant = {TENANT_HEADER: f"test-{uuid.uuid4().hex[:8]}"}
+        client.delete("/api/users/1", headers=tenant, buffered=True)
+        client.get("/api/users/1", headers=tenant, buffered=True)
+        etag = client.get("/api/users/2", buffered=True).headers["ETag"]
+        client.get("/api/users/2", headers={"If-None-Match": etag}, buffered=True)
+        traffic.close()
+
+        _, in_tenant, _, conditional = load_recording(traffic.path)
+
+        assert in_tenant["headers"] == tenant and in_tenant["status"] == 404
+        assert conditional["headers"] == {"If-None-Match": etag}
+        assert conditional["status"] == 304
+
+        # Without the headers both would answer 200 from the shared users
+        summary = asyncio.run(
+            replay([in_tenant, conditional], live_server, timing="fast")
+        )
+        app.test_client().delete(f"/__admin/tenants/{tenant[TENANT_HEADER]}")
+
+        assert summary["statuses"] == {"304": 1, "404": 1}
+        assert summary["status_mismatches"] == 0
+
+        logger.info("✅ Tenant and conditional requests replayed as recorded")
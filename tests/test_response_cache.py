@@ -0,0 +1,152 @@
+"""
+Response Cache Tests
+File: tests/test_response_cache.py
+
+Run tests: pytest -v tests/test_response_cache.py
+"""
+
+import logging
+
+import pytest
+
+from mock_api_server import RESPONSE_CACHE, app
+from response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+class TestResponseCache:
+    """Test suite for the encoded-body cache"""
+
+    @pytest.mark.regression
+    def test_lru_is_bounded(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", b"A", ["t"], cache.epoch)
+        cache.set("b", b"B", ["t"], cache.epoch)
+        cache.get("a")
+        cache.set("c", b"C", ["t"], cache.epoch)
+
+        assert len(cache) == 2
+        assert cache.get("b") is None, "b was least recently used"
+        assert cache.get("a").body == b"A"
+
+    @pytest.mark.regression
+    def test_invalidate_by_tag(self):
+        """Test that invalidation drops only entries under the given tag"""
+        cache = ResponseCache()
+        cache.set("user:1", b"1", ["users:1"], cache.epoch)
+        cache.set("page:1", b"p", ["users:list", "users:1"], cache.epoch)
+        cache.set("user:2", b"2", ["users:2"], cache.epoch)
+
+        cache.invalidate("users:1")
+
+        assert cache.get("user:1") is None
+        assert cache.get("page:1") is None
+        assert cache.get("user:2").body == b"2"
+
+    @pytest.mark.regression
+    def test_stale_build_is_not_cached(self):
+        """Test that a body built before an invalidation is dropped"""
+        cache = ResponseCache()
+        epoch = cache.epoch
+        cache.invalidate("users:1")
+        cache.set("user:1", b"old", ["users:1"], epoch)
+
+        assert cache.get("user:1") is None
+
+
+class TestCachedRoutes:
+    """Test suite for cached GET routes and write invalidation"""
+
+    @pytest.mark.regression
+    def test_repeated_get_hits_cache(self):
+        """Test that a repeated GET is served from the cache"""
+        client = app.test_client()
+        first = client.get("/api/unknown/3")
+        hits = RESPONSE_CACHE.hits
+
+        second = client.get("/api/unknown/3")
+
+        assert second.status_code == 200
+        assert second.data == first.data
+        assert RESPONSE_CACHE.hits == hits + 1
+
+        stats = client.get("/__admin/cache").get_json()
+        assert stats["hits"] >= 1 and "misses" in stats
+
+    @pytest.mark.regression
+    def test_writes_invalidate_cached_pages(self, mock_client):
+        """Test that PUT, PATCH and DELETE are visible on the next GET"""
+        created = mock_client.post("/api/users", json={"name": "Cache Me"})
+        user_id = int(created.json["id"])
+        user_url = f"/api/users/{user_id}"
+        list_args = {"per_page": 100}
+        mock_client.get(user_url)
+        mock_client.get("/api/users", query_string=list_args)
+
+        mock_client.put(user_url, json={"name": "Cache Updated"})
+        assert mock_client.get(user_url).json["data"]["last_name"] == "Updated"
+
+        mock_client.patch(user_url, json={"first_name": "Patched"})
+        assert mock_client.get(user_url).json["data"]["first_name"] == "Patched"
+
+        total = mock_client.get("/api/users", query_string=list_args).json["total"]
+        mock_client.delete(user_url)
+        after = mock_client.get("/api/users", query_string=list_args).json
+
+        assert mock_client.get(user_url).status_code == 404
+        assert after["total"] == total - 1
+        assert user_id not in [user["id"] for user in after["data"]]
+
+        logger.info("✅ Cached user pages follow every write")
+
+
+class TestConditionalRequests:
+    """Test suite for ETag / If-None-Match handling"""
+
+    @pytest.mark.regression
+    def test_matching_etag_gets_304(self):
+        """Test that If-None-Match with the current ETag returns 304 and no body"""
+        client = app.test_client()
+        first = client.get("/api/unknown/2")
+        etag = first.headers["ETag"]
+
+        repeat = client.get("/api/unknown/2", headers={"If-None-Match": etag})
+
+        assert etag.startswith('"'), "ETag should be a strong, quoted tag"
+        assert repeat.status_code == 304
+        assert repeat.data == b""
+        assert repeat.headers["ETag"] == etag
+
+    @pytest.mark.regression
+    def test_pages_have_etags(self):
+        """Test that list pages carry their own ETag and honour If-None-Match"""
+        client = app.test_client()
+        page_1 = client.get("/api/unknown", query_string={"page": 1})
+        page_2 = client.get("/api/unknown", query_string={"page": 2})
+
+        assert page_1.headers["ETag"] != page_2.headers["ETag"]
+
+        repeat = client.get(
+            "/api/unknown",
+            query_string={"page": 1},
+            headers={"If-None-Match": page_1.headers["ETag"]},
+        )
+        assert repeat.status_code == 304
+
+    @pytest.mark.regression
+    def test_write_changes_etag(self, mock_client):
+        """Test that a PUT changes the user's ETag so pollers get the new body"""
+        created = mock_client.post("/api/users", json={"name": "Etag User"})
+        user_url = f"/api/users/{created.json['id']}"
+        etag = mock_client.get(user_url).headers["ETag"]
+
+        mock_client.put(user_url, json={"name": "Etag Changed"})
+        after = mock_client.get(user_url, headers={"If-None-Match": etag})
+
+        assert after.status_code == 200, "Stale ETag should get the full body"
+        assert after.headers["ETag"] != etag
+        assert after.json["data"]["last_name"] == "Changed"
+
+        logger.info("✅ ETag changed after update")
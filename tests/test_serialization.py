@@ -0,0 +1,73 @@
+"""
+JSON Backend Tests
+File: tests/test_serialization.py
+
+Run tests: pytest -v tests/test_serialization.py
+"""
+
+import json
+import logging
+from datetime import datetime
+
+import pytest
+
+from mock_api_server import SUPPORT, USERS, app
+from serialization import BACKENDS, get_backend
+
+logger = logging.getLogger(__name__)
+
+PAGE = {**USERS.page(page=1, per_page=6), "support": SUPPORT}
+
+
+class TestSerialization:
+    """Test suite for the pluggable JSON encoder behind app.json"""
+
+    @pytest.mark.regression
+    @pytest.mark.parametrize("name", sorted(BACKENDS))
+    def test_backends_match_stdlib(self, name):
+        """Test that every installed backend writes the same compact JSON"""
+        backend = BACKENDS[name]
+        expected = json.dumps(PAGE, sort_keys=True, separators=(",", ":")).encode()
+
+        assert backend.dumps(PAGE) == expected
+        assert backend.loads(expected) == PAGE
+        assert json.loads(backend.dumps(PAGE, indent=True)) == PAGE
+
+        logger.info(f"✅ {name} output matches the stdlib")
+
+    @pytest.mark.regression
+    @pytest.mark.parametrize("name", sorted(BACKENDS))
+    def test_flask_types_use_flask_default(self, name):
+        """Test that datetimes are formatted by Flask's default() on every backend"""
+        value = {"at": datetime(2024, 1, 2, 3, 4, 5)}
+        encoded = BACKENDS[name].dumps(value, default=app.json.default)
+
+        assert json.loads(encoded) == {"at": "Tue, 02 Jan 2024 03:04:05 GMT"}
+
+        logger.info(f"✅ {name} defers datetimes to Flask")
+
+    @pytest.mark.negative
+    def test_unknown_backend_rejected(self):
+        """Test that asking for a backend that isn't installed fails loudly"""
+        with pytest.raises(ValueError, match="not available"):
+            get_backend("simdjson")
+
+        logger.info("✅ Unknown backend rejected")
+
+    @pytest.mark.regression
+    def test_routes_encode_and_decode_through_backend(self):
+        """Test that request bodies and responses go through app.json"""
+        client = app.test_client()
+
+        created = client.post("/api/users", json={"name": "Jay Son", "job": "QA"})
+        fetched = client.get(f"/api/users/{created.json['id']}")
+        invalid = client.post(
+            "/api/users", data="{not json", content_type="application/json"
+        )
+
+        assert created.status_code == 201
+        assert fetched.json["data"]["first_name"] == "Jay"
+        assert fetched.data.endswith(b"\n")
+        assert invalid.status_code == 400
+
+        logger.info(f"✅ Routes use the {app.json.backend.name} backend")
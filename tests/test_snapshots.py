@@ -0,0 +1,62 @@
+"""
+Snapshot / Restore Admin Endpoint Tests
+File: tests/test_snapshots.py
+
+Run tests: pytest -v tests/test_snapshots.py
+"""
+
+import logging
+import uuid
+
+import pytest
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def snapshot(mock_http, live_server):
+    """A fresh snapshot of the test's data, dropped after the test"""
+    name = f"test-{uuid.uuid4().hex[:8]}"
+    response = mock_http.post(f"{live_server}/__admin/snapshot", json={"name": name})
+    assert response.status_code == 201
+    assert response.json()["name"] == name
+    yield name
+    mock_http.delete(f"{live_server}/__admin/snapshots/{name}")
+
+
+class TestSnapshots:
+    """Test suite for POST /__admin/snapshot and /__admin/restore/{name}"""
+
+    @pytest.mark.regression
+    def test_restore_undoes_creates_and_deletes(self, mock_http, live_server, snapshot):
+        """Test that a restore brings back deleted users and the next id"""
+        before = mock_http.get(f"{live_server}/api/users").json()
+        created = mock_http.post(f"{live_server}/api/users", json={"name": "Snap Shot"})
+        mock_http.delete(f"{live_server}/api/users/1")
+        mock_http.put(f"{live_server}/api/users/2", json={"name": "Re Named"})
+
+        response = mock_http.post(f"{live_server}/__admin/restore/{snapshot}")
+        assert response.status_code == 200
+        assert response.json()["reverted"] == 3
+
+        assert mock_http.get(f"{live_server}/api/users").json() == before
+        assert mock_http.get(f"{live_server}/api/users/1").status_code == 200
+        user = mock_http.get(f"{live_server}/api/users/2").json()["data"]
+        assert user["first_name"] != "Re"
+        again = mock_http.post(f"{live_server}/api/users", json={"name": "Snap Shot"})
+        assert again.json()["id"] == created.json()["id"], "Next id restored too"
+
+        logger.info("✅ Users restored to the snapshot")
+
+    @pytest.mark.negative
+    def test_unknown_snapshot(self, mock_http, live_server):
+        """Test that restoring or dropping a missing snapshot gets a 404"""
+        response = mock_http.post(
+            f"{live_server}/__admin/restore/missing-{uuid.uuid4()}"
+        )
+        assert response.status_code == 404
+
+        response = mock_http.delete(f"{live_server}/__admin/snapshots/missing")
+        assert response.status_code == 404
+
+        logger.info("✅ Unknown snapshots rejected")
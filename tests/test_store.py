@@ -0,0 +1,175 @@
+"""
+Thread-Safe Store Tests
+File: tests/test_store.py
+
+Run tests: pytest -v tests/test_store.py
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from store import Store
+
+logger = logging.getLogger(__name__)
+
+
+def make_store(count):
+    """Store with ids 1..count"""
+    return Store({i: {"id": i, "name": f"item{i}"} for i in range(1, count + 1)})
+
+
+class TestStore:
+    """Test suite for the in-memory store behind the routes"""
+
+    @pytest.mark.regression
+    def test_concurrent_creates_get_unique_ids(self):
+        """Test that parallel creates never share or overwrite an id"""
+        store = make_store(12)
+
+        def create(n):
+            record_id = store.allocate_id()
+            store.put({"id": record_id, "name": f"new{n}"})
+            return record_id
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            ids = list(pool.map(create, range(2000)))
+
+        assert len(set(ids)) == 2000, "Every create should get its own id"
+        assert min(ids) == 13
+        assert len(store) == 2012
+
+        logger.info("✅ 2000 concurrent creates got unique ids")
+
+    @pytest.mark.regression
+    def test_index_matches_records_after_mixed_writes(self):
+        """Test that parallel creates, updates and deletes keep the index exact"""
+        store = make_store(1000)
+
+        def work(n):
+            if n % 3 == 0:
+                store.delete(n // 3 + 1)
+            elif n % 3 == 1:
+                store.update(n % 1000 + 1, {"name": f"updated{n}"})
+            else:
+                store.put({"id": store.allocate_id(), "name": f"new{n}"})
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(work, range(1500)))
+
+        listed = store.page(page=1, per_page=10000)["data"]
+        listed_ids = [record["id"] for record in listed]
+
+        assert listed_ids == sorted(set(listed_ids)), "Index should stay sorted"
+        assert len(listed_ids) == len(store) == 1000 - 500 + 500
+        assert all(store.get(record_id) is not None for record_id in listed_ids)
+
+    @pytest.mark.regression
+    def test_reads_during_deletes(self):
+        """Test that pages stay readable while records are deleted"""
+        store = make_store(5000)
+        errors = []
+
+        def reader():
+            try:
+                for page in range(1, 200):
+                    for record in store.page(page=page, per_page=25)["data"]:
+                        assert record is not None
+            except Exception as error:
+                errors.append(error)
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in readers:
+            thread.start()
+        for record_id in range(1, 5001, 2):
+            assert store.delete(record_id)
+        for thread in readers:
+            thread.join()
+
+        assert not errors, f"Readers failed during deletes: {errors}"
+        assert len(store) == 2500
+        assert store.delete(1) is False
+
+    @pytest.mark.regression
+    def test_update_replaces_record(self):
+        """Test that updates swap in a new dict instead of mutating the old one"""
+        store = make_store(3)
+        before = store.get(2)
+
+        after = store.update(2, {"name": "renamed"})
+
+        assert before["name"] == "item2", "Readers holding the old record see it"
+        assert after == store.get(2) == {"id": 2, "name": "renamed"}
+        assert store.update(99, {"name": "x"}) is None
+
+    @pytest.mark.regression
+    def test_fork_is_copy_on_write(self):
+        """Test that a fork and its parent never see each other's writes"""
+        parent = make_store(1000)
+        fork = parent.fork()
+
+        fork.delete(1)
+        fork.update(2, {"name": "forked"})
+        fork.put({"id": fork.allocate_id(), "name": "fork only"})
+        parent.delete(3)
+        parent.put({"id": parent.allocate_id(), "name": "parent only"})
+
+        assert len(parent) == len(fork) == 1000
+        assert parent.get(1) is not None and fork.get(3) is not None
+        assert parent.get(2)["name"] == "item2"
+        assert fork.get(1001)["name"] == "fork only"
+        assert parent.get(1001)["name"] == "parent only"
+        fork_ids = [record["id"] for record in fork.page(per_page=5)["data"]]
+        assert fork_ids == [2, 3, 4, 5, 6]
+
+        logger.info("✅ Fork and parent diverge independently")
+
+    @pytest.mark.regression
+    def test_restore_undoes_writes_since_snapshot(self):
+        """Test that restore() brings back records, index and next id"""
+        store = make_store(100)
+        store.put({"id": store.allocate_id(), "name": "before"})
+        store.snapshot("start")
+
+        for record_id in range(1, 11):
+            store.delete(record_id)
+        store.update(50, {"name": "changed"})
+        store.update(50, {"name": "changed again"})
+        store.put({"id": store.allocate_id(), "name": "after"})
+
+        assert store.restore("start") == 13, "Only the writes since are undone"
+        assert len(store) == 101
+        assert store.get(50) == {"id": 50, "name": "item50"}
+        assert store.get(102) is None
+        assert store.allocate_id() == 102
+        ids = [record["id"] for record in store.page(per_page=3)["data"]]
+        assert ids == [1, 2, 3]
+
+        logger.info("✅ Store restored to the snapshot")
+
+    @pytest.mark.regression
+    def test_snapshots_nest_and_drop(self):
+        """Test restoring past a later snapshot, repeat restores and dropping"""
+        store = make_store(5)
+        store.snapshot("outer")
+        store.delete(1)
+        store.snapshot("inner")
+        store.delete(2)
+
+        assert store.restore("inner") == 1
+        assert store.get(2) is not None and store.get(1) is None
+        store.delete(3)
+        assert store.restore("inner") == 1, "A snapshot can be restored again"
+
+        assert store.restore("outer") == 1
+        assert store.snapshots() == ["outer"], "Later snapshots are gone"
+        assert len(store) == 5
+        with pytest.raises(KeyError):
+            store.restore("inner")
+
+        assert store.drop_snapshot("outer") is True
+        assert store.drop_snapshot("outer") is False
+        store.delete(4)
+        assert store._journal is None, "No journal without snapshots"
@@ -0,0 +1,96 @@
+"""
+Tenant Namespace Tests
+File: tests/test_tenants.py
+
+Run tests: pytest -v tests/test_tenants.py
+"""
+
+import logging
+import uuid
+
+import pytest
+
+from mock_api_server import SEED_USERS
+from tenants import TENANT_HEADER
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def tenants(mock_http, live_server):
+    """Two fresh tenant names, dropped after the test"""
+    names = [f"test-{uuid.uuid4().hex[:8]}" for _ in range(2)]
+    yield names
+    for name in names:
+        mock_http.delete(f"{live_server}/__admin/tenants/{name}")
+
+
+def as_tenant(name):
+    return {TENANT_HEADER: name}
+
+
+def total_users(session, url, name):
+    response = session.get(f"{url}/api/users", headers=as_tenant(name))
+    assert response.status_code == 200
+    return response.json()["total"]
+
+
+class TestTenants:
+    """Test suite for per-tenant data selected by X-Mock-Tenant"""
+
+    @pytest.mark.regression
+    def test_writes_stay_in_their_tenant(self, mock_http, live_server, tenants):
+        """Test that one tenant's creates and deletes don't reach another"""
+        first, second = tenants
+
+        mock_http.delete(f"{live_server}/api/users/1", headers=as_tenant(first))
+        for n in range(3):
+            response = mock_http.post(
+                f"{live_server}/api/users",
+                json={"name": f"Tenant User{n}"},
+                headers=as_tenant(first),
+            )
+            assert response.status_code == 201
+
+        assert total_users(mock_http, live_server, first) == len(SEED_USERS) + 2
+        assert total_users(mock_http, live_server, second) == len(SEED_USERS)
+        response = mock_http.get(
+            f"{live_server}/api/users/1", headers=as_tenant(second)
+        )
+        assert response.status_code == 200, "Seed user deleted in another tenant"
+
+        logger.info("✅ Tenants isolated")
+
+    @pytest.mark.regression
+    def test_dropped_tenant_starts_over(self, mock_http, live_server, tenants):
+        """Test that a dropped tenant comes back with the seed data"""
+        name = tenants[0]
+        mock_http.delete(f"{live_server}/api/users/2", headers=as_tenant(name))
+        assert total_users(mock_http, live_server, name) == len(SEED_USERS) - 1
+
+        listed = mock_http.get(f"{live_server}/__admin/tenants").json()["tenants"]
+        assert name in listed
+        response = mock_http.delete(f"{live_server}/__admin/tenants/{name}")
+        assert response.status_code == 204
+
+        assert total_users(mock_http, live_server, name) == len(SEED_USERS)
+        response = mock_http.get(f"{live_server}/api/users/2", headers=as_tenant(name))
+        assert response.status_code == 200
+
+        logger.info("✅ Dropped tenant reset to the seed data")
+
+    @pytest.mark.negative
+    def test_invalid_tenant_rejected(self, mock_http, live_server):
+        """Test that malformed tenant names get a 400"""
+        response = mock_http.get(
+            f"{live_server}/api/users", headers=as_tenant("no spaces")
+        )
+        assert response.status_code == 400
+        assert TENANT_HEADER in response.json()["error"]
+
+        response = mock_http.delete(
+            f"{live_server}/__admin/tenants/missing-{uuid.uuid4()}"
+        )
+        assert response.status_code == 404
+
+        logger.info("✅ Invalid tenants rejected")
@@ -2,8 +2,9 @@
 REST API Tests - Works with Local Mock Server
 File: tests/test_users.py
 
-Run mock server first: python src/mock_api_server.py
-Then run tests: pytest -v tests/test_users.py
+Run tests: pytest -v tests/test_users.py
+(the mock server is started in-process, see conftest.py; set API_BASE_URL
+to test an already running server instead)
 """
 
 import logging
@@ -11,28 +12,24 @@ import os
 import time
 
 import pytest
-import requests
+
+from page_iterator import iter_pages, iter_records
 
 logger = logging.getLogger(__name__)
 
 
-def get_available_user(base_url, user_ids=[2, 1, 3, 4, 5]):
+def get_available_user(api, user_ids=[2, 1, 3, 4, 5]):
     """
     Try to get a user, falling back to different IDs if needed
+    All IDs are probed at once; the first to answer 200 wins
     Returns (response, user_id) tuple with logging
     """
     logger.info(f"Attempting to find available user from IDs: {user_ids}")
 
-    for user_id in user_ids:
-        url = f"{base_url}/api/users/{user_id}"
-        logger.debug(f"Trying user ID {user_id}")
-        response = requests.get(url)
-
-        if response.status_code == 200:
-            logger.info(f"✅ Found available user: ID {user_id}")
-            return response, user_id
-        else:
-            logger.debug(f"User ID {user_id} returned {response.status_code}")
+    response, user_id = api.first_available_user(user_ids)
+    if response is not None:
+        logger.info(f"✅ Found available user: ID {user_id}")
+        return response, user_id
 
     # If we get here, none worked
     logger.error(f"❌ No available users found from {user_ids}")
@@ -45,22 +42,19 @@ skip_in_ci = pytest.mark.skipif(
     reason="ReqRes API requires API key for this operation",
 )
 
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:5000")
-logger.info(f"Tests configured to use API: {API_BASE_URL}")
-
 
 class TestUsersAPI:
     """Test suite for Users API endpoints"""
 
     @skip_in_ci
     @pytest.mark.smoke
-    def test_get_list_users(self):
+    def test_get_list_users(self, http, base_url):
         """Test retrieving list of users - GET /api/users"""
-        url = f"{API_BASE_URL}/api/users"
+        url = f"{base_url}/api/users"
         params = {"page": 1}
 
         logger.info(f"Testing GET {url} with params {params}")
-        response = requests.get(url, params=params)
+        response = http.get(url, params=params)
 
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
 
@@ -79,13 +73,13 @@ class TestUsersAPI:
 
     @skip_in_ci
     @pytest.mark.smoke
-    def test_get_list_users_page_2(self):
+    def test_get_list_users_page_2(self, http, base_url):
         """Test retrieving list of users on page 2 - GET /api/users?page=2"""
-        url = f"{API_BASE_URL}/api/users"
+        url = f"{base_url}/api/users"
         params = {"page": 2}
 
         logger.info(f"Testing GET {url} with params {params}")
-        response = requests.get(url, params=params)
+        response = http.get(url, params=params)
 
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
         response_data = response.json()
@@ -95,7 +89,7 @@ class TestUsersAPI:
         logger.info(f"✅ Found {len(response_data['data'])} users on page 2")
 
     @pytest.mark.regression
-    def test_get_single_user(self):
+    def test_get_single_user(self, http, base_url):
         """Test retrieving a single user by ID - GET /api/users/{id}"""
         user_ids_to_try = [2, 1, 3, 4]
 
@@ -108,9 +102,9 @@ class TestUsersAPI:
         failed_attempts = []
 
         for user_id in user_ids_to_try:
-            url = f"{API_BASE_URL}/api/users/{user_id}"
+            url = f"{base_url}/api/users/{user_id}"
             logger.info(f"Attempting to get user ID {user_id}")
-            response = requests.get(url)
+            response = http.get(url)
 
             if response.status_code == 200:
                 successful_user_id = user_id
@@ -154,12 +148,12 @@ class TestUsersAPI:
 
     @skip_in_ci
     @pytest.mark.negative
-    def test_get_user_not_found(self):
+    def test_get_user_not_found(self, http, base_url):
         """Test that requesting non-existent user returns 404 - GET /api/users/{id}"""
-        url = f"{API_BASE_URL}/api/users/999"
+        url = f"{base_url}/api/users/999"
 
         logger.info(f"Testing 404 response for non-existent user: {url}")
-        response = requests.get(url)
+        response = http.get(url)
 
         assert response.status_code == 404, f"Expected 404, got {response.status_code}"
 
@@ -167,13 +161,13 @@ class TestUsersAPI:
 
     @skip_in_ci
     @pytest.mark.regression
-    def test_create_user(self):
+    def test_create_user(self, http, base_url):
         """Test creating a new user - POST /api/users"""
-        url = f"{API_BASE_URL}/api/users"
+        url = f"{base_url}/api/users"
         user_data = {"name": "Adam Majcher", "job": "QA Engineer"}
 
         logger.info(f"Testing POST {url} with data: {user_data}")
-        response = requests.post(url, json=user_data)
+        response = http.post(url, json=user_data)
 
         assert response.status_code == 201, f"Expected 201, got {response.status_code}"
 
@@ -187,14 +181,14 @@ class TestUsersAPI:
 
     @skip_in_ci
     @pytest.mark.regression
-    def test_update_user(self):
+    def test_update_user(self, http, base_url):
         """Test updating an existing user - PUT /api/users/{id}"""
         user_id = 2
-        url = f"{API_BASE_URL}/api/users/{user_id}"
+        url = f"{base_url}/api/users/{user_id}"
         update_data = {"name": "Adam Updated", "job": "Senior QA Engineer"}
 
         logger.info(f"Testing PUT {url} with data: {update_data}")
-        response = requests.put(url, json=update_data)
+        response = http.put(url, json=update_data)
 
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
 
@@ -207,14 +201,14 @@ class TestUsersAPI:
 
     @skip_in_ci
     @pytest.mark.regression
-    def test_patch_user(self):
+    def test_patch_user(self, http, base_url):
         """Test partially updating a user - PATCH /api/users/{id}"""
         user_id = 2
-        url = f"{API_BASE_URL}/api/users/{user_id}"
+        url = f"{base_url}/api/users/{user_id}"
         patch_data = {"first_name": "someone"}
 
         logger.info(f"Testing PATCH {url} with data: {patch_data}")
-        response = requests.patch(url, json=patch_data)
+        response = http.patch(url, json=patch_data)
 
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
 
@@ -228,13 +222,13 @@ class TestUsersAPI:
 
     @skip_in_ci
     @pytest.mark.regression
-    def test_delete_user(self):
+    def test_delete_user(self, http, base_url):
         """Test deleting a user - DELETE /api/users/{id}"""
         user_id = 2
-        url = f"{API_BASE_URL}/api/users/{user_id}"
+        url = f"{base_url}/api/users/{user_id}"
 
         logger.info(f"Testing DELETE {url}")
-        response = requests.delete(url)
+        response = http.delete(url)
 
         assert response.status_code == 204, f"Expected 204, got {response.status_code}"
 
@@ -242,32 +236,20 @@ class TestUsersAPI:
 
     @skip_in_ci
     @pytest.mark.regression
-    def test_get_all_users(self):
+    def test_get_all_users(self, http, base_url):
         """Test retrieving multiple users by iterating through pages"""
-        url = f"{API_BASE_URL}/api/users"
-        all_users = []
+        url = f"{base_url}/api/users"
 
         logger.info("Testing pagination - retrieving all users across pages")
 
-        # Act - Get first page to know total pages
-        first_response = requests.get(url, params={"page": 1})
-        assert first_response.status_code == 200
-
-        first_data = first_response.json()
-        total_pages = first_data["total_pages"]
-        all_users.extend(first_data["data"])
+        # Act - Page 1 gives total_pages, the rest are fetched concurrently
+        first_data = http.get(url, params={"page": 1}).json()
+        all_users = list(iter_records(http, url))
 
         logger.info(
-            f"First page retrieved: {len(first_data['data'])} users, {total_pages} total pages"
+            f"Retrieved {len(all_users)} users, {first_data['total_pages']} total pages"
         )
 
-        # Get remaining pages
-        for page in range(2, total_pages + 1):
-            logger.debug(f"Fetching page {page}/{total_pages}")
-            response = requests.get(url, params={"page": page})
-            assert response.status_code == 200
-            all_users.extend(response.json()["data"])
-
         # Assert
         assert len(all_users) == first_data["total"], "Should get all users"
 
@@ -276,16 +258,17 @@ class TestUsersAPI:
         assert len(user_ids) == len(set(user_ids)), "All user IDs should be unique"
 
         logger.info(
-            f"✅ Retrieved all {len(all_users)} users across {total_pages} pages"
+            f"✅ Retrieved all {len(all_users)} users across "
+            f"{first_data['total_pages']} pages"
         )
 
     @pytest.mark.regression
-    def test_user_data_structure(self):
+    def test_user_data_structure(self, api):
         """Test that user data has all required fields"""
         logger.info("Testing user data structure validation")
 
         # Use the helper function with logging
-        response, user_id = get_available_user(API_BASE_URL, [1, 2, 3, 4])
+        response, user_id = get_available_user(api, [1, 2, 3, 4])
 
         assert response is not None, "No available user found"
         assert response.status_code == 200
@@ -323,12 +306,12 @@ class TestResourcesAPI:
 
     @skip_in_ci
     @pytest.mark.smoke
-    def test_get_list_resources(self):
+    def test_get_list_resources(self, http, base_url):
         """Test retrieving list of resources - GET /api/unknown"""
-        url = f"{API_BASE_URL}/api/unknown"
+        url = f"{base_url}/api/unknown"
 
         logger.info(f"Testing GET {url}")
-        response = requests.get(url)
+        response = http.get(url)
 
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
 
@@ -347,13 +330,13 @@ class TestResourcesAPI:
 
     @skip_in_ci
     @pytest.mark.regression
-    def test_get_single_resource(self):
+    def test_get_single_resource(self, http, base_url):
         """Test retrieving a single resource - GET /api/unknown/{id}"""
         resource_id = 2
-        url = f"{API_BASE_URL}/api/unknown/{resource_id}"
+        url = f"{base_url}/api/unknown/{resource_id}"
 
         logger.info(f"Testing GET {url}")
-        response = requests.get(url)
+        response = http.get(url)
 
         assert response.status_code == 200
         response_data = response.json()
@@ -373,12 +356,12 @@ class TestResourcesAPI:
 
     @skip_in_ci
     @pytest.mark.negative
-    def test_get_resource_not_found(self):
+    def test_get_resource_not_found(self, http, base_url):
         """Test that requesting non-existent resource returns 404"""
-        url = f"{API_BASE_URL}/api/unknown/999"
+        url = f"{base_url}/api/unknown/999"
 
         logger.info(f"Testing 404 response for non-existent resource: {url}")
-        response = requests.get(url)
+        response = http.get(url)
 
         assert response.status_code == 404
 
@@ -390,13 +373,13 @@ class TestAuthentication:
 
     @skip_in_ci
     @pytest.mark.regression
-    def test_register_successful(self):
+    def test_register_successful(self, http, base_url):
         """Test successful user registration - POST /api/register"""
-        url = f"{API_BASE_URL}/api/register"
+        url = f"{base_url}/api/register"
         user_data = {"email": "eve.holt@reqres.in", "password": "pistol"}
 
         logger.info(f"Testing POST {url} for registration")
-        response = requests.post(url, json=user_data)
+        response = http.post(url, json=user_data)
 
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
 
@@ -410,13 +393,13 @@ class TestAuthentication:
 
     @skip_in_ci
     @pytest.mark.negative
-    def test_register_unsuccessful(self):
+    def test_register_unsuccessful(self, http, base_url):
         """Test registration fails without password - POST /api/register"""
-        url = f"{API_BASE_URL}/api/register"
+        url = f"{base_url}/api/register"
         user_data = {"email": "sydney@fife"}
 
         logger.info(f"Testing POST {url} with missing password (negative test)")
-        response = requests.post(url, json=user_data)
+        response = http.post(url, json=user_data)
 
         assert response.status_code == 400, f"Expected 400, got {response.status_code}"
 
@@ -427,13 +410,13 @@ class TestAuthentication:
 
     @skip_in_ci
     @pytest.mark.regression
-    def test_login_successful(self):
+    def test_login_successful(self, http, base_url):
         """Test successful login - POST /api/login"""
-        url = f"{API_BASE_URL}/api/login"
+        url = f"{base_url}/api/login"
         credentials = {"email": "eve.holt@reqres.in", "password": "cityslicka"}
 
         logger.info(f"Testing POST {url} for login")
-        response = requests.post(url, json=credentials)
+        response = http.post(url, json=credentials)
 
         assert response.status_code == 200, f"Expected 200, got {response.status_code}"
 
@@ -444,13 +427,13 @@ class TestAuthentication:
 
     @skip_in_ci
     @pytest.mark.negative
-    def test_login_unsuccessful(self):
+    def test_login_unsuccessful(self, http, base_url):
         """Test login fails without password - POST /api/login"""
-        url = f"{API_BASE_URL}/api/login"
+        url = f"{base_url}/api/login"
         credentials = {"email": "peter@klaven"}
 
         logger.info(f"Testing POST {url} with missing password (negative test)")
-        response = requests.post(url, json=credentials)
+        response = http.post(url, json=credentials)
 
         assert response.status_code == 400, f"Expected 400, got {response.status_code}"
 
@@ -464,14 +447,14 @@ class TestResponseTiming:
     """Test suite for response time validation"""
 
     @pytest.mark.performance
-    def test_response_time_under_threshold(self):
+    def test_response_time_under_threshold(self, api):
         """Test that API responds within acceptable time"""
         max_response_time = 5.0  # 5 seconds
 
         logger.info("Testing response time performance")
 
         # Use helper to get available user
-        response, user_id = get_available_user(API_BASE_URL, [1, 2, 3])
+        response, user_id = get_available_user(api, [1, 2, 3])
 
         assert response is not None, "No available user for performance test"
         response_time = response.elapsed.total_seconds()
@@ -488,15 +471,15 @@ class TestResponseTiming:
 
     @skip_in_ci
     @pytest.mark.performance
-    def test_delayed_response(self):
+    def test_delayed_response(self, http, base_url):
         """Test API with delayed response - GET /api/users?delay=3"""
-        url = f"{API_BASE_URL}/api/users"
+        url = f"{base_url}/api/users"
         params = {"delay": 3}
 
         logger.info(f"Testing delayed response with {params['delay']}s delay")
 
         start_time = time.time()
-        response = requests.get(url, params=params, timeout=10)
+        response = http.get(url, params=params, timeout=10)
         elapsed_time = time.time() - start_time
 
         assert response.status_code == 200
@@ -515,12 +498,12 @@ class TestPagination:
 
     @skip_in_ci
     @pytest.mark.regression
-    def test_pagination_info(self):
+    def test_pagination_info(self, http, base_url):
         """Test that pagination information is correct"""
-        url = f"{API_BASE_URL}/api/users"
+        url = f"{base_url}/api/users"
 
         logger.info("Testing pagination metadata")
-        response = requests.get(url, params={"page": 1})
+        response = http.get(url, params={"page": 1})
         data = response.json()
 
         assert "page" in data
@@ -541,25 +524,25 @@ class TestPagination:
 
     @skip_in_ci
     @pytest.mark.regression
-    def test_last_page_has_correct_number_of_items(self):
+    def test_last_page_has_correct_number_of_items(self, http, base_url):
         """Test that last page has correct number of items"""
-        url = f"{API_BASE_URL}/api/users"
+        url = f"{base_url}/api/users"
 
         logger.info("Testing last page item count")
 
-        # Get first page to know total pages
-        first_response = requests.get(url, params={"page": 1})
-        first_data = first_response.json()
+        # Act - Walk every page, keeping only the last one
+        pages = 0
+        for page_data in iter_pages(http, url):
+            pages += 1
+            last_data = page_data
 
-        total_pages = first_data["total_pages"]
-        total_items = first_data["total"]
-        per_page = first_data["per_page"]
+        total_pages = last_data["total_pages"]
+        total_items = last_data["total"]
+        per_page = last_data["per_page"]
 
         logger.debug(f"Total pages: {total_pages}, Total items: {total_items}")
-
-        # Act - Get last page
-        last_response = requests.get(url, params={"page": total_pages})
-        last_data = last_response.json()
+        assert pages == total_pages, "Every page should be walked"
+        assert last_data["page"] == total_pages
 
         # Calculate expected items on last page
         expected_items_on_last_page = total_items % per_page
@@ -578,17 +561,128 @@ class TestPagination:
             f"{actual_items_on_last_page}"
         )
 
+    @skip_in_ci
+    @pytest.mark.regression
+    def test_per_page_parameter(self, http, base_url):
+        """Test that ?per_page=N controls page size - GET /api/users?per_page=4"""
+        url = f"{base_url}/api/users"
+
+        logger.info("Testing per_page query parameter")
+        response = http.get(url, params={"page": 1, "per_page": 4})
+        data = response.json()
+
+        assert response.status_code == 200
+        assert data["per_page"] == 4, "per_page should echo the requested size"
+        assert len(data["data"]) == min(4, data["total"])
+
+        expected_pages = (data["total"] + 3) // 4
+        assert data["total_pages"] == expected_pages
+
+        logger.info(f"✅ per_page=4 returned {len(data['data'])} users")
+
+    @skip_in_ci
+    @pytest.mark.negative
+    def test_per_page_is_capped(self, http, base_url):
+        """Test that oversized ?per_page= is capped by the server"""
+        url = f"{base_url}/api/users"
+
+        logger.info("Testing per_page cap")
+        response = http.get(url, params={"per_page": 1000000})
+        data = response.json()
+
+        assert response.status_code == 200
+        assert data["per_page"] < 1000000, "per_page should be capped"
+        assert len(data["data"]) <= data["per_page"]
+
+        logger.info(f"✅ per_page capped at {data['per_page']}")
+
+    @skip_in_ci
+    @pytest.mark.regression
+    def test_cursor_pagination(self, http, base_url):
+        """Test walking users with ?after=<cursor>&limit=N"""
+        url = f"{base_url}/api/users"
+        seen_ids = []
+
+        logger.info("Testing cursor pagination")
+        params = {"limit": 5}
+        while True:
+            response = http.get(url, params=params)
+            assert response.status_code == 200
+            data = response.json()
+
+            assert len(data["data"]) <= 5
+            seen_ids.extend(user["id"] for user in data["data"])
+
+            if data["next_cursor"] is None:
+                break
+            params = {"after": data["next_cursor"], "limit": 5}
+
+        assert len(seen_ids) == data["total"], "Cursor walk should see every user"
+        assert seen_ids == sorted(set(seen_ids)), "Ids should be unique and ordered"
+
+        logger.info(f"✅ Cursor walk returned {len(seen_ids)} users")
+
+    @skip_in_ci
+    @pytest.mark.negative
+    @pytest.mark.parametrize("cursor", ["garbage!", "\u00b2"])
+    def test_invalid_cursor(self, http, base_url, cursor):
+        """Test that a garbage ?after= value returns 400"""
+        url = f"{base_url}/api/users"
+
+        logger.info(f"Testing invalid cursor {cursor!r}")
+        response = http.get(url, params={"after": cursor})
+
+        assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+        assert "error" in response.json()
+
+        logger.info("✅ Invalid cursor rejected")
+
+    @skip_in_ci
+    @pytest.mark.negative
+    @pytest.mark.parametrize(
+        "query",
+        [
+            {"per_page": "abc"},
+            {"page": "2x"},
+            {"page": "0"},
+            {"page": "-1"},
+            {"page": "-1", "sort": "last_name"},
+            {"per_page": "0"},
+            {"per_page": "-3"},
+        ],
+    )
+    def test_invalid_page_params(self, http, base_url, query):
+        """Test that non-integer or non-positive ?page= / ?per_page= values return 400"""
+        response = http.get(f"{base_url}/api/users", params=query)
+
+        assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+        assert "error" in response.json()
+
+        logger.info(f"✅ {query} rejected")
+
+    @skip_in_ci
+    @pytest.mark.negative
+    @pytest.mark.parametrize("limit", ["x", "0", "-5"])
+    def test_invalid_limit(self, http, base_url, limit):
+        """Test that a non-integer or non-positive ?limit= returns 400"""
+        response = http.get(f"{base_url}/api/users", params={"limit": limit})
+
+        assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+        assert "limit" in response.json()["error"]
+
+        logger.info(f"✅ ?limit={limit} rejected")
+
 
 class TestHeaders:
     """Test suite for HTTP headers validation"""
 
     @pytest.mark.regression
-    def test_response_headers(self):
+    def test_response_headers(self, api):
         """Test that response contains expected headers"""
         logger.info("Testing HTTP response headers")
 
         # Use helper to get available user
-        response, user_id = get_available_user(API_BASE_URL, [1, 2, 3])
+        response, user_id = get_available_user(api, [1, 2, 3])
 
         assert response is not None, "No available user for header test"
         assert response.status_code == 200